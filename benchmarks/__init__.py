@@ -0,0 +1 @@
+"""Opyplus benchmarks (run from repository root: python -m benchmarks.<benchmark_name>)."""
@@ -0,0 +1,92 @@
+"""
+Programmatic model building (Table.add in a loop), with and without Epm.bulk.
+
+Usage: python -m benchmarks.bulk_add [--zones 2000] [--version 8.6] [--repeat 3]
+"""
+import argparse
+import time
+
+import opyplus as op
+
+
+def build(epm, zones_nb):
+    """
+    Add zones_nb zones, each zone having 6 surfaces (surfaces are added before their zone).
+
+    Parameters
+    ----------
+    epm: opyplus.Epm
+    zones_nb: int
+    """
+    epm.Material_NoMass.add(name="r13layer", roughness="Rough", thermal_resistance=2.29)
+    epm.Construction.add(name="r13wall", outside_layer="r13layer")
+    for i in range(zones_nb):
+        for j in range(6):
+            epm.BuildingSurface_Detailed.add(
+                name=f"surface {i}-{j}",
+                surface_type="wall",
+                construction_name="r13wall",
+                zone_name=f"zone {i}",
+                outside_boundary_condition="outdoors",
+                sun_exposure="sunexposed",
+                wind_exposure="windexposed",
+                number_of_vertices=4,
+                vertex_1_x_coordinate=0, vertex_1_y_coordinate=0, vertex_1_z_coordinate=4.5,
+                vertex_2_x_coordinate=0, vertex_2_y_coordinate=0, vertex_2_z_coordinate=0,
+                vertex_3_x_coordinate=j, vertex_3_y_coordinate=0, vertex_3_z_coordinate=0,
+                vertex_4_x_coordinate=j, vertex_4_y_coordinate=0, vertex_4_z_coordinate=4.5
+            )
+        epm.Zone.add(name=f"zone {i}", x_origin=i)
+
+
+def _build_ordered(epm, zones_nb):
+    # same model, zones are added before their surfaces (required without bulk mode)
+    epm.Material_NoMass.add(name="r13layer", roughness="Rough", thermal_resistance=2.29)
+    epm.Construction.add(name="r13wall", outside_layer="r13layer")
+    for i in range(zones_nb):
+        epm.Zone.add(name=f"zone {i}", x_origin=i)
+        for j in range(6):
+            epm.BuildingSurface_Detailed.add(
+                name=f"surface {i}-{j}",
+                surface_type="wall",
+                construction_name="r13wall",
+                zone_name=f"zone {i}",
+                outside_boundary_condition="outdoors",
+                sun_exposure="sunexposed",
+                wind_exposure="windexposed",
+                number_of_vertices=4,
+                vertex_1_x_coordinate=0, vertex_1_y_coordinate=0, vertex_1_z_coordinate=4.5,
+                vertex_2_x_coordinate=0, vertex_2_y_coordinate=0, vertex_2_z_coordinate=0,
+                vertex_3_x_coordinate=j, vertex_3_y_coordinate=0, vertex_3_z_coordinate=0,
+                vertex_4_x_coordinate=j, vertex_4_y_coordinate=0, vertex_4_z_coordinate=4.5
+            )
+
+
+def _build_bulk(epm, zones_nb):
+    with epm.bulk():
+        build(epm, zones_nb)
+
+
+def main():
+    """Time model building with and without Epm.bulk."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", default=2000, type=int)
+    parser.add_argument("--version", default="8.6")
+    parser.add_argument("--repeat", default=3, type=int)
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    op.Epm(idd_or_version=version)  # load idd
+    print(f"{args.zones * 7 + 2} records added")
+    for label, fct in (("without bulk", _build_ordered), ("Epm.bulk", _build_bulk)):
+        durations = []
+        for _ in range(args.repeat):
+            epm = op.Epm(idd_or_version=version)
+            start = time.perf_counter()
+            fct(epm, args.zones)
+            durations.append(time.perf_counter() - start)
+        print(f"  {label}: {min(durations):.2f} s ({min(durations) / (args.zones * 7 + 2) * 1e6:.0f} us per record)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Field deserialization, with and without trusted mode.
+
+Measures FieldDescriptor.deserialize per value, and Epm.load of an idf written by opyplus.
+
+Usage: python -m benchmarks.deserialize [--zones 2000] [--version 8.6] [--repeat 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+import timeit
+
+import opyplus as op
+from benchmarks.idf_load import generate_idf
+
+
+def main():
+    """Time field deserialization and loads, with and without trusted mode."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", default=2000, type=int)
+    parser.add_argument("--version", default="8.6")
+    parser.add_argument("--repeat", default=3, type=int)
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    # per value
+    idd = op.Epm(idd_or_version=version)._dev_idd
+    surface_td = idd.table_descriptors["buildingsurface_detailed"]
+    print("FieldDescriptor.deserialize (per value)")
+    for label, index, value in (
+            ("alpha", 1, "Wall"),
+            ("real", 9, "0.5"),
+            ("reference", 0, "Surface 0-0"),
+            ("object-list", 3, "Zone 0")
+    ):
+        fd = surface_td.get_field_descriptor(index)
+        for trusted in (False, True):
+            raw_value = value.lower() if trusted else value
+            number = 100000
+            duration = timeit.timeit(lambda: fd.deserialize(raw_value, index, trusted=trusted), number=number)
+            print(f"  {label}, trusted={trusted}: {duration / number * 1e6:.2f} us")
+
+    # epm load
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        path = os.path.join(temp_dir_path, "large.idf")
+        generate_idf(path, args.zones, version=version)
+        op.Epm.load(path).save(path)  # idf written by opyplus
+
+        print(f"Epm.load, {args.zones * 7 + 3} records")
+        for trusted in (False, True):
+            durations = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                op.Epm.load(path, trusted=trusted)
+                durations.append(time.perf_counter() - start)
+            print(f"  trusted={trusted}: {min(durations):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Input files encoding detection strategies (CONF.encoding_detection) on large files and on real loads.
+
+ - detection: time of opyplus.util.detect_encoding on large generated idfs (--size-mb), latin-1 and utf-8 encoded
+   (utf-8 is the worst case for fast detection: whole file is validated)
+ - loads: Epm.load and WeatherData.load of test resources (detection included)
+
+Usage: python -m benchmarks.encoding_detection [--size-mb 50] [--runs 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+import statistics
+
+import opyplus as op
+from opyplus.util import detect_encoding
+
+RESOURCES_DIR_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "resources")
+IDF_PATH = os.path.join(RESOURCES_DIR_PATH, "simulations_outputs", "one_zone_uncontrolled", "8-6-0", "opyplus.idf")
+EPW_PATH = os.path.join(RESOURCES_DIR_PATH, "epw", "san_fransisco_tmy3.epw")
+STRATEGIES = ("full", "sniff", "fast")
+
+
+def _time(fct, runs):
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fct()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def main():
+    """Time each encoding detection strategy."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", default=50, type=int)
+    parser.add_argument("--runs", default=3, type=int)
+    args = parser.parse_args()
+
+    initial_detection = op.CONF.encoding_detection
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        # generate large idfs
+        with open(IDF_PATH, "rb") as f:
+            latin_1_content = f.read()
+        large_idf_paths = {}  # {encoding: path, ...}
+        for encoding, content in (
+                ("latin-1", latin_1_content),
+                ("utf-8", latin_1_content.decode("latin-1").encode("utf-8"))
+        ):
+            large_idf_paths[encoding] = os.path.join(temp_dir_path, f"large-{encoding}.idf")
+            with open(large_idf_paths[encoding], "wb") as f:
+                for _ in range(args.size_mb * 2**20 // len(content) + 1):
+                    f.write(content)
+
+        print(f"encoding detection ({args.runs} runs, median)")
+        try:
+            for strategy in STRATEGIES:
+                op.CONF.encoding_detection = strategy
+                detection = {
+                    encoding: _time(lambda: detect_encoding(path), args.runs)
+                    for encoding, path in large_idf_paths.items()
+                }
+                epm_load = _time(lambda: op.Epm.load(IDF_PATH, idd_or_version=(8, 6, 0)), args.runs)
+                epw_load = _time(lambda: op.WeatherData.load(EPW_PATH), args.runs)
+                print(
+                    f"  {strategy}: detection ({args.size_mb} MB idf) latin-1 {detection['latin-1']:.3f} s, "
+                    f"utf-8 {detection['utf-8']:.3f} s, "
+                    f"Epm.load {epm_load:.3f} s, WeatherData.load {epw_load:.3f} s"
+                )
+        finally:
+            op.CONF.encoding_detection = initial_detection
+
+
+if __name__ == "__main__":
+    main()
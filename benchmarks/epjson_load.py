@@ -0,0 +1,60 @@
+"""
+Epm.from_epjson versus Epm.load (idf) throughput, on the same large generated model.
+
+Usage: python -m benchmarks.epjson_load [--zones 2000] [--version 8.6]
+"""
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+
+import opyplus as op
+from opyplus.epm import epjson
+from benchmarks.idf_load import generate_idf
+
+
+def _measure(fct):
+    start = time.perf_counter()
+    fct()
+    return time.perf_counter() - start
+
+
+def main():
+    """Compare Epm.from_epjson and Epm.load throughputs."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", default=2000, type=int)
+    parser.add_argument("--version", default="8.6")
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        idf_path = os.path.join(temp_dir_path, "large.idf")
+        epjson_path = os.path.join(temp_dir_path, "large.epJSON")
+        generate_idf(idf_path, args.zones, version=version)
+        op.Epm.load(idf_path).to_epjson(epjson_path, dump_external_files=False)
+        idf_mb = os.path.getsize(idf_path) / 2**20
+        epjson_mb = os.path.getsize(epjson_path) / 2**20
+
+        print(f"{args.zones * 7 + 3} records (idf: {idf_mb:.1f} MB, epjson: {epjson_mb:.1f} MB)")
+
+        # parsing only
+        with open(epjson_path) as f:
+            content = f.read()
+        duration = _measure(lambda: json.loads(content))
+        print(f"  json.loads: {duration:.3f} s ({epjson_mb / duration:.1f} MB/s)")
+        epjson_data = json.loads(content)
+        idd = op.Epm(idd_or_version=version)._dev_idd
+        duration = _measure(lambda: list(epjson.iter_records(epjson_data, idd)))
+        print(f"  epjson.iter_records: {duration:.3f} s")
+
+        # load
+        duration = _measure(lambda: op.Epm.load(idf_path))
+        print(f"  Epm.load: {duration:.3f} s ({idf_mb / duration:.1f} MB/s)")
+        duration = _measure(lambda: op.Epm.from_epjson(io.StringIO(content)))
+        print(f"  Epm.from_epjson: {duration:.3f} s ({epjson_mb / duration:.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
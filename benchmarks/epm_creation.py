@@ -0,0 +1,43 @@
+"""
+Empty Epm() construction time and memory (idd is already loaded).
+
+Usage: python -m benchmarks.epm_creation [--version 8.6] [--nb 1000]
+"""
+import argparse
+import time
+import tracemalloc
+
+import opyplus as op
+
+
+def main():
+    """Measure empty Epm construction time and memory."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--version", default="8.6")
+    parser.add_argument("--nb", default=1000, type=int)
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    # load idd
+    op.Epm(idd_or_version=version)
+
+    # time
+    start = time.perf_counter()
+    for _ in range(args.nb):
+        op.Epm(idd_or_version=version)
+    duration = time.perf_counter() - start
+
+    # memory
+    tracemalloc.start()
+    epms = [op.Epm(idd_or_version=version) for _ in range(100)]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del epms
+
+    print(f"Epm() construction, idd {args.version}")
+    print(f"  time: {duration / args.nb * 1e3:.3f} ms per epm ({args.nb} epms)")
+    print(f"  memory: {memory / 100 / 1024:.1f} KB per epm")
+
+
+if __name__ == "__main__":
+    main()
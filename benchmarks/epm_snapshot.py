@@ -0,0 +1,42 @@
+"""
+Epm.from_snapshot versus Epm.load (idf), on a large generated idf.
+
+Usage: python -m benchmarks.epm_snapshot [--zones 2000] [--version 8.6]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import opyplus as op
+from benchmarks.idf_load import generate_idf
+
+
+def main():
+    """Compare Epm.from_snapshot and Epm.load times."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", default=2000, type=int)
+    parser.add_argument("--version", default="8.6")
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        idf_path = os.path.join(temp_dir_path, "large.idf")
+        snapshot_path = os.path.join(temp_dir_path, "large.snapshot")
+        generate_idf(idf_path, args.zones, version=version)
+        epm = op.Epm.load(idf_path)
+        epm.to_snapshot(snapshot_path)
+
+        print(f"load {args.zones * 7 + 3} records")
+        for name, path, fct in (
+                ("Epm.load", idf_path, op.Epm.load),
+                ("Epm.from_snapshot", snapshot_path, op.Epm.from_snapshot)
+        ):
+            start = time.perf_counter()
+            fct(path)
+            duration = time.perf_counter() - start
+            print(f"  {name}: {duration:.3f} s (file size: {os.path.getsize(path) / 2**20:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Field descriptor info (detailed_type, is_required, is_file_name) access time, and Epm.load of a large generated idf.
+
+Usage: python -m benchmarks.field_descriptor_info [--zones 4000] [--version 8.6] [--repeat 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+import timeit
+
+import opyplus as op
+from benchmarks.idf_load import generate_idf
+
+
+def main():
+    """Time field descriptor info access and Epm.load."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", default=4000, type=int)
+    parser.add_argument("--version", default="8.6")
+    parser.add_argument("--repeat", default=3, type=int)
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    # per access
+    idd = op.Epm(idd_or_version=version)._dev_idd
+    fd = idd.table_descriptors["buildingsurface_detailed"].get_field_descriptor(3)
+    print("FieldDescriptor (per access)")
+    number = 1000000
+    for name, fct in (
+            ("detailed_type", lambda: fd.detailed_type),
+            ("is_required", lambda: fd.is_required),
+            ("is_file_name", lambda: fd.is_file_name),
+            ("check_not_required", lambda: fd.check_not_required() if not fd.is_required else None)
+    ):
+        print(f"  {name}: {timeit.timeit(fct, number=number) / number * 1e9:.0f} ns")
+
+    # epm load
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        path = os.path.join(temp_dir_path, "large.idf")
+        generate_idf(path, args.zones, version=version)
+        durations = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            op.Epm.load(path)
+            durations.append(time.perf_counter() - start)
+        print(f"Epm.load, {args.zones * 7 + 3} records: {min(durations):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
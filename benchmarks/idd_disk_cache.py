@@ -0,0 +1,59 @@
+"""
+Cold versus warm Epm() construction time (idd disk cache).
+
+Each measure is performed in a fresh process, so the in-memory idd cache is empty:
+ - cold: idd disk cache is empty, idd is parsed (and cache is written)
+ - warm: idd is loaded from disk cache
+
+Usage: python -m benchmarks.idd_disk_cache [--version 8.6] [--runs 5]
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import os
+import shutil
+import statistics
+
+_SNIPPET = """
+import time
+import opyplus as op
+op.CONF.idd_cache_dir_path = {cache_dir_path!r}
+start = time.perf_counter()
+op.Epm(idd_or_version={version!r})
+print(time.perf_counter() - start)
+"""
+
+
+def _run(version, cache_dir_path):
+    output = subprocess.check_output(
+        [sys.executable, "-c", _SNIPPET.format(version=version, cache_dir_path=cache_dir_path)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return float(output.decode().strip().split("\n")[-1])
+
+
+def main():
+    """Compare cold and warm Epm construction times."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--version", default="8.6")
+    parser.add_argument("--runs", default=5, type=int)
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    cold, warm = [], []
+    for _ in range(args.runs):
+        cache_dir_path = tempfile.mkdtemp()
+        try:
+            cold.append(_run(version[:3], cache_dir_path))
+            warm.append(_run(version[:3], cache_dir_path))
+        finally:
+            shutil.rmtree(cache_dir_path)
+
+    print(f"Epm() construction, idd {args.version} ({args.runs} runs, median)")
+    print(f"  cold (parse idd): {statistics.median(cold):.3f} s")
+    print(f"  warm (disk cache): {statistics.median(warm):.3f} s")
+
+
+if __name__ == "__main__":
+    main()
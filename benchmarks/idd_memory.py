@@ -0,0 +1,50 @@
+"""
+Memory used by a loaded idd, for each bundled idd version.
+
+Each idd is parsed in a fresh process, memory is measured with tracemalloc (idd file reading and encoding detection
+are not included).
+
+Usage: python -m benchmarks.idd_memory
+"""
+import os
+import subprocess
+import sys
+
+_SNIPPET = """
+import io
+import gc
+import tracemalloc
+from opyplus.idd.idd import Idd
+from opyplus.idd.resources import get_idd_path
+from opyplus.util import detect_encoding
+
+path = get_idd_path({version!r})
+with open(path, encoding=detect_encoding(path)) as f:
+    content = f.read()
+tracemalloc.start()
+idd = Idd(io.StringIO(content))
+gc.collect()
+print(tracemalloc.get_traced_memory()[0])
+"""
+
+
+def main():
+    """Measure the memory of each bundled idd."""
+    from opyplus.idd.resources import IDD_DIR_PATH
+    versions = []
+    for name in sorted(os.listdir(IDD_DIR_PATH)):
+        root, ext = os.path.splitext(name)
+        if ext == ".idd":
+            versions.append(tuple(int(v) for v in root[1:].split("-")[:3]))
+
+    print("idd memory")
+    for version in versions:
+        output = subprocess.check_output(
+            [sys.executable, "-c", _SNIPPET.format(version=version)],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        print(f"  {'.'.join(str(v) for v in version)}: {int(output.decode().strip()) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
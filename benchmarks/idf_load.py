@@ -0,0 +1,97 @@
+"""
+Epm.load of a large generated idf: time, throughput and peak python memory (tracemalloc).
+
+Compares streaming load (Epm.load) with the previous two-step load (parse_idf to a dict, then Epm(json_data)).
+
+Usage: python -m benchmarks.idf_load [--zones 2000] [--version 8.6]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import opyplus as op
+from opyplus.util import to_buffer
+from opyplus.epm.parse_idf import parse_idf
+
+
+def generate_idf(path, zones_nb, version=(8, 6, 0)):
+    """
+    Generate an idf containing zones_nb zones, each zone having 6 surfaces.
+
+    Parameters
+    ----------
+    path: str
+    zones_nb: int
+    version: tuple of int
+    """
+    with open(path, "w") as f:
+        f.write("! generated idf\n\n")
+        f.write(f"Version,\n    {version[0]}.{version[1]};                    !- Version Identifier\n\n")
+        f.write("Material:NoMass,\n    R13LAYER,                !- Name\n    Rough,                   !- Roughness\n"
+                "    2.290965;                !- Thermal Resistance {m2-K/W}\n\n")
+        f.write("Construction,\n    R13WALL,                 !- Name\n"
+                "    R13LAYER;                !- Outside Layer\n\n")
+        for i in range(zones_nb):
+            f.write(f"Zone,\n    Zone {i},                 !- Name\n    0,                       !- Direction\n"
+                    f"    {i},                       !- X Origin {{m}}\n    0,                       !- Y Origin\n"
+                    f"    0;                       !- Z Origin {{m}}\n\n")
+            for j in range(6):
+                f.write(
+                    f"BuildingSurface:Detailed,\n    Surface {i}-{j},        !- Name\n"
+                    f"    Wall,                    !- Surface Type\n    R13WALL,                 !- Construction\n"
+                    f"    Zone {i},                 !- Zone Name\n    Outdoors,                !- Outside Boundary\n"
+                    f"    ,                        !- Outside Boundary Condition Object\n"
+                    f"    SunExposed,              !- Sun Exposure\n    WindExposed,             !- Wind Exposure\n"
+                    f"    0.5,                     !- View Factor to Ground\n    4,                       !- Vertices\n"
+                    f"    0,0,4.5,                 !- X,Y,Z ==> Vertex 1 {{m}}\n"
+                    f"    0,0,0,                   !- X,Y,Z ==> Vertex 2 {{m}}\n"
+                    f"    {j},0,0,                  !- X,Y,Z ==> Vertex 3 {{m}}\n"
+                    f"    {j},0,4.5;                !- X,Y,Z ==> Vertex 4 {{m}}\n\n"
+                )
+
+
+def _two_steps_load(path):
+    _, buffer = to_buffer(path)
+    with buffer as f:
+        json_data = parse_idf(f)
+    return op.Epm(json_data=json_data)
+
+
+def _measure(fct):
+    tracemalloc.start()
+    start = time.perf_counter()
+    epm = fct()
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del epm
+    return duration, peak
+
+
+def main():
+    """Measure Epm.load time, throughput and peak memory."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", default=2000, type=int)
+    parser.add_argument("--version", default="8.6")
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        path = os.path.join(temp_dir_path, "large.idf")
+        generate_idf(path, args.zones, version=version)
+        size_mb = os.path.getsize(path) / 2**20
+
+        op.Epm(idd_or_version=version)  # load idd
+        print(f"Epm.load, {args.zones * 7 + 3} records ({size_mb:.1f} MB), tracemalloc on")
+        for name, fct in (
+                ("two steps (parse_idf + Epm(json_data))", lambda: _two_steps_load(path)),
+                ("streaming (Epm.load)", lambda: op.Epm.load(path))
+        ):
+            duration, peak = _measure(fct)
+            print(f"  {name}: {duration:.2f} s ({size_mb / duration:.2f} MB/s), peak memory {peak / 2**20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Peak RSS of idf parsing, for each parse mode.
+
+Compares text buffer tokenizers (parse_mode "stream" and "fast") with the memory-mapped bytes tokenizer ("mmap").
+
+Each measure is performed in a new process (peak RSS can't decrease). By default, records are only tokenized (no Epm
+is created, so that tokenizer memory is not hidden by records memory); use --load to measure Epm.load.
+
+Usage: python -m benchmarks.idf_mmap_memory [--zones 20000] [--version 8.6] [--load]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.idf_load import generate_idf
+
+_MEASURE_SCRIPT = """
+import resource, sys, time
+import opyplus as op
+from opyplus.util import to_buffer
+from opyplus.epm.parse_idf import iter_idf, iter_idf_fast, iter_idf_mmap
+
+path, parse_mode, load = sys.argv[1], sys.argv[2], sys.argv[3] == "1"
+op.Epm(idd_or_version=(8, 6, 0))  # idd is loaded in all modes
+start = time.perf_counter()
+if load:
+    op.Epm.load(path, parse_mode=parse_mode)
+elif parse_mode == "mmap":
+    for _ in iter_idf_mmap(path):
+        pass
+else:
+    _, buffer = to_buffer(path)
+    with buffer as f:
+        for _ in (iter_idf if parse_mode == "stream" else iter_idf_fast)(f):
+            pass
+duration = time.perf_counter() - start
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, duration)  # kB on linux
+"""
+
+
+def main():
+    """Measure peak RSS of each parse mode, in new processes."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", default=20000, type=int)
+    parser.add_argument("--version", default="8.6")
+    parser.add_argument("--load", action="store_true")
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        path = os.path.join(temp_dir_path, "large.idf")
+        generate_idf(path, args.zones, version=version)
+        size_mb = os.path.getsize(path) / 2**20
+
+        print(f"{'Epm.load' if args.load else 'tokenize'}, {args.zones * 7 + 3} records ({size_mb:.1f} MB)")
+        script = _MEASURE_SCRIPT.replace("(8, 6, 0)", repr(version))
+        for parse_mode in ("stream", "fast", "mmap"):
+            output = subprocess.check_output(
+                [sys.executable, "-c", script, path, parse_mode, "1" if args.load else "0"],
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            )
+            max_rss_kb, duration = output.decode().split()
+            print(f"  parse_mode={parse_mode}: peak RSS {int(max_rss_kb) / 2**10:.1f} MB, {float(duration):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
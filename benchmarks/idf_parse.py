@@ -0,0 +1,55 @@
+"""
+Idf parsing throughput (MB/s): line by line tokenizer (iter_idf) versus whole buffer tokenizer (iter_idf_fast).
+
+Usage: python -m benchmarks.idf_parse [--zones 4000] [--version 8.6] [--repeat 3]
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import opyplus as op
+from opyplus.epm.parse_idf import iter_idf, iter_idf_fast
+from benchmarks.idf_load import generate_idf
+
+
+def _best_duration(fct, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fct()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    """Compare idf tokenizers throughputs."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", default=4000, type=int)
+    parser.add_argument("--version", default="8.6")
+    parser.add_argument("--repeat", default=3, type=int)
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        path = os.path.join(temp_dir_path, "large.idf")
+        generate_idf(path, args.zones, version=version)
+        size_mb = os.path.getsize(path) / 2**20
+        with open(path) as f:
+            content = f.read()
+
+        print(f"tokenize, {args.zones * 7 + 3} records ({size_mb:.1f} MB)")
+        for iter_fct in (iter_idf, iter_idf_fast):
+            duration = _best_duration(lambda: list(iter_fct(io.StringIO(content))), args.repeat)
+            print(f"  {iter_fct.__name__}: {duration:.2f} s ({size_mb / duration:.1f} MB/s)")
+
+        op.Epm(idd_or_version=version)  # load idd
+        print("Epm.load")
+        for parse_mode in ("stream", "fast"):
+            duration = _best_duration(lambda: op.Epm.load(path, parse_mode=parse_mode), args.repeat)
+            print(f"  parse_mode={parse_mode}: {duration:.2f} s ({size_mb / duration:.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Epm.scan versus Epm.load, to read a few tables of a large generated idf.
+
+Usage: python -m benchmarks.idf_scan [--zones 2000] [--version 8.6]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import opyplus as op
+from benchmarks.idf_load import generate_idf
+
+
+def main():
+    """Compare Epm.scan and Epm.load times."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", default=2000, type=int)
+    parser.add_argument("--version", default="8.6")
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        path = os.path.join(temp_dir_path, "large.idf")
+        generate_idf(path, args.zones, version=version)
+        op.Epm(idd_or_version=version)  # load idd
+
+        print(f"read tables of an idf of {args.zones * 7 + 3} records")
+        for name, fct in (
+                ("Epm.load (all tables)", lambda: op.Epm.load(path)),
+                ("Epm.scan (Version)", lambda: op.Epm.scan(path, ["Version"])),
+                ("Epm.scan (Zone)", lambda: op.Epm.scan(path, ["Zone"]))
+        ):
+            start = time.perf_counter()
+            fct()
+            print(f"  {name}: {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
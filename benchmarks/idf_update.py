@@ -0,0 +1,53 @@
+"""
+Re-loading an edited idf versus applying the edit with Epm.update_from_idf.
+
+Usage: python -m benchmarks.idf_update [--zones 4000] [--version 8.6] [--repeat 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import opyplus as op
+from benchmarks.idf_load import generate_idf
+
+
+def main():
+    """Compare re-loading an edited idf and Epm.update_from_idf."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", default=4000, type=int)
+    parser.add_argument("--version", default="8.6")
+    parser.add_argument("--repeat", default=3, type=int)
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        path = os.path.join(temp_dir_path, "large.idf")
+        edited_path = os.path.join(temp_dir_path, "large-edited.idf")
+        generate_idf(path, args.zones, version=version)
+        with open(path) as f:
+            content = f.read()
+        # edit one surface and rename one zone (its surfaces are updated)
+        with open(edited_path, "w") as f:
+            f.write(content.replace("Surface 0-0,", "Surface 0-0 edited,").replace("Zone 1,", "Zone 1 edited,"))
+
+        op.Epm(idd_or_version=version)  # load idd
+        print(f"{args.zones * 7 + 3} records, 1 surface and 1 zone edited")
+        for parse_mode in ("stream", "fast"):
+            load_durations, update_durations = [], []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                op.Epm.load(edited_path, parse_mode=parse_mode)
+                load_durations.append(time.perf_counter() - start)
+
+                epm = op.Epm.load(path)
+                start = time.perf_counter()
+                epm.update_from_idf(edited_path, parse_mode=parse_mode)
+                update_durations.append(time.perf_counter() - start)
+            print(f"  parse_mode={parse_mode}")
+            print(f"    Epm.load: {min(load_durations):.2f} s")
+            print(f"    Epm.update_from_idf: {min(update_durations):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
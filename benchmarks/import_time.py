@@ -0,0 +1,59 @@
+"""
+Time of 'import opyplus' (python -X importtime), in fresh processes.
+
+Fails (exit code 1) if heavy optional modules are imported by 'import opyplus'.
+
+Usage: python -m benchmarks.import_time [--runs 5] [--top 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import statistics
+
+HEAVY_MODULES = ("pandas", "numpy", "cchardet", "unidecode", "slugify")
+
+
+def _run():
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import opyplus"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stderr=subprocess.PIPE,
+        check=True
+    ).stderr.decode()
+
+    modules = {}  # {module_name: cumulative_us, ...}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def main():
+    """Measure opyplus import time in fresh processes."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", default=5, type=int)
+    parser.add_argument("--top", default=10, type=int)
+    args = parser.parse_args()
+
+    runs = [_run() for _ in range(args.runs)]
+    print(f"import opyplus ({args.runs} runs, median): {statistics.median(r['opyplus'] for r in runs) / 1e3:.1f} ms")
+
+    print("slowest opyplus modules (cumulative, last run):")
+    opyplus_modules = sorted(
+        ((t, name) for name, t in runs[-1].items() if name.startswith("opyplus.")),
+        reverse=True
+    )
+    for t, name in opyplus_modules[:args.top]:
+        print(f"  {name}: {t / 1e3:.1f} ms")
+
+    imported_heavy_modules = [m for m in HEAVY_MODULES if m in runs[-1]]
+    if len(imported_heavy_modules) > 0:
+        print(f"heavy modules imported: {imported_heavy_modules}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
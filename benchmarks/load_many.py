@@ -0,0 +1,49 @@
+"""
+Epm.load_many versus sequential Epm.load, on generated idfs.
+
+Usage: python -m benchmarks.load_many [--files 32] [--zones 100] [--workers N] [--version 8.6]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import opyplus as op
+from benchmarks.idf_load import generate_idf
+
+
+def main():
+    """Compare Epm.load_many and sequential Epm.load times."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", default=32, type=int)
+    parser.add_argument("--zones", default=100, type=int)
+    parser.add_argument("--workers", default=None, type=int, help="default: number of cpus")
+    parser.add_argument("--version", default="8.6")
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+    workers = os.cpu_count() if args.workers is None else args.workers
+
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(temp_dir_path, f"model-{i}.idf")
+            generate_idf(path, args.zones, version=version)
+            paths.append(path)
+        op.Epm(idd_or_version=version)  # load idd
+
+        print(f"{args.files} files of {args.zones * 7 + 3} records, {workers} workers")
+        for name, fct in (
+                ("Epm.load (sequential)", lambda: [op.Epm.load(path) for path in paths]),
+                ("Epm.load_many", lambda: op.Epm.load_many(paths, workers=workers)),
+                ("Epm.load_many (snapshots)", lambda: op.Epm.load_many(paths, workers=workers, snapshots=True)),
+                ("Epm.load_many (as completed)", lambda: sum(
+                    1 for _ in op.Epm.load_many(paths, workers=workers, as_completed=True)))
+        ):
+            start = time.perf_counter()
+            fct()
+            duration = time.perf_counter() - start
+            print(f"  {name}: {duration:.2f} s ({args.files / duration:.1f} files/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Rule-like queries on surfaces: lambda filters, field lookups (scan and indexes), and batch_select.
+
+Usage: python -m benchmarks.query [--zones 4000] [--version 8.6] [--queries 100]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import opyplus as op
+from benchmarks.idf_load import generate_idf
+
+
+def _measure(fct, queries):
+    start = time.perf_counter()
+    for i in range(queries):
+        fct(i)
+    return (time.perf_counter() - start) / queries
+
+
+def main():
+    """Time rule-like queries with each query method."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", default=4000, type=int)
+    parser.add_argument("--version", default="8.6")
+    parser.add_argument("--queries", default=100, type=int)
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        path = os.path.join(temp_dir_path, "large.idf")
+        generate_idf(path, args.zones, version=version)
+        epm = op.Epm.load(path, parse_mode="fast")
+    surfaces = epm.BuildingSurface_Detailed
+    print(f"{len(surfaces)} surfaces, walls of zones whose x origin is in a range (per query)")
+
+    def lambda_query(i):
+        return surfaces.select(
+            lambda x: x.surface_type == "wall" and i <= x.zone_name.x_origin < i + 10)
+
+    def lookups_query(i):
+        return surfaces.select(surface_type="wall", zone_name__x_origin__range=(i, i + 9))
+
+    print(f"  select(lambda): {_measure(lambda_query, args.queries) * 1e3:.2f} ms")
+    print(f"  select(lookups), no index: {_measure(lookups_query, args.queries) * 1e3:.2f} ms")
+    queries = [dict(surface_type="wall", zone_name__x_origin__range=(i, i + 9)) for i in range(args.queries)]
+    start = time.perf_counter()
+    surfaces.batch_select(queries)
+    print(f"  batch_select(lookups), no index: {(time.perf_counter() - start) / args.queries * 1e3:.2f} ms")
+
+    surfaces.create_index("zone_name")
+    surfaces.create_index("surface_type")
+    lookups_query(0)  # build indexes
+    print(f"  select(lookups), indexes: {_measure(lookups_query, args.queries) * 1e3:.2f} ms")
+    start = time.perf_counter()
+    surfaces.batch_select(queries)
+    print(f"  batch_select(lookups), indexes: {(time.perf_counter() - start) / args.queries * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Record memory and field access speed on a large model (about 100k records).
+
+Usage: python -m benchmarks.record_memory [--zones 14286] [--version 8.6]
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+import opyplus as op
+from benchmarks.idf_load import generate_idf
+
+
+def _duration(fct, nb):
+    start = time.perf_counter()
+    fct()
+    return (time.perf_counter() - start) / nb * 1e9
+
+
+def main():
+    """Measure record memory and field access speed."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", default=14286, type=int)
+    parser.add_argument("--version", default="8.6")
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        path = os.path.join(temp_dir_path, "large.idf")
+        generate_idf(path, args.zones, version=version)
+        op.Epm(idd_or_version=version)  # load idd
+
+        # memory (records are loaded from a snapshot: only stored values are measured)
+        snapshot_path = os.path.join(temp_dir_path, "large.snapshot")
+        op.Epm.load(path).to_snapshot(snapshot_path)
+        gc.collect()
+        tracemalloc.start()
+        epm = op.Epm.from_snapshot(snapshot_path)
+        gc.collect()
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    records = [r for table in epm for r in table]
+    surfaces = list(epm.BuildingSurface_Detailed)
+    print(f"{len(records)} records")
+    print(f"  memory: {memory / 2**20:.1f} MB ({memory / len(records):.0f} B per record)")
+
+    # access speed
+    nb = len(surfaces)
+    print("  access (ns per access)")
+    print(f"    record[index]: {_duration(lambda: [s[9] for s in surfaces], nb):.0f}")
+    print(f"    record.field_name: {_duration(lambda: [s.view_factor_to_ground for s in surfaces], nb):.0f}")
+    duration = _duration(lambda: [s.get_serialized_value(9) for s in surfaces], nb)
+    print(f"    record.get_serialized_value: {duration:.0f}")
+    print(f"    len(record): {_duration(lambda: [len(s) for s in surfaces], nb):.0f}")
+    duration = _duration(lambda: [setattr(s, "view_factor_to_ground", 0.4) for s in surfaces], nb)
+    print(f"    record.field_name = value: {duration:.0f}")
+    print(f"    record.to_json_data: {_duration(lambda: [s.to_json_data() for s in surfaces], nb):.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Finding the surfaces of a zone: select with a lambda, with field values (scan), and with a table index.
+
+Usage: python -m benchmarks.table_index [--zones 4000] [--version 8.6] [--lookups 100]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import opyplus as op
+from benchmarks.idf_load import generate_idf
+
+
+def _measure(fct, lookups):
+    start = time.perf_counter()
+    for i in range(lookups):
+        fct(f"zone {i}")
+    return (time.perf_counter() - start) / lookups
+
+
+def main():
+    """Time zone surfaces search with each select method."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zones", default=4000, type=int)
+    parser.add_argument("--version", default="8.6")
+    parser.add_argument("--lookups", default=100, type=int)
+    args = parser.parse_args()
+    version = tuple(int(v) for v in args.version.split(".")) + (0,)
+
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        path = os.path.join(temp_dir_path, "large.idf")
+        generate_idf(path, args.zones, version=version)
+        epm = op.Epm.load(path, parse_mode="fast")
+    surfaces = epm.BuildingSurface_Detailed
+    print(f"{len(surfaces)} surfaces, surfaces of one zone (per lookup)")
+
+    duration = _measure(lambda name: surfaces.select(lambda x: x.zone_name.name == name), args.lookups)
+    print(f"  select(lambda): {duration * 1e3:.2f} ms")
+    duration = _measure(lambda name: surfaces.select(zone_name=name), args.lookups)
+    print(f"  select(zone_name=...), no index: {duration * 1e3:.2f} ms")
+
+    surfaces.create_index("zone_name")
+    start = time.perf_counter()
+    surfaces.select(zone_name="zone 0")
+    print(f"  index creation (first lookup): {(time.perf_counter() - start) * 1e3:.2f} ms")
+    duration = _measure(lambda name: surfaces.select(zone_name=name), args.lookups)
+    print(f"  select(zone_name=...), index: {duration * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,19 +5,46 @@ __all__ = ["__version__", "CONF", "Eio", "Mtd", "Err", "SummaryTable", "OutputTa
            "get_eplus_base_dir_path", "WeatherData", "FileContent", "Epm", "default_external_files_dir_name",
            "Idd", "simulate", "Simulation"]
 
+import sys
+import types
+import importlib
+
 from .version import version as __version__
 
 from opyplus.conf import CONF
-from opyplus.eio import Eio
-from opyplus.mtd import Mtd
-from opyplus.err import Err
-from opyplus.summary_table import SummaryTable
-from opyplus.output_table import OutputTable
 from opyplus.idd.api import Idd
 from opyplus.epm.api import default_external_files_dir_name, Epm, FileContent
-from opyplus.weather_data.api import WeatherData
-from opyplus.compatibility.api import get_eplus_base_dir_path
-from opyplus.standard_output.api import StandardOutput
-from opyplus.simulation.api import Simulation, simulate
 from .exceptions import RecordDoesNotExistError, MultipleRecordsReturnedError, FieldValidationError, \
     DatetimeInstantsCreationError
+
+# imported on first access (they require pandas, which is long to import)
+_LAZY_OBJECTS = {  # {name: module_name, ...}
+    "Eio": "opyplus.eio",
+    "Mtd": "opyplus.mtd",
+    "Err": "opyplus.err",
+    "SummaryTable": "opyplus.summary_table",
+    "OutputTable": "opyplus.output_table",
+    "WeatherData": "opyplus.weather_data.api",
+    "get_eplus_base_dir_path": "opyplus.compatibility.api",
+    "StandardOutput": "opyplus.standard_output.api",
+    "Simulation": "opyplus.simulation.api",
+    "simulate": "opyplus.simulation.api"
+}
+
+
+class _LazyModule(types.ModuleType):
+    # module level __getattr__ and __dir__ (PEP 562) require python 3.7, module class is used instead
+
+    def __getattr__(self, name):
+        module_name = _LAZY_OBJECTS.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name), name)
+        setattr(self, name, value)  # next accesses will not go through __getattr__
+        return value
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(_LAZY_OBJECTS))
+
+
+sys.modules[__name__].__class__ = _LazyModule
@@ -1,9 +1,31 @@
 """Opyplus configuration."""
+import os
 
 from .idd.resources import get_latest_idd_version
 
 
-class CONF:
+def _get_user_cache_dir_path():
+    if os.name == "nt":
+        return os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    return os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+
+
+class _ConfMeta(type):
+    # default_idd_version is looked up on first access (idd resources directory is listed)
+    _default_idd_version = None
+
+    @property
+    def default_idd_version(cls):
+        if cls._default_idd_version is None:
+            cls._default_idd_version = get_latest_idd_version()
+        return cls._default_idd_version
+
+    @default_idd_version.setter
+    def default_idd_version(cls, value):
+        cls._default_idd_version = value
+
+
+class CONF(metaclass=_ConfMeta):
     """
     Opyplus configuration class.
 
@@ -14,9 +36,26 @@ class CONF:
     default_model_name: str
     external_files_suffix: str
     default_idd_version: int, int, int
+        use if we create an empty epm without specifying version (default: latest available idd version)
+    idd_cache_dir_path: str or None
+        directory where parsed idds are cached between processes, None to disable disk cache
+    lazy_idd: bool
+        if True, idd table descriptors are parsed on first access (see opyplus.idd.idd.Idd)
+    file_encoding: str or None
+        encoding of input files (idf, idd, epw, eso), if None encoding is detected (see encoding_detection)
+    encoding_detection: {"fast", "sniff", "full"}
+        input files encoding detection strategy:
+         - fast: BOM, else utf-8 if file is valid utf-8, else latin-1
+         - sniff: chardet on the first encoding_sniff_bytes of the file
+         - full: chardet on the whole file (slow on large files)
+    encoding_sniff_bytes: int
     """
 
     encoding = "latin-1"  # even needed for example files...
     default_model_name = "opyplus"
     external_files_suffix = "-external"
-    default_idd_version = get_latest_idd_version()  # use if we create an empty epm without specifying version
+    idd_cache_dir_path = os.path.join(_get_user_cache_dir_path(), "opyplus", "idd")
+    lazy_idd = False
+    file_encoding = None
+    encoding_detection = "fast"
+    encoding_sniff_bytes = 64 * 1024
@@ -0,0 +1,252 @@
+"""
+EnergyPlus epJSON format.
+
+epJSON data is organized as {table_name: {record_name: {field_key: value, ...}, ...}, ...}:
+ - if first field of table is 'Name', it is used as record name (and is not repeated in fields), else record names are
+   generated ('<table_name> <n>'). Records with an empty optional name also get a generated name (which will be their
+   name when imported again).
+ - field keys are field refs (lowercase names, non alphanumeric characters replaced by underscores)
+ - extensible fields are stored in an array of {item_key: value, ...} (one item per cycle), item keys are refs of
+   first cycle without cycle number ('vertex_1_x_coordinate' => 'vertex_x_coordinate'). Array keys are defined by
+   EnergyPlus epJSON schema and are used on export (see _EXTENSIBLE_ARRAY_KEYS, exporting an extensible table that is
+   not referenced raises), any array is accepted on import.
+"""
+import re
+
+from ..idd.util import table_name_to_ref
+
+_CYCLE_NUMBER_PATTERN = re.compile(r"_1(?=_|$)")
+
+_EXTENSIBLE_ARRAY_KEYS = {  # {table_lower_ref: array_key, ...}, for all extensible tables of supported idds
+    "airconditioner_variablerefrigerantflow_fluidtemperaturecontrol": "loading_indices",
+    "airconditioner_variablerefrigerantflow_fluidtemperaturecontrol_hr": "loading_indices",
+    "airflownetwork_distribution_ductviewfactors": "surfaces",
+    "airloophvac_mixer": "nodes",
+    "airloophvac_returnpath": "components",
+    "airloophvac_returnplenum": "nodes",
+    "airloophvac_splitter": "nodes",
+    "airloophvac_supplypath": "components",
+    "airloophvac_supplyplenum": "nodes",
+    "airloophvac_zonemixer": "nodes",
+    "airloophvac_zonesplitter": "nodes",
+    "availabilitymanagerassignmentlist": "managers",
+    "branch": "components",
+    "branchlist": "branches",
+    "buildingsurface_detailed": "vertices",
+    "connector_mixer": "branches",
+    "connector_splitter": "branches",
+    "controller_mechanicalventilation": "zone_specifications",
+    "daylighting_controls": "control_data",
+    "daylightingdevice_tubular": "zones",
+    "demandmanager_electricequipment": "equipment",
+    "demandmanager_exteriorlights": "lights",
+    "demandmanager_lights": "lights",
+    "demandmanager_thermostats": "thermostats",
+    "demandmanager_ventilation": "controllers",
+    "demandmanagerassignmentlist": "manager_data",
+    "electricloadcenter_generators": "generator_outputs",
+    "electricloadcenter_transformer": "meters",
+    "energymanagementsystem_globalvariable": "variables",
+    "energymanagementsystem_program": "lines",
+    "energymanagementsystem_programcallingmanager": "programs",
+    "energymanagementsystem_subroutine": "lines",
+    "fan_systemmodel": "speed_fractions",
+    "floor_detailed": "vertices",
+    "foundation_kiva": "blocks",
+    "generator_fuelcell_airsupply": "constituents",
+    "groundheatexchanger_vertical": "g_functions",
+    "lifecyclecost_useadjustment": "multipliers",
+    "lifecyclecost_usepriceescalation": "escalations",
+    "materialproperty_glazingspectraldata": "data",
+    "matrix_twodimension": "values",
+    "meter_custom": "variable_details",
+    "meter_customdecrement": "variable_details",
+    "nodelist": "nodes",
+    "outdoorair_nodelist": "nodes",
+    "output_table_annual": "variable_details",
+    "output_table_monthly": "variable_details",
+    "output_table_summaryreports": "reports",
+    "parametric_filenamesuffix": "suffixes",
+    "parametric_logic": "lines",
+    "parametric_runcontrol": "runs",
+    "parametric_setvalueforrun": "values",
+    "pipingsystem_underground_domain": "pipe_circuits",
+    "pipingsystem_underground_pipecircuit": "pipe_segments",
+    "refrigeration_caseandwalkinlist": "cases_and_walkins",
+    "refrigeration_compressorlist": "compressors",
+    "refrigeration_transferloadlist": "transfer_loads",
+    "refrigeration_walkin": "zone_data",
+    "roofceiling_detailed": "vertices",
+    "roomair_node_airflownetwork_adjacentsurfacelist": "surfaces",
+    "roomair_node_airflownetwork_hvacequipment": "equipment",
+    "roomair_node_airflownetwork_internalgains": "gains",
+    "roomair_temperaturepattern_nondimensionalheight": "pairs",
+    "roomair_temperaturepattern_surfacemapping": "surface_deltas",
+    "roomairsettings_airflownetwork": "nodes",
+    "schedule_compact": "data",
+    "schedule_day_interval": "data",
+    "schedule_day_list": "values",
+    "schedule_week_compact": "data",
+    "schedule_year": "schedule_weeks",
+    "shading_building_detailed": "vertices",
+    "shading_site_detailed": "vertices",
+    "shading_zone_detailed": "vertices",
+    "site_spectrumdata": "spectrum_data",
+    "solarcollector_unglazedtranspired": "surfaces",
+    "solarcollector_unglazedtranspired_multisystem": "systems",
+    "surfaceproperty_exposedfoundationperimeter": "surfaces",
+    "surfaceproperty_exteriornaturalventedcavity": "surface",
+    "surfaceproperty_heattransferalgorithm_surfacelist": "surface",
+    "surfaceproperty_surroundingsurfaces": "surfaces",
+    "table_multivariablelookup": "values",
+    "table_oneindependentvariable": "values",
+    "table_twoindependentvariables": "values",
+    "unitarysystemperformance_heatpump_multispeed": "flow_ratios",
+    "unitarysystemperformance_multispeed": "flow_ratios",
+    "wall_detailed": "vertices",
+    "wateruse_connections": "connections",
+    "wateruse_raincollector": "surfaces",
+    "windowmaterial_glazinggroup_thermochromic": "temperature_data",
+    "zonehvac_baseboard_radiantconvective_electric": "surface_fractions",
+    "zonehvac_baseboard_radiantconvective_steam": "surface_fractions",
+    "zonehvac_baseboard_radiantconvective_water": "surface_fractions",
+    "zonehvac_coolingpanel_radiantconvective_water": "surface_fractions",
+    "zonehvac_equipmentlist": "equipment",
+    "zonehvac_hightemperatureradiant": "surface_fractions",
+    "zonehvac_lowtemperatureradiant_surfacegroup": "surface_fractions",
+    "zonehvac_refrigerationchillerset": "chillers",
+    "zonehvac_ventilatedslab_slabgroup": "data",
+    "zonelist": "zones",
+    "zoneproperty_userviewfactors_bysurfacename": "view_factors",
+    "zoneterminalunitlist": "terminal_units"
+}
+
+
+def _has_name_key(table_descriptor):
+    return table_descriptor.field_descriptors[0].ref == "name"
+
+
+def _get_item_keys(table_descriptor):
+    # extensible item keys, by cycle position
+    cycle_start, cycle_len, _ = table_descriptor.extensible_info
+    return [
+        _CYCLE_NUMBER_PATTERN.sub("", table_descriptor.field_descriptors[cycle_start + i].ref)
+        for i in range(cycle_len)
+    ]
+
+
+def _get_array_key(table_descriptor):
+    try:
+        return _EXTENSIBLE_ARRAY_KEYS[table_descriptor.table_ref.lower()]
+    except KeyError:
+        raise ValueError(
+            f"epJSON extensible array key of table '{table_descriptor.table_name}' is unknown, can't export it."
+        ) from None
+
+
+def iter_records(epjson_data, idd):
+    """
+    Iterate on records of epjson data.
+
+    Parameters
+    ----------
+    epjson_data: dict
+    idd: opyplus.idd.idd.Idd
+
+    Returns
+    -------
+    typing.Iterator[tuple]
+        (table_ref, record_data), record_data keys are indexes (base fields may be refs)
+
+    Raises
+    ------
+    KeyError: if a table does not exist in idd
+    AttributeError: if an extensible item key does not exist in its table
+    """
+    for table_name, records_data in epjson_data.items():
+        table_ref = table_name_to_ref(table_name)
+        td = idd.table_descriptors[table_ref.lower()]
+        has_name_key = _has_name_key(td)
+        item_positions = None  # {item_key: cycle_position, ...}, prepared on first use
+
+        for record_name, fields_data in records_data.items():
+            record_data = {0: record_name} if has_name_key else {}
+            for key, value in fields_data.items():
+                if not isinstance(value, list):
+                    record_data[key] = value
+                    continue
+
+                # extensible array
+                if item_positions is None:
+                    item_positions = dict((k, i) for i, k in enumerate(_get_item_keys(td)))
+                cycle_start, cycle_len, _ = td.extensible_info
+                for cycle_num, item_data in enumerate(value):
+                    for item_key, item_value in item_data.items():
+                        try:
+                            item_position = item_positions[item_key]
+                        except KeyError:
+                            raise AttributeError(
+                                f"No extensible field of '{td.table_name}' has ref '{item_key}' "
+                                f"(record '{record_name}', array '{key}').\nAvailable extensible fields: \n - " +
+                                "\n - ".join(item_positions)
+                            ) from None
+                        record_data[cycle_start + cycle_num * cycle_len + item_position] = item_value
+
+            yield table_ref, record_data
+
+
+def to_epjson_data(epm, model_name=None):
+    """
+    Get epjson data of an epm.
+
+    Parameters
+    ----------
+    epm: opyplus.Epm
+    model_name: str or None
+        if given, will be used as external file directory base name
+
+    Returns
+    -------
+    dict
+
+    Raises
+    ------
+    ValueError: if an extensible table has no known epJSON array key
+    """
+    epjson_data = {}
+    # Version table first (table order has no meaning, but it is easier to read)
+    tables = sorted(epm._get_created_tables(), key=lambda t: t.get_ref().lower() != "version")
+    for table in tables:
+        if len(table) == 0:
+            continue
+        td = table._dev_descriptor
+        has_name_key = _has_name_key(td)
+        if td.extensible_info is not None:
+            cycle_start, cycle_len, _ = td.extensible_info
+            item_keys = _get_item_keys(td)
+            array_key = _get_array_key(td)
+        else:
+            cycle_start = None
+
+        records_data = {}
+        for i, record in enumerate(sorted(table)):
+            fields_data = {}
+            for index, _ in record._dev_iter_items():
+                if has_name_key and index == 0:
+                    continue
+                value = record.get_serialized_value(index, model_name=model_name)
+                if (cycle_start is None) or (index < cycle_start):
+                    fields_data[td.field_descriptors[index].ref] = value
+                    continue
+
+                # extensible
+                items = fields_data.setdefault(array_key, [])
+                cycle_num, cycle_position = divmod(index - cycle_start, cycle_len)
+                while len(items) <= cycle_num:
+                    items.append({})
+                items[cycle_num][item_keys[cycle_position]] = value
+            record_name = record.get_serialized_value(0) if has_name_key else None
+            records_data[f"{td.table_name} {i + 1}" if record_name is None else record_name] = fields_data
+        epjson_data[td.table_name] = records_data
+
+    return epjson_data
@@ -10,7 +10,12 @@ create/update/delete framework methods (see methods documentation):
 """
 
 import os
+import io
 import collections
+import contextlib
+import itertools
+import hashlib
+import concurrent.futures
 import textwrap
 import json
 import logging
@@ -18,15 +23,64 @@ import logging
 from .. import CONF
 from ..util import get_multi_line_copyright_message, to_buffer, version_str_to_version
 from ..idd.idd import Idd
+from ..idd.util import table_name_to_ref
+from ..exceptions import FieldValidationError
 from .table import Table
 from .record import Record
 from .relations_manager import RelationsManager
 from .external_files_manager import ExternalFilesManager
-from .external_file import get_external_files_dir_name
-from .parse_idf import parse_idf
+from .external_file import get_external_files_dir_name, ExternalFile, NONE_EXTERNAL_FILE
+from .link import Link
+from .record_hook import RecordHook
+from .parse_idf import iter_idf, iter_idf_fast, iter_idf_mmap
+from . import snapshot, epjson
 from .util import json_data_to_json, multi_mode_write
 
 
+_IDF_PARSE_MODES = {  # {parse_mode: iter_fct, ...}
+    "stream": iter_idf,
+    "fast": iter_idf_fast,
+    "mmap": iter_idf_mmap
+}
+_PATH_PARSE_MODES = {"mmap"}  # iter_fct is called with file path (not buffer)
+
+
+def _init_load_many_worker(idd_versions):
+    # load idds once per worker (following loads use the idd cache)
+    if len(idd_versions) > 0:
+        Idd.preload(idd_versions)
+
+
+def _load_snapshot(epm_cls, path, load_kwargs):
+    # executed by load_many workers: epm is sent back as a snapshot (much lighter to transfer than a pickled epm)
+    buffer = io.BytesIO()
+    epm_cls.load(path, **load_kwargs).to_snapshot(buffer)
+    return buffer.getvalue()
+
+
+def _get_idf_block(table_ref, record_data):
+    # digest of raw record data (must be computed before record creation, which consumes it), raw values can't contain
+    # ',' nor '\n' (comment may)
+    content = ",".join(itertools.chain(
+        (table_ref.lower(),),
+        (value for key, value in record_data.items() if key != "_comment")
+    )) + "\n" + record_data.get("_comment", "")
+    return hashlib.blake2b(content.encode("utf-8", "backslashreplace"), digest_size=16).digest()
+
+
+def _get_raw_record_id(table, raw_name, trusted=False):
+    # id a record of a pk table would have if created with given raw name, None if it can't be known without creating
+    # the record
+    if raw_name is None:
+        return None
+    value = table._dev_descriptor.get_field_descriptor(0).deserialize(raw_name, 0, trusted=trusted)
+    if isinstance(value, RecordHook):
+        return value.target_value
+    if isinstance(value, (Link, ExternalFile)):
+        return None
+    return value
+
+
 def default_external_files_dir_name(model_name):
     """
     Get default dir name for external files.
@@ -43,6 +97,17 @@ def default_external_files_dir_name(model_name):
     return name + CONF.external_files_suffix
 
 
+def _get_scan_value(value):
+    # deserialized value -> json compatible value
+    if isinstance(value, RecordHook):
+        return value.target_value
+    if isinstance(value, Link):
+        return value.initial_hook_value
+    if isinstance(value, ExternalFile):
+        return None if value is NONE_EXTERNAL_FILE else value.ref
+    return value
+
+
 logger = logging.getLogger(__name__)
 
 
@@ -51,8 +116,8 @@ class Epm:
     Energyplus model.
 
     An Epm is an Energy Plus Model.
-    It can come from and idf, a epjson (not coded yet), or a json.
-    It can be transformed in an idf, an epjson (not coded yet) or a json.
+    It can come from and idf, an epjson, or a json.
+    It can be transformed in an idf, an epjson or a json.
 
     Parameters
     ----------
@@ -84,33 +149,13 @@ class Epm:
 
     def __init__(self, json_data=None, check_required=True, check_length=True, idd_or_version=None):
         # prepare idd
-        self._dev_idd = None
-        if isinstance(idd_or_version, Idd):
-            self._dev_idd = idd_or_version
-        elif idd_or_version is not None:
-            self._dev_idd = self._dev_idd_cls._dev_get_from_cache(idd_or_version)
-        elif json_data is not None:
-            if isinstance(json_data, str):
-                raise TypeError(f"json_data must be a dict like, but '{type(json_data)}' was given")
-            if "Version" in json_data and len(json_data["Version"]) > 0:
-                version_record = json_data["Version"][0]
-                if 0 in version_record:
-                    version_str = version_record[0]
-                elif "version_identifier" in version_record:
-                    version_str = version_record["version_identifier"]
-                else:
-                    raise RuntimeError(
-                        f"could not understand json_data version. json_data table: {json_data['Version']}"
-                    )
-                version = version_str_to_version(version_str)
-                self._dev_idd = self._dev_idd_cls._dev_get_from_cache(version)
-            else:
-                logger.warning(
-                    f"given json_data does not contain a Version table, will use default eplus_version idd "
-                    f"({CONF.default_idd_version})"
-                )
-        if self._dev_idd is None:
-            self._dev_idd = self._dev_idd_cls._dev_get_from_cache(CONF.default_idd_version)
+        if isinstance(json_data, str):
+            raise TypeError(f"json_data must be a dict like, but '{type(json_data)}' was given")
+        self._dev_idd = self._get_idd(
+            idd_or_version,
+            None if json_data is None else json_data.get("Version"),
+            json_data is not None
+        )
 
         # !! relations manager must be defined before table creation because table creation will trigger
         # hook registering
@@ -119,20 +164,100 @@ class Epm:
         # external files manager
         self._dev_external_files_manager = ExternalFilesManager(self)
 
-        self._tables = collections.OrderedDict(sorted([  # {lower_ref: table, ...}
-            (table_descriptor.table_ref.lower(), Table(table_descriptor, self))
-            for table_descriptor in self._dev_idd.table_descriptors.values()
-        ]))
+        # tables are created on first access (see _dev_get_table): most models only use a few idd tables
+        self._tables = {}  # {lower_ref: table, ...}
 
         self._dev_check_required = check_required
         self._dev_check_length = check_length
         self._comment = ""
 
+        # idf blocks digests of records that were created from idf and not modified since (see update_from_idf)
+        self._dev_idf_blocks = {}  # {record: idf block digest, ...}
+
+        # records to check and activate when leaving bulk mode (see bulk), None if not in bulk mode
+        self._dev_bulk_records = None  # {record: None, ...} (ordered set)
+
         # load json_data if relevant
         if json_data is not None:
             self._dev_populate_from_json_data(json_data)
 
     # ------------------------------------------ private ---------------------------------------------------------------
+    @classmethod
+    def _get_idd(cls, idd_or_version, version_records_data, warn_if_no_version):
+        if isinstance(idd_or_version, Idd):
+            return idd_or_version
+        if idd_or_version is not None:
+            return cls._dev_idd_cls._dev_get_from_cache(idd_or_version)
+        if version_records_data is not None and len(version_records_data) > 0:
+            version_record = version_records_data[0]
+            if 0 in version_record:
+                version_str = version_record[0]
+            elif "version_identifier" in version_record:
+                version_str = version_record["version_identifier"]
+            else:
+                raise RuntimeError(
+                    f"could not understand json_data version. json_data table: {version_records_data}"
+                )
+            return cls._dev_idd_cls._dev_get_from_cache(version_str_to_version(version_str))
+        if warn_if_no_version:
+            logger.warning(
+                f"given json_data does not contain a Version table, will use default eplus_version idd "
+                f"({CONF.default_idd_version})"
+            )
+        return cls._dev_idd_cls._dev_get_from_cache(CONF.default_idd_version)
+
+    @classmethod
+    def _get_idd_from_records(cls, records, idd_or_version):
+        # records are buffered until version record is found (usually one of the first records)
+        buffered_records = []
+        version_records_data = None
+        if idd_or_version is None:
+            for table_ref, record_data in records:
+                buffered_records.append((table_ref, record_data))
+                if table_ref.lower() == "version":
+                    version_records_data = [record_data]
+                    break
+
+        # return idd and all records
+        return (
+            cls._get_idd(idd_or_version, version_records_data, True),
+            itertools.chain(buffered_records, records)
+        )
+
+    @classmethod
+    def _create_from_records_iterator(
+            cls,
+            iter_fct,
+            buffer_or_path,
+            idd_or_version=None,
+            check_required=True,
+            check_length=True,
+            from_path=False,
+            trusted=False
+    ):
+        def create(records):
+            idd, records = cls._get_idd_from_records(records, idd_or_version)
+
+            # create epm and populate
+            epm = cls(
+                check_required=check_required,
+                check_length=check_length,
+                idd_or_version=idd
+            )
+            epm._dev_populate_from_records(records, store_idf_blocks=True, trusted=trusted)
+            return epm
+
+        # iter_fct opens file itself
+        if from_path:
+            if not isinstance(buffer_or_path, str):
+                raise TypeError(f"a file path is required, got {type(buffer_or_path)}")
+            return create(iter_fct(buffer_or_path))
+
+        # prepare buffer
+        _source_file_path, buffer = to_buffer(buffer_or_path)
+        with buffer as f:
+            return create(iter_fct(f))
+
     @classmethod
     def _create_from_buffer_or_path(
             cls,
@@ -157,7 +282,34 @@ class Epm:
             idd_or_version=idd_or_version
         )
 
+    def _get_created_tables(self):
+        # sorted by lower ref
+        return [table for _, table in sorted(self._tables.items())]
+
     # ------------------------------------------ dev api ---------------------------------------------------------------
+    def _dev_get_table(self, table_lower_ref):
+        """
+        Get table, create it if it was not already done.
+
+        Parameters
+        ----------
+        table_lower_ref: str
+
+        Returns
+        -------
+        Table
+
+        Raises
+        ------
+        KeyError: if table does not exist in idd
+        """
+        table = self._tables.get(table_lower_ref)
+        if table is None:
+            # table creation registers table hooks
+            table = Table(self._dev_idd.table_descriptors[table_lower_ref], self)
+            self._tables[table_lower_ref] = table
+        return table
+
     def _dev_populate_from_json_data(self, json_data):
         """!! Must only be called once, when empty !!."""
         # workflow
@@ -180,26 +332,95 @@ class Epm:
         self._dev_external_files_manager.populate_from_json_data(external_files_data)
 
         # manage records
+        self._dev_populate_from_records(
+            (table_ref, record_data)
+            for table_ref, records_data in json_data.items()
+            for record_data in records_data
+        )
+
+    def _dev_populate_from_records(self, records, store_idf_blocks=False, trusted=False):
+        """
+        !! Must only be called once, when empty !!.
+
+        Parameters
+        ----------
+        records: typing.Iterable[tuple]
+            (table_ref, record_data), record_data are consumed one by one (see opyplus.epm.parse_idf.iter_idf),
+            ("_comment", comment) may be given to set epm comment
+        store_idf_blocks: bool
+            if True, records data are raw idf values, they are stored as idf blocks (see update_from_idf)
+        trusted: bool
+            if True, records data are raw idf values written by opyplus (see FieldDescriptor.deserialize)
+        """
+        # workflow: see _dev_populate_from_json_data
         added_records = []
-        for table_ref, json_data_records in json_data.items():
+        tables = {}  # {table_ref: table, ...}
+        for table_ref, record_data in records:
+            # manage comment
+            if table_ref == "_comment":
+                self._comment = record_data
+                continue
+
             # find table
-            table = getattr(self, table_ref)
+            table = tables.get(table_ref)
+            if table is None:
+                table = getattr(self, table_ref)
+                tables[table_ref] = table
 
             # create record (inert)
-            records = table._dev_add_inert(json_data_records)
+            block = _get_idf_block(table_ref, record_data) if store_idf_blocks else None
+            record, = table._dev_add_inert([record_data], trusted=trusted)
+            added_records.append(record)
+            if block is not None:
+                self._dev_idf_blocks[record] = block
 
-            # add records (inert)
-            added_records.extend(records)
+        # activate
+        self._dev_activate_records(added_records)
+
+    def _dev_activate_records(self, records):
+        """
+        Activate hooks, then links and external files of records that were added or updated inert.
+
+        Parameters
+        ----------
+        records: typing.Iterable[Record]
+
+        Notes
+        -----
+        In bulk mode, nothing is done: records were registered by Record._update_inert and will be activated when
+        leaving bulk mode.
+        """
+        if self._dev_bulk_records is not None:
+            return
 
         # activate hooks
-        for r in added_records:
+        records = list(records)
+        for r in records:
             r._dev_activate_hooks()
 
         # activate links and external files
-        for r in added_records:
+        for r in records:
             r._dev_activate_links()
             r._dev_activate_external_files()
 
+    def _dev_end_bulk(self, records):
+        # check required fields, then activate hooks, links and external files, errors are gathered
+        records = [r for r in records if r._table is not None]  # records may have been deleted meanwhile
+        steps = [Record._dev_activate_hooks, Record._dev_activate_links, Record._dev_activate_external_files]
+        if self._dev_check_required:
+            steps.insert(0, Record._dev_check_required_fields)
+        errors = []
+        for step in steps:
+            for r in records:
+                try:
+                    step(r)
+                except FieldValidationError as e:
+                    errors.append(str(e))
+        if len(errors) > 0:
+            raise FieldValidationError(
+                f"{len(errors)} error(s) while leaving bulk mode:\n - " + "\n - ".join(errors)
+            )
+
     # --------------------------------------------- public api ---------------------------------------------------------
     # python magic
     def __repr__(self):
@@ -222,7 +443,7 @@ class Epm:
         """
         s = "Epm\n"
 
-        for table in self._tables.values():
+        for table in self._get_created_tables():
             records_nb = len(table)
             if records_nb == 0:
                 continue
@@ -248,7 +469,7 @@ class Epm:
         AttributeError
         """
         try:
-            return self._tables[item.lower()]
+            return self._dev_get_table(item.lower())
         except KeyError:
             raise AttributeError(f"No table with reference '{item}'.")
 
@@ -273,12 +494,16 @@ class Epm:
         Returns
         -------
         typing.Iterator[Table]
+
+        Notes
+        -----
+        All tables of the idd are created.
         """
-        return iter(self._tables.values())
+        return (self._dev_get_table(table_lower_ref) for table_lower_ref in sorted(self._dev_idd.table_descriptors))
 
     def __dir__(self):
         """Attributes available for auto-completion: add the tables ref."""
-        return [t.get_ref() for t in self._tables.values()] + list(self.__dict__)
+        return [td.table_ref for td in self._dev_idd.table_descriptors.values()] + list(self.__dict__)
 
     # get info
     def get_comment(self):
@@ -301,7 +526,8 @@ class Epm:
         str
         """
         return "Energy plus model\n" + "\n".join(
-            f"  {table._dev_descriptor.table_ref}" for table in self._tables.values()
+            f"  {self._dev_idd.table_descriptors[table_lower_ref].table_ref}"
+            for table_lower_ref in sorted(self._dev_idd.table_descriptors)
         )
 
     def get_external_files(self):
@@ -313,7 +539,7 @@ class Epm:
         list of opyplus.epm.external_file.ExternalFile
         """
         external_files = []
-        for table in self._tables.values():
+        for table in self._get_created_tables():
             for r in table:
                 external_files.extend([ef for ef in r.get_external_files()])
         return external_files
@@ -333,10 +559,53 @@ class Epm:
 
     def set_defaults(self):
         """All fields of Epm with a default value and that are null will be set to their default value."""
-        for table in self._tables.values():
+        for table in self._get_created_tables():
             for r in table:
                 r.set_defaults()
 
+    @contextlib.contextmanager
+    def bulk(self):
+        """
+        Context manager that defers validation and relations of added or updated records until it is left.
+
+        Inside bulk mode, fields values are still deserialized when records are added or updated, but required fields
+        are checked, and hooks, links and external files are registered in a single pass when leaving bulk mode. Links
+        may therefore point on records that are added later in the same bulk. All errors are reported together.
+
+        Raises
+        ------
+        FieldValidationError
+            when leaving bulk mode, if some records are not valid (message contains all errors)
+
+        Notes
+        -----
+        Until bulk mode is left, relations of added or updated records are not available (pointing and pointed
+        records, serialization of links). If an error is raised when leaving bulk mode, epm may be left partially
+        validated. If an error is raised inside bulk mode, it is propagated and records added or updated in bulk mode
+        are neither validated nor activated (epm should not be used anymore). Nested bulk modes are merged into the
+        outermost one.
+
+        Examples
+        --------
+        with epm.bulk():
+            for i in range(1000):
+                epm.BuildingSurface_Detailed.add(name=f"surface {i}", zone_name=f"zone {i}", ...)
+                epm.Zone.add(name=f"zone {i}")
+        """
+        if self._dev_bulk_records is not None:
+            yield
+            return
+
+        self._dev_bulk_records = {}
+        try:
+            yield
+        except BaseException:
+            # original error is raised, records of bulk are not validated
+            self._dev_bulk_records = None
+            raise
+        records, self._dev_bulk_records = self._dev_bulk_records, None
+        self._dev_end_bulk(records)
+
     def dump_external_files(self, target_dir_path):
         """
         Dump external files.
@@ -356,11 +625,17 @@ class Epm:
         dict
             A dictionary of serialized data.
         """
-        # create data
-        d = collections.OrderedDict((t.get_ref(), t.to_json_data()) for t in self._tables.values())
+        # create data (tables that were not created are empty)
+        d = collections.OrderedDict()
+        for table_lower_ref in sorted(self._dev_idd.table_descriptors):
+            table = self._tables.get(table_lower_ref)
+            if table is None:
+                d[self._dev_idd.table_descriptors[table_lower_ref].table_ref] = []
+            else:
+                d[table.get_ref()] = table.to_json_data()
         d["_comment"] = self._comment
         d.move_to_end("_comment", last=False)
-        d["_external_files"] = self._dev_external_files_manager
+        d["_external_files"] = self._dev_external_files_manager.get_json_data()
         return d
 
     # ------------------------------------------- save/load ------------------------------------------------------------
@@ -370,7 +645,9 @@ class Epm:
             buffer_or_path,
             check_required=True,
             check_length=True,
-            idd_or_version=None
+            idd_or_version=None,
+            parse_mode="stream",
+            trusted=False
     ):
         """
         Load Epm from a file.
@@ -391,18 +668,167 @@ class Epm:
         idd_or_version: tuple or Idd
             If you want to use a specific idd, you can require a specific version (x.x.x),
             or directly provide an IDD object.
+        parse_mode: {"stream", "fast", "mmap"}
+            "stream" (default): file is parsed line by line, records are created as soon as they are parsed (lower
+            memory usage).
+            "fast": whole file is read and tokenized at once (faster, but file content is stored in memory).
+            "mmap": file is memory-mapped and parsed line by line from raw bytes, only record contents are decoded
+            (lowest memory usage for huge files, buffer_or_path must be a path).
+        trusted: bool
+            If True, idf is considered as written by opyplus (Epm.save): its values are already normalized (mono
+            spaced, ASCII, lower case, not too long), so their normalization is skipped (faster deserialization).
+            !! Must not be used on idfs that were written or edited by other tools. !!
 
         Returns
         -------
         Epm
         """
-        return cls().from_idf(
+        return cls.from_idf(
             buffer_or_path,
             check_required=check_required,
             check_length=check_length,
-            idd_or_version=idd_or_version
+            idd_or_version=idd_or_version,
+            parse_mode=parse_mode,
+            trusted=trusted
         )
 
+    @classmethod
+    def load_many(
+            cls,
+            paths,
+            workers=None,
+            snapshots=False,
+            as_completed=False,
+            check_required=True,
+            check_length=True,
+            idd_or_version=None,
+            parse_mode="stream",
+            trusted=False
+    ):
+        """
+        Load multiple idf files in parallel, in a process pool.
+
+        Parameters
+        ----------
+        paths: typing.Iterable[str]
+            idf paths
+        workers: int or None
+            number of worker processes, if None the number of cpus is used. If 1, files are loaded in current process.
+        snapshots: bool
+            if True, epm snapshots are returned (bytes, see Epm.from_snapshot) instead of epms
+        as_completed: bool
+            if False (default), all results are returned in a list, in paths order.
+            if True, an iterator is returned, that yields results as soon as files are loaded (not in paths order).
+            Only a few files are loaded in advance, so memory usage is bounded even for a very large number of paths.
+        check_required: bool
+            see load
+        check_length: bool
+            see load
+        idd_or_version: tuple or None
+            see load (idd objects are not accepted, only versions: each worker uses its own idd cache)
+        parse_mode: {"stream", "fast", "mmap"}
+            see load
+        trusted: bool
+            see load
+
+        Returns
+        -------
+        list or typing.Iterator[tuple]
+            if as_completed is False: [result, ...]
+            if as_completed is True: iterator of (path, result)
+            result is an Epm (or snapshot bytes if snapshots is True), or the exception that was raised while loading
+            the file (an error does not stop the other loads).
+            If a worker process dies, files that were being loaded by the pool get a BrokenProcessPool error, following
+            files are loaded in a new pool.
+
+        Notes
+        -----
+        Idds are loaded before pool creation when idd_or_version is given, so forked workers inherit them.
+        """
+        if isinstance(idd_or_version, Idd):
+            raise TypeError("load_many only accepts an idd version (not an Idd object)")
+        idd_versions = [] if idd_or_version is None else [idd_or_version]
+        load_kwargs = dict(
+            check_required=check_required,
+            check_length=check_length,
+            idd_or_version=idd_or_version,
+            parse_mode=parse_mode,
+            trusted=trusted
+        )
+
+        if as_completed:
+            return (
+                (path, result) for _, path, result in
+                cls._iter_load_many(paths, workers, snapshots, idd_versions, load_kwargs)
+            )
+
+        # gather results in paths order
+        paths = list(paths)
+        results = [None] * len(paths)
+        for position, _, result in cls._iter_load_many(paths, workers, snapshots, idd_versions, load_kwargs):
+            results[position] = result
+        return results
+
+    @classmethod
+    def _iter_load_many(cls, paths, workers, snapshots, idd_versions, load_kwargs):
+        # yields (position, path, result) as soon as files are loaded
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        # load in current process
+        if workers == 1:
+            for position, path in enumerate(paths):
+                try:
+                    result = _load_snapshot(cls, path, load_kwargs) if snapshots else cls.load(path, **load_kwargs)
+                except Exception as e:
+                    result = e
+                yield position, path, result
+            return
+
+        # load in process pool
+        if len(idd_versions) > 0:
+            Idd.preload(idd_versions)  # forked workers will inherit loaded idds
+
+        def create_executor():
+            return concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_load_many_worker,
+                initargs=(idd_versions,)
+            )
+
+        executor = create_executor()
+        try:
+            positions_and_paths = enumerate(paths)
+            pending = {}  # {future: (position, path), ...}
+            max_pending_nb = 2 * workers  # bounded memory: paths are only submitted when previous ones are loaded
+            while True:
+                for position, path in itertools.islice(positions_and_paths, max_pending_nb - len(pending)):
+                    try:
+                        future = executor.submit(_load_snapshot, cls, path, load_kwargs)
+                    except concurrent.futures.process.BrokenProcessPool:
+                        # a worker died: pending loads fail (they are reported as errors), following paths are
+                        # loaded in a new pool
+                        executor.shutdown()
+                        executor = create_executor()
+                        future = executor.submit(_load_snapshot, cls, path, load_kwargs)
+                    pending[future] = position, path
+                if len(pending) == 0:
+                    break
+
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    position, path = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = e
+                    else:
+                        if not snapshots:
+                            result = cls.from_snapshot(io.BytesIO(result))
+                    yield position, path, result
+        finally:
+            executor.shutdown()
+
     def save(self, buffer_or_path=None, dump_external_files=True):
         """
         Save Epm to a file.
@@ -429,15 +855,22 @@ class Epm:
             buffer_or_path,
             check_required=True,
             check_length=True,
-            idd_or_version=None
+            idd_or_version=None,
+            parse_mode="stream",
+            trusted=False
     ):
         """See load."""
-        return cls._create_from_buffer_or_path(
-            parse_idf,
+        iter_fct = _IDF_PARSE_MODES.get(parse_mode)
+        if iter_fct is None:
+            raise ValueError(f"unknown parse mode: {parse_mode}")
+        return cls._create_from_records_iterator(
+            iter_fct,
             buffer_or_path,
             check_required=check_required,
             check_length=check_length,
-            idd_or_version=idd_or_version
+            idd_or_version=idd_or_version,
+            from_path=parse_mode in _PATH_PARSE_MODES,
+            trusted=trusted
         )
 
     def to_idf(self, buffer_or_path=None, dump_external_files=True):
@@ -463,7 +896,7 @@ class Epm:
 
         # prepare body
         formatted_records = []
-        for table_ref, table in self._tables.items():  # self._tables is already sorted
+        for table in self._get_created_tables():
             formatted_records.extend([r.to_idf(model_name=model_name) for r in sorted(table)])
         body = "\n\n".join(formatted_records)
 
@@ -475,6 +908,208 @@ class Epm:
             buffer_or_path
         )
 
+    def update_from_idf(self, buffer_or_path, parse_mode="stream", trusted=False):
+        """
+        Update epm so that it matches an edited version of its idf.
+
+        New idf is compared to current epm record by record (idf object by idf object). Unchanged records are kept as
+        is (they are not deserialized nor checked again). Changed records are updated if a current record of the same
+        table has the same name (records of tables without name are matched by order), else they are created. Records
+        that disappeared are deleted. Update cost is therefore proportional to the size of the edit, not to the size of
+        the model.
+
+        Parameters
+        ----------
+        buffer_or_path: str or typing.StringIO
+            idf buffer or path
+        parse_mode: {"stream", "fast", "mmap"}
+            see load
+        trusted: bool
+            see load
+
+        Notes
+        -----
+        A record is known to be unchanged if its idf content is strictly identical to the one it was created from
+        (by load or by a previous update). Records that were modified in python since, and records that were not created
+        from an idf (json, snapshot, table.add...), are always updated.
+
+        If new idf is not valid, an error is raised and epm may be left partially updated.
+        """
+        # workflow
+        # --------
+        # (same steps as create/update/delete framework: update inert, delete, add inert, then activate)
+        # 1. match new idf blocks with current records idf blocks (unchanged records)
+        # 2. match remaining blocks with remaining records of same table and id (updated records),
+        #    other blocks are added and other records deleted
+        # 3. unchanged records that point on deleted records are updated (their links are removed by deletion)
+
+        iter_fct = _IDF_PARSE_MODES.get(parse_mode)
+        if iter_fct is None:
+            raise ValueError(f"unknown parse mode: {parse_mode}")
+        if parse_mode in _PATH_PARSE_MODES:
+            if not isinstance(buffer_or_path, str):
+                raise TypeError(f"a file path is required, got {type(buffer_or_path)}")
+            records = list(iter_fct(buffer_or_path))
+        else:
+            _source_file_path, buffer = to_buffer(buffer_or_path)
+            with buffer as f:
+                records = list(iter_fct(f))
+
+        # 1. unchanged records
+        records_by_block = {}  # {block: [record, ...], ...}
+        for record, block in self._dev_idf_blocks.items():
+            records_by_block.setdefault(block, []).append(record)
+        comment = ""
+        unchanged_records = {}  # {record: record_data, ...}
+        changed_blocks = []  # [(table, block, record_data), ...]
+        for table_ref, record_data in records:
+            if table_ref == "_comment":
+                comment = record_data
+                continue
+            block = _get_idf_block(table_ref, record_data)
+            same_block_records = records_by_block.get(block)
+            if same_block_records:
+                unchanged_records[same_block_records.pop()] = record_data
+                continue
+            changed_blocks.append((getattr(self, table_ref), block, record_data))
+
+        # 2. updated, added and deleted records
+        remaining_records = {}  # {(table, id): record, ...}
+        remaining_no_pk_records = {}  # {table: [record, ...], ...}, are matched by order
+        for table in self._get_created_tables():
+            for record in table:
+                if record in unchanged_records:
+                    continue
+                if table._dev_no_pk:
+                    remaining_no_pk_records.setdefault(table, []).append(record)
+                else:
+                    remaining_records[(table, record.id)] = record
+        to_update, to_add = [], []  # [(record_or_table, block, record_data), ...]
+        for table, block, record_data in changed_blocks:
+            if table._dev_no_pk:
+                table_records = remaining_no_pk_records.get(table)
+                record = table_records.pop(0) if table_records else None
+            else:
+                record_id = _get_raw_record_id(table, record_data.get(0), trusted=trusted)
+                record = None if record_id is None else remaining_records.pop((table, record_id), None)
+            if record is None:
+                to_add.append((table, block, record_data))
+            else:
+                to_update.append((record, block, record_data))
+        to_delete = list(remaining_records.values())
+        for table_records in remaining_no_pk_records.values():
+            to_delete.extend(table_records)
+
+        # 3. unchanged records pointing on deleted records
+        links_by_target = self._dev_relations_manager._links_by_target
+        for record in to_delete:
+            for pointing_record in set(link.source_record for link in links_by_target.get(record, ())):
+                if pointing_record in unchanged_records:
+                    record_data = unchanged_records.pop(pointing_record)
+                    to_update.append((pointing_record, self._dev_idf_blocks[pointing_record], record_data))
+
+        # update inert (before deletion: removes links on deleted records, which may be required fields)
+        touched_records = []  # [(record, block), ...]
+        for record, block, record_data in to_update:
+            # id did not change: it is not updated (would needlessly update hook)
+            start = 0 if record.get_table()._dev_no_pk else 1
+            record_comment = record_data.pop("_comment", "")
+            record._update_inert(
+                dict((i, record_data.get(i)) for i in range(start, max(len(record), len(record_data)))),
+                trusted=trusted
+            )
+            record.set_comment(record_comment)
+            touched_records.append((record, block))
+
+        # delete (links first, for the same reason)
+        for record in to_delete:
+            record._unregister_links()
+        for record in to_delete:
+            record._dev_delete_without_unregistering_links()
+
+        # add inert
+        for table, block, record_data in to_add:
+            record, = table._dev_add_inert([record_data], trusted=trusted)
+            touched_records.append((record, block))
+
+        # activate
+        self._dev_activate_records(record for record, _ in touched_records)
+
+        # store new idf blocks
+        for record, block in touched_records:
+            self._dev_idf_blocks[record] = block
+        self._comment = comment
+
+    @classmethod
+    def scan(cls, buffer_or_path, tables, idd_or_version=None):
+        """
+        Read the records of some tables of an idf, without creating an Epm.
+
+        Records of other tables are skipped without being parsed, and no links are created: much faster than load
+        when only a few tables are needed (for example Version, RunPeriod or Output:Variable).
+
+        Parameters
+        ----------
+        buffer_or_path: str or typing.StringIO
+            idf buffer or path
+        tables: typing.Iterable[str]
+            table names or refs (case insensitive)
+
+        Other Parameters
+        ----------------
+        idd_or_version: tuple or Idd
+            If you want to use a specific idd, you can require a specific version (x.x.x),
+            or directly provide an IDD object.
+
+        Returns
+        -------
+        dict
+            {table_ref: [record_data, ...], ..., "_comment": head_comment}, where record_data is {index: value, ...}.
+            Values are deserialized (lowercase if relevant, numeric types converted), references and external files
+            are given as str, empty fields are not included.
+
+        Raises
+        ------
+        KeyError
+            if a table does not exist in idd
+        """
+        table_lower_refs = {table_name_to_ref(table).lower() for table in tables}
+        _, buffer = to_buffer(buffer_or_path)
+        with buffer as f:
+            idd, records = cls._get_idd_from_records(
+                iter_idf(f, tables=table_lower_refs | {"version"}),
+                idd_or_version
+            )
+
+            # prepare tables
+            table_descriptors = {}  # {table_lower_ref: table_descriptor, ...}
+            for table_lower_ref in sorted(table_lower_refs):
+                if table_lower_ref not in idd.table_descriptors:
+                    raise KeyError(f"No table with reference '{table_lower_ref}'.")
+                table_descriptors[table_lower_ref] = idd.table_descriptors[table_lower_ref]
+            scan_data = dict((td.table_ref, []) for td in table_descriptors.values())
+            scan_data["_comment"] = ""
+
+            # deserialize records
+            for table_ref, record_data in records:
+                if table_ref == "_comment":
+                    scan_data["_comment"] = record_data
+                    continue
+                table_descriptor = table_descriptors.get(table_ref.lower())
+                if table_descriptor is None:  # version record, if not requested
+                    continue
+                scan_record_data = {}
+                record_data.pop("_comment", None)
+                for index, value in record_data.items():
+                    value = _get_scan_value(
+                        table_descriptor.get_field_descriptor(index).deserialize(value, index, check_length=False)
+                    )
+                    if value is not None:
+                        scan_record_data[index] = value
+                scan_data[table_descriptor.table_ref].append(scan_record_data)
+
+        return scan_data
+
     # ----------- json
     @classmethod
     def from_json(
@@ -538,3 +1173,140 @@ class Epm:
             buffer_or_path=buffer_or_path,
             indent=indent
         )
+
+    # ----------- epjson
+    @classmethod
+    def from_epjson(
+            cls,
+            buffer_or_path,
+            check_required=True,
+            check_length=True,
+            idd_or_version=None
+    ):
+        """
+        Create Epm from an EnergyPlus epJSON file.
+
+        Parameters
+        ----------
+        buffer_or_path: io.StringIO or str
+            epjson buffer or path
+        check_required: bool
+            If True (default), will raise an exception if a required field is missing.
+            If False, not not perform any checks.
+        check_length: bool
+            If True (default), will raise an exception if a field has a bigger length than authorized.
+            If False, will not check.
+
+        Other Parameters
+        ----------------
+        idd_or_version: Idd or tuple
+            if you want to use a specific idd, you can require a specific version (x.x.x), or directly provide an IDD
+            object.
+
+        Returns
+        -------
+        Epm
+        """
+        # load data
+        _source_file_path, buffer = to_buffer(buffer_or_path)
+        with buffer as f:
+            epjson_data = json.load(f)
+
+        # prepare idd
+        version_data = epjson_data.get("Version")
+        idd = cls._get_idd(idd_or_version, None if version_data is None else list(version_data.values()), True)
+
+        # create epm and populate
+        epm = cls(
+            check_required=check_required,
+            check_length=check_length,
+            idd_or_version=idd
+        )
+        epm._dev_populate_from_records(epjson.iter_records(epjson_data, idd))
+
+        return epm
+
+    def to_epjson(self, buffer_or_path=None, indent=2, dump_external_files=True):
+        """
+        Save to an EnergyPlus epJSON file.
+
+        Parameters
+        ----------
+        buffer_or_path: io.StringIO or str or None
+            output to write into. If None (default), will return a json string.
+        indent: int
+            Defines the indentation of the json, default 2
+        dump_external_files: boolean, default True
+            if True, external files will be dumped in external files directory
+
+        Returns
+        -------
+        str or None
+            None, or a json string (if buffer_or_path is None).
+
+        Notes
+        -----
+        Epm comment and record comments are not exported (epJSON has no comments).
+        """
+        # prepare external files dir path if file path
+        if isinstance(buffer_or_path, str):
+            dir_path, file_name = os.path.split(buffer_or_path)
+            model_name, _ = os.path.splitext(file_name)
+        else:
+            model_name, dir_path = None, os.path.curdir
+
+        # dump files if asked
+        if dump_external_files:
+            self.dump_external_files(
+                target_dir_path=os.path.join(dir_path, get_external_files_dir_name(model_name=model_name))
+            )
+
+        return json_data_to_json(
+            epjson.to_epjson_data(self, model_name=model_name),
+            buffer_or_path=buffer_or_path,
+            indent=indent
+        )
+
+    # ----------- snapshot
+    @classmethod
+    def from_snapshot(cls, buffer_or_path, idd_or_version=None):
+        """
+        Create Epm from a binary snapshot (see to_snapshot).
+
+        Values are already deserialized: fields are not checked again, only relations are rebuilt. Much faster than
+        loading an idf or a json file.
+
+        Parameters
+        ----------
+        buffer_or_path: typing.BinaryIO or str
+            snapshot buffer or path
+
+        Other Parameters
+        ----------------
+        idd_or_version: Idd or tuple
+            if you want to use a specific idd (must have the snapshot idd version), by default the snapshot idd version
+            is used.
+
+        Returns
+        -------
+        Epm
+
+        Notes
+        -----
+        Snapshots are pickle files: only load snapshots you trust.
+        """
+        return snapshot.load(buffer_or_path, cls, idd_or_version=idd_or_version)
+
+    def to_snapshot(self, buffer_or_path):
+        """
+        Save to a binary snapshot.
+
+        A snapshot contains deserialized values and is tagged with the idd version. It is meant to be reloaded quickly
+        by the same opyplus version, it is not an exchange format (use idf or json).
+
+        Parameters
+        ----------
+        buffer_or_path: typing.BinaryIO or str
+            output to write into
+        """
+        snapshot.dump(self, buffer_or_path)
@@ -70,6 +70,9 @@ class ExternalFile:
         self._external_file_manager = None
         self._content = content
 
+    def _dev_is_active(self):
+        return self._external_file_manager is not None
+
     def _dev_activate(self, external_files_manager):
         # return if already active
         if self._external_file_manager is not None:
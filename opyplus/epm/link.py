@@ -26,6 +26,10 @@ class Link:
     If target_table is not None: target_record is necessarily None and the link describes a record pointing on a record.
     """
 
+    __slots__ = (
+        "hook_references", "initial_hook_value", "source_index", "source_record", "target_record", "target_table"
+    )
+
     def __init__(self, hook_references, hook_value, source_index):
         # initial_hook_value may become obsolete when activated
         self.hook_references = hook_references
@@ -3,6 +3,7 @@ import itertools
 import collections
 
 from .queryset import Queryset
+from .query import has_lookups_fields
 
 
 class MultiTableQueryset:
@@ -142,3 +143,41 @@ class MultiTableQueryset:
         typing.Iterable[opyplus.epm.record.Record]
         """
         return itertools.chain(*self._querysets.values())
+
+    def select(self, filter_by=None, **lookups):
+        """
+        Select records from all querysets.
+
+        Parameters
+        ----------
+        filter_by: typing.Callable or None
+            Callable must take one argument (a record), and return True to keep it, or False to skip it.
+        lookups:
+            field lookups records must match (see Table.select). Records of tables that don't have a lookup field are
+            skipped. Example: .select(name__startswith="zn").
+
+        Returns
+        -------
+        MultiTableQueryset
+        """
+        return MultiTableQueryset(self._epm, self.iter_select(filter_by, **lookups))
+
+    def iter_select(self, filter_by=None, **lookups):
+        """
+        Iterate lazily on records selected by a filter (see select).
+
+        Parameters
+        ----------
+        filter_by: typing.Callable or None
+        lookups:
+            see Table.select
+
+        Returns
+        -------
+        typing.Iterator[opyplus.epm.record.Record]
+            records are grouped by table
+        """
+        for queryset in self._querysets.values():
+            if not has_lookups_fields(queryset.get_table(), lookups):  # records of table can't match
+                continue
+            yield from queryset.iter_select(filter_by, **lookups)
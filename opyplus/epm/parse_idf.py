@@ -1,7 +1,16 @@
 """Useful functions for parsing idf files."""
-from ..util import get_multi_line_copyright_message
+import io
+import os
+import re
+import mmap
+import operator
+
+from ..util import get_multi_line_copyright_message, detect_encoding
 from ..idd.util import table_name_to_ref
 
+_LONE_CARRIAGE_RETURN_PATTERN = re.compile(rb"\r(?!\n)")
+_MMAP_RELEASE_SIZE = 1 << 22  # read pages of memory-mapped files are released every 4 MiB (if os supports it)
+
 
 def parse_idf(file_like):
     """
@@ -20,59 +29,102 @@ def parse_idf(file_like):
     -------
     dict
     """
-    # todo-later: manage record comments
     tables_data = {}
     head_comment = ""
+    for table_ref, record_data in iter_idf(file_like):
+        if table_ref == "_comment":
+            head_comment = record_data
+            continue
+        if table_ref not in tables_data:
+            tables_data[table_ref] = []
+        tables_data[table_ref].append(record_data)
+
+    # add comment key
+    tables_data["_comment"] = head_comment
+    return tables_data
+
+
+def iter_idf(file_like, tables=None):
+    """
+    Parse an idf file, record by record.
+
+    Parameters
+    ----------
+    file_like: typing.StringIO
+    tables: typing.Container[str] or None
+        if given, only records of given tables (lower refs) are yielded, other records are skipped without being
+        tokenized
+
+    Returns
+    -------
+    typing.Iterator[tuple]
+        (table_ref, record_data) for each record, in file order. Head comment is yielded once, before first record,
+        as ("_comment", head_comment).
+
+    Notes
+    -----
+    A record is yielded as soon as its ';' terminator is reached, so the whole file is never stored in memory.
+
+    Comment lines (lines that only contain a comment) located before a record, or inside it, are the record comment:
+    it is given in record_data, as '_comment' (only if record has a comment). Comment lines located before first record
+    are the head comment. If idf was written by opyplus (it starts with opyplus copyright), head comment ends with the
+    first empty line that follows it, and next comment lines are the first record comment (this is how Epm.to_idf
+    writes them). Field comments (located after a field value) are not kept.
+    """
+    return _iter_lines_records(file_like, tables=tables)
+
+
+def _iter_lines_records(lines, tables=None, encoding=None):
+    # record tokenizer shared by iter_idf and iter_idf_mmap (see iter_idf)
+    # lines: str lines, or bytes lines if encoding is given (only needed parts are decoded, strictly)
+    if encoding is None:
+        comment_sep, record_end_mark, decode = "!", ";", str
+    else:
+        comment_sep, record_end_mark, decode = b"!", b";", operator.methodcaller("decode", encoding)
+
+    comment_lines = []  # comment lines of next record (or of head comment, if first record was not reached)
+    copyright_lines_nb = 0  # number of (non empty) copyright lines found
+    head_lines_nb = None  # number of comment lines of head comment (idf written by opyplus and empty line was found)
+    head_comment_yielded = False
     record_data = None
+    table_ref = None
     make_new_record = True
+    skip_record = False
 
     copyright_list = get_multi_line_copyright_message().split("\n")
+    opyplus_copyright_lines_nb = len([line for line in copyright_list if line != ""])
+
+    for i, raw_line in enumerate(lines):
+        raw_content, has_comment, raw_comment = raw_line.partition(comment_sep)
+
+        # skipped record: only look for its end
+        if skip_record:
+            if raw_content.rstrip().endswith(record_end_mark):
+                skip_record = False
+            continue
 
-    for i, raw_line in enumerate(file_like):
         # manage if copyright
-        try:
-            copyright_line = copyright_list[i]
-            if raw_line.strip() == copyright_line:
-                # skip copyright line
-                continue
-        except IndexError:
-            pass
-
-        # GET LINE CONTENT AND COMMENT
-        split_line = raw_line.split("!")
-
-        # no "!" in the raw_line
-        if len(split_line) == 1:
-            # this is an empty line
-            if len(split_line[0].strip()) == 0:
-                content, comment = None, None
-            # this is a record line with no comments
-            else:
-                content, comment = split_line[0].strip(), None
-        # there is at least one "!" in the raw_line
-        else:
-            # this is a comment line
-            if len(split_line[0].strip()) == 0:
-                content, comment = None, "!".join(split_line[1:])
-            # this is a record line with a comment
-            else:
-                content, comment = split_line[0].strip(), "!".join(split_line[1:])
-
-        # SKIP CURRENT LINE IF VOID
-        if (content, comment) == (None, None):
+        if (i < len(copyright_list)) and (decode(raw_line).strip() == copyright_list[i]):
+            # skip copyright line
+            if copyright_list[i] != "":
+                copyright_lines_nb += 1
             continue
 
-        # NO CONTENT
-        if not content:
-            if record_data is None:  # we only manage head idf comment
-                head_comment += comment.strip() + "\n"
+        # get line content
+        content = decode(raw_content).strip()
+
+        # comment line (or empty line)
+        if content == "":
+            if has_comment:
+                comment_lines.append(decode(raw_comment).strip())
+            elif (copyright_lines_nb == opyplus_copyright_lines_nb) and not head_comment_yielded:
+                head_lines_nb = len(comment_lines)  # end of head comment (only if idf was written by opyplus)
             continue
 
         # CONTENT
         # check if record end and prepare
         record_end = content[-1] == ";"
-        content = content[:-1]  # we tear comma or semi-colon
-        content_l = [text.strip() for text in content.split(",")]
+        content_l = [text.strip() for text in content[:-1].split(",")]  # we tear comma or semi-colon
 
         # record creation if needed
         if make_new_record:
@@ -88,13 +140,22 @@ def parse_idf(file_like):
             ):
                 continue
 
-            # declare table if necessary
-            if table_ref not in tables_data:
-                tables_data[table_ref] = []
+            # head comment is finished
+            if not head_comment_yielded:
+                if head_lines_nb is None:
+                    head_lines_nb = len(comment_lines)
+                yield "_comment", "".join(line + "\n" for line in comment_lines[:head_lines_nb])
+                del comment_lines[:head_lines_nb]
+                head_comment_yielded = True
+
+            # skip if not requested
+            if (tables is not None) and (table_ref.lower() not in tables):
+                skip_record = not record_end
+                comment_lines = []
+                continue
 
-            # create and store record
+            # create record
             record_data = dict()
-            tables_data[table_ref].append(record_data)
 
             # prepare in case fields on the same line
             content_l = content_l[1:]
@@ -102,13 +163,196 @@ def parse_idf(file_like):
 
         # fields
         for value_s in content_l:
-            field_index = len(record_data)
-            record_data[field_index] = value_s
+            record_data[len(record_data)] = value_s
 
         # signal that new record must be created
         if record_end:
+            if comment_lines:
+                record_data["_comment"] = "\n".join(comment_lines)
+                comment_lines = []
+            yield table_ref, record_data
             make_new_record = True
 
-    # add comment key
-    tables_data["_comment"] = head_comment
-    return tables_data
+    # last record was not finished
+    if not make_new_record:
+        if comment_lines:
+            record_data["_comment"] = "\n".join(comment_lines)
+        yield table_ref, record_data
+
+    # no records
+    if not head_comment_yielded:
+        yield "_comment", "".join(line + "\n" for line in comment_lines)
+
+
+def iter_idf_fast(file_like, tables=None):
+    """
+    Parse an idf file, record by record, working on the whole buffer at once.
+
+    Comments are stripped, content lines are joined and records are split on ';' boundaries, which is much faster than
+    the line by line parsing of iter_idf. Files that can't be parsed this way (lines that don't end with ',' or ';',
+    several records on one line, unfinished last record, lead input or simulation data lines) are parsed by iter_idf,
+    so yielded records are always the same.
+
+    Parameters
+    ----------
+    file_like: typing.StringIO
+    tables: typing.Container[str] or None
+        if given, only records of given tables (lower refs) are yielded
+
+    Returns
+    -------
+    typing.Iterator[tuple]
+        see iter_idf
+
+    Notes
+    -----
+    The whole file content is read in memory.
+    """
+    raw_lines = file_like.read().split("\n")
+    lines = [raw_line.partition("!")[0].strip() for raw_line in raw_lines]
+
+    first_content_index = next((i for i, line in enumerate(lines) if line != ""), None)
+    if first_content_index is None:  # no records
+        yield from iter_idf(io.StringIO("\n".join(raw_lines)))
+        return
+
+    # prepare content (one line end per line, ' ' if line has no content)
+    line_ends = "".join([line[-1] if line else " " for line in lines])
+    content = "".join(lines)
+    del lines
+
+    # check edge cases
+    content_lower = content.lower()
+    if (
+            (len(line_ends) != line_ends.count(",") + line_ends.count(";") + line_ends.count(" ")) or
+            (line_ends.rstrip()[-1] != ";") or
+            (content.count(";") != line_ends.count(";")) or
+            ("lead input" in content_lower) or
+            ("simulation data" in content_lower)
+    ):
+        yield from iter_idf(io.StringIO("\n".join(raw_lines)), tables=tables)
+        return
+    del content_lower
+
+    # head comment and first record comment (parsed by iter_idf, which also manages copyright lines)
+    records_comment_lines = {}  # {record_position: [comment_line, ...], ...}
+    for table_ref, record_data in iter_idf(io.StringIO("\n".join(raw_lines[:first_content_index + 1]))):
+        if table_ref == "_comment":
+            yield "_comment", record_data
+        elif "_comment" in record_data:
+            records_comment_lines[0] = record_data["_comment"].split("\n")
+
+    # comment lines of records (only lines without content are looked at)
+    copyright_list = get_multi_line_copyright_message().split("\n")
+    record_position, position_line_index = 0, first_content_index
+    line_index = line_ends.find(" ", first_content_index)
+    while line_index != -1:
+        raw_line = raw_lines[line_index]
+        if ("!" in raw_line) and not (
+                (line_index < len(copyright_list)) and (raw_line.strip() == copyright_list[line_index])):
+            record_position += line_ends.count(";", position_line_index, line_index)
+            position_line_index = line_index
+            records_comment_lines.setdefault(record_position, []).append(raw_line.partition("!")[2].strip())
+        line_index = line_ends.find(" ", line_index + 1)
+    del raw_lines, line_ends
+
+    # records
+    table_refs = {}  # cache {table_name: table_ref, ...}
+    records_s = content.split(";")
+    del content
+    for record_position, record_s in enumerate(records_s[:-1]):
+        table_name, has_fields, fields_s = record_s.partition(",")
+        table_ref = table_refs.get(table_name)
+        if table_ref is None:
+            table_ref = table_refs[table_name] = table_name_to_ref(table_name.strip())
+        if (tables is not None) and (table_ref.lower() not in tables):
+            continue
+        record_data = dict(enumerate(map(str.strip, fields_s.split(",")))) if has_fields else {}
+        comment_lines = records_comment_lines.get(record_position)
+        if comment_lines is not None:
+            record_data["_comment"] = "\n".join(comment_lines)
+        yield table_ref, record_data
+
+
+def _is_ascii_compatible(encoding):
+    # separators must be encoded as ascii bytes to be found in raw bytes
+    try:
+        return " \n!,;".encode(encoding) == b" \n!,;"
+    except LookupError:
+        return False
+
+
+def _release_mmap_pages(mm, start, end):
+    # release pages of a read-only memory-mapped file (they will be read from file again if needed)
+    start = start // mmap.PAGESIZE * mmap.PAGESIZE
+    if end > start and hasattr(mm, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+        mm.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+
+def _has_lone_carriage_return(mm):
+    # searched window by window, to release pages
+    size = len(mm)
+    for window_start in range(0, size, _MMAP_RELEASE_SIZE):
+        window_end = min(window_start + _MMAP_RELEASE_SIZE, size)
+        # one more byte is given (lookahead of '\r' located at the end of the window)
+        match = _LONE_CARRIAGE_RETURN_PATTERN.search(mm, window_start, min(window_end + 1, size))
+        _release_mmap_pages(mm, window_start, window_end)
+        if match is not None:
+            return True
+    return False
+
+
+def iter_idf_mmap(path, tables=None):
+    """
+    Parse an idf file, record by record, reading memory-mapped bytes.
+
+    Lines are read from the memory-mapped file, comments are found in raw bytes and are not decoded (except comment
+    lines), only record content is decoded. Yielded records are the same as iter_idf ones.
+
+    Parameters
+    ----------
+    path: str
+    tables: typing.Container[str] or None
+        if given, only records of given tables (lower refs) are yielded
+
+    Returns
+    -------
+    typing.Iterator[tuple]
+        see iter_idf
+
+    Notes
+    -----
+    File pages are managed by the os (they are not copied in python memory). Files that are not encoded with an ascii
+    compatible encoding (utf-16, utf-32) or that use carriage return (old mac) line endings are parsed by iter_idf.
+    """
+    file_encoding = detect_encoding(path)
+    encoding, start = ("utf-8", 3) if file_encoding == "utf-8-sig" else (file_encoding, 0)  # bom is skipped
+    if not _is_ascii_compatible(encoding):
+        with open(path, encoding=file_encoding) as f:
+            yield from iter_idf(f, tables=tables)
+        return
+
+    # empty files can't be mapped
+    if os.path.getsize(path) == 0:
+        yield "_comment", ""
+        return
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # '\r' line endings (lines are split on '\n')
+        if _has_lone_carriage_return(mm):
+            with open(path, encoding=file_encoding) as text_f:
+                yield from iter_idf(text_f, tables=tables)
+            return
+
+        mm.seek(start)
+        yield from _iter_lines_records(_iter_mmap_lines(mm), tables=tables, encoding=encoding)
+
+
+def _iter_mmap_lines(mm):
+    # read pages are released (else they would remain in process resident memory)
+    released_end = mm.tell()
+    for raw_line in iter(mm.readline, b""):
+        if mm.tell() - released_end > _MMAP_RELEASE_SIZE:
+            _release_mmap_pages(mm, released_end, mm.tell())
+            released_end = mm.tell()
+        yield raw_line
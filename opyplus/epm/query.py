@@ -0,0 +1,331 @@
+"""
+Declarative record queries (see Table.select).
+
+A query is a set of field lookups, given as keyword arguments: <field>[__<field>...][__<operator>]=<value>.
+ - field: field lowercase name. If other fields follow, first field must be a link and following fields are fields of
+   the pointed records (join).
+ - operators:
+    * exact (default): value is deserialized like when setting a field (links may be given their pointed record)
+    * in: iterable of exact values
+    * gt, gte, lt, lte: comparison with a number (or a string)
+    * range: (min, max), inclusive
+    * startswith: prefix of a text value (values are lowercase, unless field retains case)
+    * regex: regular expression that must be found in a text value (re.search)
+   Text value of a link is the name of the pointed record (or table).
+ - examples: zone_name="z1", surface_type__in=("wall", "roof"), vertex_1_z_coordinate__range=(0, 3),
+   name__startswith="zn", zone_name__x_origin__lt=10 (surfaces of zones that have x_origin < 10)
+
+Planner: conditions on indexed fields (see Table.create_index) are answered by their index, using key lookups for
+exact and in operators, or a scan of index keys for other operators if it is smaller than current candidates (an
+index key of a link field is a pointed record, so joins are only evaluated once per pointed record). Results of
+indexed conditions are intersected, then other conditions are evaluated on remaining candidates, lazily.
+"""
+import re
+import functools
+
+from .record import Record
+from .table_index import get_record_key, get_query_key
+
+_OPERATORS = frozenset(("exact", "in", "gt", "gte", "lt", "lte", "range", "startswith", "regex"))
+_MISSING = object()
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_lookup(lookup):
+    # zone_name__x_origin__lt => (("zone_name", "x_origin"), "lt") (refs never contain "__")
+    parts = lookup.split("__")
+    operator = "exact"
+    if (len(parts) > 1) and (parts[-1] in _OPERATORS):
+        operator = parts.pop()
+    return tuple(parts), operator
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _are_comparable(key, bound):
+    return (_is_number(key) and _is_number(bound)) or (isinstance(key, str) and isinstance(bound, str))
+
+
+def _get_text(key):
+    if isinstance(key, str):
+        return key
+    if isinstance(key, Record):
+        record_id = key.id
+        return record_id if isinstance(record_id, str) else None
+    if hasattr(key, "get_name"):  # pointed table
+        return key.get_name().lower()
+    return None
+
+
+class Condition:
+    """
+    Condition on a field of the records of a table.
+
+    Parameters
+    ----------
+    table: opyplus.epm.table.Table
+    path: tuple of str
+        field refs (more than one for joins)
+    operator: str
+    value
+
+    Attributes
+    ----------
+    field_index: int
+    keys: set or None
+        keys matching condition (exact and in operators), None if condition must be evaluated on keys
+
+    Raises
+    ------
+    AttributeError
+        if a field does not exist
+    TypeError
+        if value of in operator is a string
+    ValueError
+        if bounds of range operator are not two numbers or two strings
+    """
+
+    __slots__ = ("field_index", "keys", "_matches_key")
+
+    def __init__(self, table, path, operator, value):
+        if operator == "in" and isinstance(value, (str, bytes)):
+            raise TypeError(f"in operator expects an iterable of values, not a string ({value!r})")
+        if operator == "range":
+            low, high = value
+            if not _are_comparable(low, high):
+                raise ValueError(f"range operator expects two numbers or two strings, got ({low!r}, {high!r})")
+
+        field_ref = path[0]
+        self.field_index = field_ref if isinstance(field_ref, int) else table._dev_descriptor.get_field_index(field_ref)
+        self.keys = None
+
+        # join: condition on pointed records (pointed records may belong to different tables)
+        if len(path) > 1:
+            sub_path = path[1:]
+            sub_conditions = {}  # {table: condition or None, ...}, None if field does not exist in table
+
+            def matches_key(key):
+                if not isinstance(key, Record):
+                    return False
+                target_table = key.get_table()
+                condition = sub_conditions.get(target_table, _MISSING)
+                if condition is _MISSING:
+                    if target_table._dev_descriptor.has_field(sub_path[0]):
+                        condition = Condition(target_table, sub_path, operator, value)
+                    else:
+                        condition = None
+                    sub_conditions[target_table] = condition
+                return (condition is not None) and condition.matches(key)
+
+            self._matches_key = matches_key
+            return
+
+        if operator in ("exact", "in"):
+            values = (value,) if operator == "exact" else value
+            self.keys = set(get_query_key(table, self.field_index, v) for v in values)
+            self._matches_key = self.keys.__contains__
+        elif operator in ("gt", "gte", "lt", "lte"):
+            compare = dict(gt=lambda k: k > value, gte=lambda k: k >= value, lt=lambda k: k < value,
+                           lte=lambda k: k <= value)[operator]
+            self._matches_key = lambda k: _are_comparable(k, value) and compare(k)
+        elif operator == "range":
+            self._matches_key = lambda k: _are_comparable(k, low) and (low <= k <= high)
+        elif operator == "startswith":
+            retain_case = "retaincase" in table._dev_descriptor.get_field_descriptor(self.field_index).tags
+            prefix = value if retain_case else value.lower()
+            self._matches_key = lambda k: (_get_text(k) or "").startswith(prefix)
+        else:  # regex
+            pattern = re.compile(value)
+            self._matches_key = lambda k: pattern.search(_get_text(k) or "") is not None
+
+    def matches_key(self, key):
+        """
+        Check if a field key matches condition.
+
+        Parameters
+        ----------
+        key
+            see opyplus.epm.table_index.get_record_key
+
+        Returns
+        -------
+        bool
+        """
+        return self._matches_key(key)
+
+    def matches(self, record):
+        """
+        Check if a record matches condition.
+
+        Parameters
+        ----------
+        record: opyplus.epm.record.Record
+
+        Returns
+        -------
+        bool
+        """
+        return self._matches_key(get_record_key(record, self.field_index))
+
+
+def has_lookups_fields(table, lookups):
+    """
+    Check if a table has the fields of given lookups (first field of joins).
+
+    Parameters
+    ----------
+    table: opyplus.epm.table.Table
+    lookups: typing.Iterable[str]
+
+    Returns
+    -------
+    bool
+    """
+    descriptor = table._dev_descriptor
+    return all(descriptor.has_field(_parse_lookup(lookup)[0][0]) for lookup in lookups)
+
+
+def compile_lookups(table, lookups):
+    """
+    Compile lookups to conditions.
+
+    Parameters
+    ----------
+    table: opyplus.epm.table.Table
+    lookups: dict
+        {lookup: value, ...}, see module documentation
+
+    Returns
+    -------
+    typing.List[Condition]
+
+    Raises
+    ------
+    AttributeError
+        if a field does not exist
+    TypeError, ValueError
+        if a lookup value is incorrect (see Condition)
+    """
+    return [Condition(table, *_parse_lookup(lookup), value) for lookup, value in lookups.items()]
+
+
+def _plan(table, conditions, records=None):
+    # returns (candidates, scan_conditions): candidates is a set of records matching indexed conditions (None if no
+    # condition is indexed), scan_conditions must be evaluated on candidates
+    indexed, scan_conditions = [], []
+    for condition in conditions:
+        index = table._dev_indexes.get(condition.field_index)
+        if index is None:
+            scan_conditions.append(condition)
+        else:
+            indexed.append((condition, index))
+
+    # key lookups first (cheap)
+    found_sets = []  # index sets must not be modified
+    candidates_nb = len(table._records) if records is None else len(records)
+    for condition, index in indexed:
+        if condition.keys is None:
+            continue
+        if len(condition.keys) == 1:
+            found = index.get_records(next(iter(condition.keys)))
+        else:
+            found = set()
+            for key in condition.keys:
+                found.update(index.get_records(key))
+        found_sets.append(found)
+        candidates_nb = min(candidates_nb, len(found))
+
+    # then index keys scans if index has less keys than candidates (else condition is evaluated on candidates)
+    for condition, index in indexed:
+        if condition.keys is not None:
+            continue
+        if candidates_nb <= index.get_keys_nb():
+            scan_conditions.append(condition)
+            continue
+        found = set()
+        for key, key_records in index.iter_items():
+            if condition.matches_key(key):
+                found.update(key_records)
+        found_sets.append(found)
+        candidates_nb = min(candidates_nb, len(found))
+
+    # intersect, smallest first
+    if len(found_sets) == 0:
+        return None, scan_conditions
+    found_sets.sort(key=len)
+    candidates = set(found_sets[0])
+    for found in found_sets[1:]:
+        candidates.intersection_update(found)
+    if records is not None:
+        candidates.intersection_update(records)
+
+    return candidates, scan_conditions
+
+
+def iter_records(table, conditions, records=None):
+    """
+    Iterate lazily on records matching conditions.
+
+    Parameters
+    ----------
+    table: opyplus.epm.table.Table
+    conditions: typing.List[Condition]
+    records: typing.Collection[opyplus.epm.record.Record] or None
+        records to select from (must belong to table), all table records if None
+
+    Returns
+    -------
+    typing.Iterator[opyplus.epm.record.Record]
+        records are not sorted
+    """
+    candidates, scan_conditions = _plan(table, conditions, records=records)
+    if candidates is None:
+        candidates = tuple(table._records.values()) if records is None else records
+    if len(scan_conditions) == 0:
+        return iter(candidates)
+    return (r for r in candidates if all(c.matches(r) for c in scan_conditions))
+
+
+def batch_select_records(table, conditions_list):
+    """
+    Select records of multiple queries at once.
+
+    Parameters
+    ----------
+    table: opyplus.epm.table.Table
+    conditions_list: typing.List[typing.List[Condition]]
+
+    Returns
+    -------
+    typing.List[typing.List[opyplus.epm.record.Record]]
+
+    Notes
+    -----
+    Queries that can't use indexes share a single scan of table records, in which field keys are only computed once.
+    """
+    results, full_scans = [], []  # full_scans: [(results, conditions), ...]
+    for conditions in conditions_list:
+        candidates, scan_conditions = _plan(table, conditions)
+        if candidates is None:
+            results.append([])
+            full_scans.append((results[-1], scan_conditions))
+        else:
+            results.append([r for r in candidates if all(c.matches(r) for c in scan_conditions)])
+
+    # shared scan
+    if len(full_scans) > 0:
+        for record in tuple(table._records.values()):
+            keys = {}  # {field_index: key, ...}
+            for query_results, scan_conditions in full_scans:
+                for condition in scan_conditions:
+                    key = keys.get(condition.field_index, _MISSING)
+                    if key is _MISSING:
+                        key = keys[condition.field_index] = get_record_key(record, condition.field_index)
+                    if not condition.matches_key(key):
+                        break
+                else:
+                    query_results.append(record)
+
+    return results
@@ -3,6 +3,12 @@
 from itertools import filterfalse
 
 from ..exceptions import RecordDoesNotExistError, MultipleRecordsReturnedError
+from .query import compile_lookups, iter_records
+
+
+class _NoPkError(TypeError, KeyError):
+    # id search on a table without pk: Table.one raised TypeError, Queryset.one raised KeyError, both are accepted
+    __str__ = Exception.__str__
 
 
 def _unique_ever_seen(iterable, key=None):
@@ -55,6 +61,7 @@ class Queryset:
 
         # ensure unique, sort, make un-mutable
         self._records = tuple(sorted(_unique_ever_seen(records)))
+        self._records_set = None  # built on first membership test (see one)
 
         # ensure correct table
         if len({r.get_table() for r in self._records}.difference({self._table})) > 0:
@@ -157,7 +164,7 @@ class Queryset:
         """
         return self._table.get_ref()
 
-    def select(self, filter_by=None):
+    def select(self, filter_by=None, **lookups):
         """
         Select records from this queryset using a given filter function.
 
@@ -168,24 +175,49 @@ class Queryset:
             Callable must take one argument (a record of queryset), and return True to keep it, or False to skip it.
             Example: .select(lambda x: x.name == "my_name").
         If None, records are not filtered.
+        lookups:
+            field lookups records must match (see Table.select).
+            Example: .select(zone_name="my_zone"), .select(vertex_1_z_coordinate__gt=0).
 
         Returns
         -------
         Queryset instance, containing all selected records.
         """
-        iterator = self._records if filter_by is None else filter(filter_by, self._records)
-        return Queryset(self._table, iterator)
+        return Queryset(self._table, self.iter_select(filter_by, **lookups))
+
+    def iter_select(self, filter_by=None, **lookups):
+        """
+        Iterate lazily on records selected by a filter (see select).
+
+        Parameters
+        ----------
+        filter_by: typing.Callable or None
+        lookups:
+            see Table.select
+
+        Returns
+        -------
+        typing.Iterator[opyplus.epm.record.Record]
+            records are not sorted
+        """
+        records = self._records
+        if len(lookups) > 0:
+            records = iter_records(self._table, compile_lookups(self._table, lookups), records=records)
+        return iter(records) if filter_by is None else filter(filter_by, records)
 
-    def one(self, filter_by=None):
+    def one(self, filter_by=None, **lookups):
         """
         Select a single record from this queryset using a filter function. If more than one record is filtered, raises.
 
         Parameters
         ----------
-        filter_by: callable, default None
-            Callable must take one argument (a record of table), and return True to keep record, or False to skip it.
-            Example : .one(lambda x: x.name == "my_name").
-            If None, records are not filtered.
+        filter_by: typing.Callable or str or None
+            if str: record id
+            if callable: a callable must take one argument (a record of table), and return True to keep record,
+            or False to skip it. Example : .one(lambda x: x.name == "my_name").
+            if None (default): records are not filtered.
+        lookups:
+            see select
 
         Returns
         -------
@@ -194,6 +226,8 @@ class Queryset:
 
         Raises
         ------
+        TypeError
+            if id search on a table that does not have a pk (also a KeyError, for backwards compatibility)
         RecordDoesNotExistError
             if no record is found
         MultipleRecordsReturnedError
@@ -202,13 +236,16 @@ class Queryset:
         # filter if needed
         if isinstance(filter_by, str):
             if self._table._dev_no_pk:
-                raise KeyError(f"table {self._table.get_ref()} does not have a primary key, can't use getitem syntax")
-            for r in self._records:  # later: we could store records in an ordered dict with id keys
-                if r.id == filter_by:
-                    return r
-            raise RecordDoesNotExistError(f"queryset does not contain a record who's id is '{filter_by}'")
+                raise _NoPkError(f"table {self._table.get_ref()} does not have a primary key, can't use string syntax")
+            # table stores records by id
+            record = self._table._records.get(filter_by)
+            if self._records_set is None:
+                self._records_set = set(self._records)
+            if (record is None) or (record not in self._records_set):
+                raise RecordDoesNotExistError(f"queryset does not contain a record who's id is '{filter_by}'")
+            return record
 
-        qs = self if filter_by is None else self.select(filter_by=filter_by)
+        qs = self if (filter_by is None) and (len(lookups) == 0) else self.select(filter_by, **lookups)
 
         # check one and only one
         if len(qs) == 0:
@@ -232,6 +269,7 @@ class Queryset:
 
         # clear content
         self._records = ()
+        self._records_set = None
 
     # ------------------------------------------- export ---------------------------------------------------------------
     def to_json_data(self):
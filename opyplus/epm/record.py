@@ -14,6 +14,9 @@ from ..exceptions import FieldValidationError
 TAB_LEN = 4
 COMMENT_COLUMN_START = 35
 
+_set_slot = object.__setattr__  # bypasses Record.__setattr__
+_RELATION_TYPES = (Link, RecordHook, ExternalFile)  # values that must be registered (see _update_value_inert)
+
 
 def _get_type_level(value):
     if value is None:  # lowest type
@@ -37,24 +40,60 @@ class Record:
     table: opyplus.epm.table.Table
     data: dict or None
         if dict, key: index_or_ref, value: raw value or value
+    trusted: bool
+        if True, data values are raw idf strings written by opyplus (see FieldDescriptor.deserialize)
+
+    Notes
+    -----
+    Values are stored in a list, by field position (None if field is empty, last value is never None).
     """
 
-    _initialized = False  # used by __setattr__
+    __slots__ = ("_table", "_data", "_comment")  # other attributes are fields (see __setattr__)
 
-    def __init__(self, table, data=None):
+    def __init__(self, table, data=None, trusted=False):
         self._table = table  # when record is deleted, __init__ fields are set to None
-        self._data = {}
+        self._data = []
 
         # comment
         self._comment = ""
 
-        # signal initialized
-        self._initialized = True
-
         # set data if any
         if data is not None:
             self._comment = data.pop("_comment", "")
-            self._update_inert(data)
+            self._update_inert(data, trusted=trusted)
+
+    @classmethod
+    def _dev_create_trusted(cls, table, data, comment=""):
+        """
+        Create record from already deserialized data, without any check.
+
+        Parameters
+        ----------
+        table: opyplus.epm.table.Table
+        data: list
+            values by field position (None if empty, last value must not be None), values are deserialized (hooks,
+            links and external files are inert)
+        comment: str
+
+        Returns
+        -------
+        Record
+        """
+        record = cls.__new__(cls)
+        # bypass __setattr__
+        _set_slot(record, "_table", table)
+        _set_slot(record, "_data", data)
+        _set_slot(record, "_comment", comment)
+        return record
+
+    def _get_value(self, index):
+        # stored value, None if empty
+        data = self._data
+        return data[index] if index < len(data) else None
+
+    def _dev_iter_items(self):
+        # (index, value) of non empty fields
+        return ((i, v) for i, v in enumerate(self._data) if v is not None)
 
     def _field_key_to_index(self, ref_or_index):
         if isinstance(ref_or_index, int):
@@ -65,22 +104,39 @@ class Record:
             return ref_or_index
         return self._table._dev_descriptor.get_field_index(ref_or_index)
 
-    def _update_inert(self, data):
+    def _update_inert(self, data, trusted=False):
+        epm = self._table._epm
+
+        # record no longer matches the idf block it was created from (see Epm.update_from_idf)
+        epm._dev_idf_blocks.pop(self, None)
+
+        # signal update to table indexes (record is indexed again on next lookup)
+        if self._table._dev_indexes:
+            self._table._dev_mark_indexes_dirty(self)
+
         # transform keys to indexes
         data = dict([(self._field_key_to_index(k), v) for (k, v) in data.items()])
 
         # set values inert (must be ordered, otherwise some extensible values may be rejected by mistake)
+        check_length = epm._dev_check_length
         for k, v in sorted(data.items()):
-            self._update_value_inert(k, v)
+            self._update_value_inert(k, v, check_length=check_length, trusted=trusted)
+
+        # in bulk mode, required fields are checked when leaving bulk mode
+        if epm._dev_bulk_records is not None:
+            epm._dev_bulk_records[self] = None
+            return
 
         # leave if empty required fields are tolerated
         # check that no required fields are missing
-        if not self._table.get_epm()._dev_check_required:
-            return
+        if epm._dev_check_required:
+            self._dev_check_required_fields()
 
-        # check required
+    def _dev_check_required_fields(self):
+        data = self._data
+        data_len = len(data)
         for i in range(len(self)):
-            if i in self._data:
+            if (i < data_len) and (data[i] is not None):
                 continue
 
             # see if required field
@@ -92,34 +148,46 @@ class Record:
                 raise FieldValidationError(
                     f"Field is required (it is a pk). {field_descriptor.get_error_location_message()}")
 
-    def _update_value_inert(self, index, value):
+    def _update_value_inert(self, index, value, check_length=True, trusted=False):
         # Is only called by _update_inert.
         # get field descriptor
         field_descriptor = self._table._dev_descriptor.get_field_descriptor(index)
 
         # prepare value
-        value = field_descriptor.deserialize(value, index, check_length=self.get_epm()._dev_check_length)
+        value = field_descriptor.deserialize(value, index, check_length=check_length, trusted=trusted)
+
+        # plain values (most frequent) have no relations to manage (pk field values are hooks)
+        if not isinstance(value, _RELATION_TYPES):
+            if value is None:
+                self._dev_set_none_without_unregistering(index, check_not_required=False)
+                return
+            data = self._data
+            if index >= len(data):
+                data.extend([None] * (index + 1 - len(data)))
+            data[index] = value
+            return
 
         # if relevant, store current id to signal change to table later on
         old_id = None
         if index == 0 and not self._table._dev_no_pk:
             # retrieve old value
-            old_value = self._data.get(0)  # we use get, because record may not have an id yet if it is being created
+            old_value = self._get_value(0)  # record may not have an id yet if it is being created
 
             # manage record hooks (should not be any other special field)
             old_id = old_value.target_value if isinstance(old_value, RecordHook) else old_value
 
+        # current values may be inert (not activated yet in bulk mode), they are then simply replaced
         # manage links
         if isinstance(value, Link):
             # de-activate current link if any
-            current_link = self._data.get(index)
-            if current_link is not None:
+            current_link = self._get_value(index)
+            if (current_link is not None) and (current_link.source_record is not None):
                 current_link.unregister()
 
         # manage hooks
         if isinstance(value, RecordHook):
-            current_record_hook = self._data.get(index)
-            if current_record_hook is not None:
+            current_record_hook = self._get_value(index)
+            if (current_record_hook is not None) and (current_record_hook.target_record is not None):
                 # unregister or update
                 if value is None:
                     current_record_hook.unregister()
@@ -130,8 +198,8 @@ class Record:
         # manage external files
         if isinstance(value, ExternalFile):
             # unregister current external file if any
-            current_external_file = self._data.get(index)
-            if current_external_file is not None:
+            current_external_file = self._get_value(index)
+            if (current_external_file is not None) and current_external_file._dev_is_active():
                 current_external_file._dev_unregister()
 
         # if None remove and leave
@@ -141,13 +209,19 @@ class Record:
             return
 
         # set value
-        self._data[index] = value
+        data = self._data
+        if index >= len(data):
+            data.extend([None] * (index + 1 - len(data)))
+        data[index] = value
 
         # signal id update if relevant
         if old_id is not None:
             self._table._dev_record_id_was_updated(old_id)
 
     def _dev_set_none_without_unregistering(self, index, check_not_required=True):
+        # may be called by relations manager (pointed record was deleted): record no longer matches its idf block
+        self._table._epm._dev_idf_blocks.pop(self, None)
+
         # get field descriptor
         field_descriptor = self._table._dev_descriptor.get_field_descriptor(index)
 
@@ -160,9 +234,16 @@ class Record:
             raise FieldValidationError(
                 f"Field is required (it is a pk). {field_descriptor.get_error_location_message()}")
 
-        # set none
-        if index in self._data:
-            del self._data[index]
+        # signal update to table indexes
+        if self._table._dev_indexes:
+            self._table._dev_mark_indexes_dirty(self)
+
+        # set none (trailing empty values are removed)
+        data = self._data
+        if index < len(data):
+            data[index] = None
+            while data and (data[-1] is None):
+                data.pop()
 
     def _prepare_pop_insert_index(self, index=None):
         if not self.is_extensible():
@@ -184,36 +265,53 @@ class Record:
 
         return index
 
+    # unregister: inert values (not activated yet in bulk mode) are skipped
     def _unregister_hooks(self):
-        for v in self._data.values():
-            if isinstance(v, RecordHook):
+        for v in self._data:
+            if isinstance(v, RecordHook) and (v.target_record is not None):
                 v.unregister()
 
     def _unregister_links(self):
-        for v in self._data.values():
-            if isinstance(v, Link):
+        for v in self._data:
+            if isinstance(v, Link) and (v.source_record is not None):
                 v.unregister()
 
     def _unregister_external_files(self):
-        for v in self._data.values():
-            if isinstance(v, ExternalFile):
+        for v in self._data:
+            if isinstance(v, ExternalFile) and v._dev_is_active():
                 v._dev_unregister()
 
     def _dev_activate_hooks(self):
-        for v in self._data.values():
+        for v in self._data:
             if isinstance(v, RecordHook):
                 v.activate(self)
 
     def _dev_activate_links(self):
-        for v in self._data.values():
+        for v in self._data:
             if isinstance(v, Link):
                 v.activate(self)
 
     def _dev_activate_external_files(self):
-        for v in self._data.values():
+        for v in self._data:
             if isinstance(v, ExternalFile):
                 v._dev_activate(self.get_epm()._dev_external_files_manager)
 
+    def _dev_delete_without_unregistering_links(self):
+        # links must have been unregistered (see delete)
+
+        # unregister hooks
+        self._unregister_hooks()
+
+        # unregister external files
+        self._unregister_external_files()
+
+        # tell table to remove without unregistering
+        self.get_table()._dev_remove_record_without_unregistering(self)
+
+        # make stale
+        self._table = None
+        self._data = None
+
     # --------------------------------------------- public api ---------------------------------------------------------
     # python magic
     def __repr__(self):
@@ -271,7 +369,7 @@ class Record:
             raise IndexError("index out of range")
 
         # get value
-        value = self._data.get(item)
+        value = self._get_value(item)
 
         # transform if hook or link
         if isinstance(value, RecordHook):
@@ -304,6 +402,9 @@ class Record:
         item: str
             field name
         """
+        # record attributes that are not set yet (record is being created) are not fields
+        if item in Record.__slots__:
+            raise AttributeError(item)
         index = self._table._dev_descriptor.get_field_index(item)
         return self[index]
 
@@ -318,8 +419,8 @@ class Record:
         value
             value to set
         """
-        if name in self.__dict__ or not self._initialized:
-            super().__setattr__(name, value)
+        if name in Record.__slots__:
+            _set_slot(self, name, value)
             return
         self.update({name: value})
 
@@ -334,7 +435,7 @@ class Record:
         return [
             f"f{i}" if fd.ref is None else fd.ref for
             (i, fd) in enumerate(self._table._dev_descriptor.field_descriptors)
-        ] + list(self.__dict__)
+        ] + list(Record.__slots__)
 
     def __len__(self):
         """
@@ -344,7 +445,7 @@ class Record:
         -------
         int
         """
-        biggest_index = -1 if (len(self._data) == 0) else max(self._data)
+        biggest_index = len(self._data) - 1
 
         # manage extensible
         if self.is_extensible():
@@ -486,7 +587,7 @@ class Record:
         )
 
         # get value
-        value = self._data.get(index)
+        value = self._get_value(index)
 
         # serialize
         value = value.serialize() if isinstance(value, (Link, RecordHook)) else value
@@ -528,7 +629,7 @@ class Record:
         list of opyplus.epm.external_file.ExternalFile
             external files contained by record.
         """
-        return [v for v in self._data.values() if isinstance(v, ExternalFile)]
+        return [v for v in self._data if isinstance(v, ExternalFile)]
 
     # construct
     def update(self, data=None, **or_data):
@@ -556,9 +657,7 @@ class Record:
 
         self._update_inert(data)
 
-        self._dev_activate_hooks()
-        self._dev_activate_links()
-        self._dev_activate_external_files()
+        self._table._epm._dev_activate_records((self,))
 
     def set_comment(self, comment):
         """
@@ -571,6 +670,9 @@ class Record:
         # todo-later: manage properly (for the moment only used in to_idf)
         self._comment = comment
 
+        # record no longer matches the idf block it was created from (see Epm.update_from_idf)
+        self._table._epm._dev_idf_blocks.pop(self, None)
+
     def copy(self, new_name=None):
         """
         Copy record.
@@ -589,18 +691,18 @@ class Record:
         # todo: [GL] check this really works, !! must not use same link, hook, external_file, ... for different records
         # no pk tables can just be copied
         if self._table._dev_no_pk:
-            return self._table.add(self._data)
+            return self._table.add(dict(self._dev_iter_items()))
 
         # for ref pk tables, must manage name
         name = str(uuid.uuid4()) if new_name is None else new_name
-        new_data = dict((k, name if k == 0 else v) for (k, v) in self._data.items())
+        new_data = dict((k, name if k == 0 else v) for (k, v) in self._dev_iter_items())
         return self._table.add(new_data)
 
     def set_defaults(self):
         """Set all empty fields for which a default value is defined to default value."""
         defaults = {}
         for i in range(len(self)):
-            if i in self._data:
+            if self._get_value(i) is not None:
                 continue
             default = self.get_field_descriptor(i).tags.get("default", [None])[0]
             if default is not None:
@@ -706,18 +808,8 @@ class Record:
         # unregister links
         self._unregister_links()
 
-        # unregister hooks
-        self._unregister_hooks()
-
-        # unregister external files
-        self._unregister_external_files()
-
-        # tell table to remove without unregistering
-        self.get_table()._dev_remove_record_without_unregistering(self)
-
-        # make stale
-        self._table = None
-        self._data = None
+        # finish deletion
+        self._dev_delete_without_unregistering_links()
 
     # get idd info
     def get_field_descriptor(self, ref_or_index):
@@ -786,7 +878,7 @@ class Record:
         -------
         dict
         """
-        return collections.OrderedDict(sorted(self._data.items()))
+        return collections.OrderedDict(self._dev_iter_items())
 
     def to_json_data(self, model_name=None):
         """
@@ -804,7 +896,7 @@ class Record:
         """
         return collections.OrderedDict(
             [("_comment", self._comment)]
-            + [(k, self.get_serialized_value(k, model_name=model_name)) for k in self._data]
+            + [(k, self.get_serialized_value(k, model_name=model_name)) for k, _ in self._dev_iter_items()]
         )
 
     def to_idf(self, model_name=None):
@@ -823,7 +915,7 @@ class Record:
         json_data = self.to_json_data(model_name=model_name)
 
         # comment
-        s = "" if self._comment == "" else f"{textwrap.indent(self._comment, '! ')}\n"
+        s = "" if self._comment == "" else f"{textwrap.indent(self._comment, '! ', lambda line: True)}\n"
 
         # record descriptor ref
         s += f"{self._table._dev_descriptor.table_name},\n"
@@ -832,7 +924,7 @@ class Record:
         # fields_nb: we don't use len(self) but max(self). We wan't to stop if no more values (even base fields)
         #   because some idd records are defined without extensibles (although they should used them), for example
         #   construction, and eplus does not know what to do...
-        fields_nb = max(self._data)+1
+        fields_nb = len(self._data)
         for i in range(fields_nb):
             # value
             tab = " " * TAB_LEN
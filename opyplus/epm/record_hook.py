@@ -22,6 +22,8 @@ class RecordHook:
     target_record: owner of the hook
     """
 
+    __slots__ = ("references", "target_index", "target_value", "target_record")
+
     def __init__(self, references, index, value):
         # target_value must always be relevant : !! don't forget to deactivate hook if field of record changes !!
         self.references = references
@@ -2,6 +2,7 @@
 
 from .multi_table_queryset import MultiTableQueryset
 from ..exceptions import FieldValidationError
+from ..idd.util import table_name_to_ref
 
 
 class RelationsManager:
@@ -105,6 +106,45 @@ class RelationsManager:
         for ref in references:
             self._table_hooks[(ref, table_lower_name)] = table
 
+    def _create_hook_table(self, table_name):
+        # tables are created lazily by epm, and register their table hooks when created: table that may be pointed
+        # must therefore be created before looking for a table hook
+        if not isinstance(table_name, str):
+            return
+        try:
+            self._epm._dev_get_table(table_name_to_ref(table_name).lower())
+        except KeyError:  # not a table name
+            pass
+
+    def _dev_find_link_target(self, hook_references, hook_value):
+        """
+        Find the record or table a link would point on.
+
+        Parameters
+        ----------
+        hook_references: typing.Iterable[str]
+        hook_value: str
+
+        Returns
+        -------
+        tuple
+            (target_record, target_table), (None, None) if not found
+        """
+        keys = tuple((ref, hook_value) for ref in hook_references)
+
+        # look for a record hook
+        for k in keys:
+            if k in self._record_hooks:
+                return self._record_hooks[k].target_record, None
+
+        # look for a table hook
+        self._create_hook_table(hook_value)
+        for k in keys:
+            if k in self._table_hooks:
+                return None, self._table_hooks[k]
+
+        return None, None
+
     def register_link(self, link):
         """
         Register a new link.
@@ -117,27 +157,16 @@ class RelationsManager:
         -----
         source record and index must have been set
         """
-        keys = tuple((ref, link.initial_hook_value) for ref in link.hook_references)
-
-        # look for a record hook
-        for k in keys:
-            if k in self._record_hooks:
-                # set link target
-                link.set_target(target_record=self._record_hooks[k].target_record)
-                break
-        else:
-            # look for a table hook
-            for k in keys:
-                if k in self._table_hooks:
-                    # set link target
-                    link.set_target(target_table=self._table_hooks[k])
-                    break
-            else:
-                field_descriptor = link.source_record.get_field_descriptor(link.source_index)
-                raise FieldValidationError(
-                    f"No object found with any of given references : {keys}. "
-                    f"{field_descriptor.get_error_location_message(link.initial_hook_value)}"
-                )
+        # set link target
+        target_record, target_table = self._dev_find_link_target(link.hook_references, link.initial_hook_value)
+        if (target_record is None) and (target_table is None):
+            keys = tuple((ref, link.initial_hook_value) for ref in link.hook_references)
+            field_descriptor = link.source_record.get_field_descriptor(link.source_index)
+            raise FieldValidationError(
+                f"No object found with any of given references : {keys}. "
+                f"{field_descriptor.get_error_location_message(link.initial_hook_value)}"
+            )
+        link.set_target(target_record=target_record, target_table=target_table)
 
         # store by source
         if link.source_record not in self._links_by_source:
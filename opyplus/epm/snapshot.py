@@ -0,0 +1,174 @@
+"""
+Binary snapshots of epms.
+
+A snapshot stores already deserialized record values, so loading it skips field deserialization and validation (only
+relations are rebuilt, in bulk). It is tagged with the idd version of the epm.
+
+Records are stored table by table, as (comment, data, special_data): data contains plain values (list of values by
+field position, see opyplus.epm.record.Record, hooks, links and external files are replaced by None), special_data
+contains hooks, links and external files, as (index, kind, value):
+ - hook: (index, _HOOK, target_value)
+ - link: (index, _LINK, serialized target, i.e. target record name or target table lower name)
+ - external file: (index, _EXTERNAL_FILE, ref)
+
+!! Snapshots are pickle files: only load snapshots you trust. !!
+"""
+import pickle
+
+from .link import Link
+from .record_hook import RecordHook
+from .external_file import ExternalFile
+
+SNAPSHOT_FORMAT_VERSION = 2  # must be incremented each time payload structure changes
+_MAGIC = b"OPYPLUS-EPM-SNAPSHOT\n"
+
+_HOOK, _LINK, _EXTERNAL_FILE = 0, 1, 2
+
+
+def _dump_record(record):
+    data, special_data = list(record._data), []
+    for index, value in enumerate(data):
+        if isinstance(value, RecordHook):
+            special_data.append((index, _HOOK, value.target_value))
+        elif isinstance(value, Link):
+            special_data.append((index, _LINK, value.serialize()))
+        elif isinstance(value, ExternalFile):
+            special_data.append((index, _EXTERNAL_FILE, value.ref))
+        else:
+            continue
+        data[index] = None
+    return record._comment, data, special_data
+
+
+def dump(epm, buffer_or_path):
+    """
+    Write an epm snapshot.
+
+    Parameters
+    ----------
+    epm: opyplus.Epm
+    buffer_or_path: str or typing.BinaryIO
+    """
+    tables_data = []
+    for table in epm._get_created_tables():
+        if len(table) == 0:
+            continue
+        tables_data.append((
+            table.get_ref().lower(),
+            [_dump_record(record) for record in table]
+        ))
+
+    payload = pickle.dumps(
+        dict(
+            idd_version=epm._dev_idd.version,
+            check_required=epm._dev_check_required,
+            check_length=epm._dev_check_length,
+            comment=epm._comment,
+            external_files=dict(epm._dev_external_files_manager._contents),
+            tables=tables_data
+        ),
+        protocol=pickle.HIGHEST_PROTOCOL
+    )
+    header = _MAGIC + SNAPSHOT_FORMAT_VERSION.to_bytes(4, "little")
+
+    if isinstance(buffer_or_path, str):
+        with open(buffer_or_path, "wb") as f:
+            f.write(header)
+            f.write(payload)
+    else:
+        buffer_or_path.write(header)
+        buffer_or_path.write(payload)
+
+
+def load(buffer_or_path, epm_cls, idd_or_version=None):
+    """
+    Load an epm snapshot.
+
+    Parameters
+    ----------
+    buffer_or_path: str or typing.BinaryIO
+    epm_cls: type
+        epm class
+    idd_or_version: tuple or Idd or None
+        if None, idd of snapshot version is used
+
+    Returns
+    -------
+    opyplus.Epm
+
+    Raises
+    ------
+    ValueError: if file is not a snapshot, was written with another snapshot format, or idd version is not the
+        snapshot one
+    """
+    if isinstance(buffer_or_path, str):
+        with open(buffer_or_path, "rb") as f:
+            content = f.read()
+    else:
+        content = buffer_or_path.read()
+
+    # check header
+    if not content.startswith(_MAGIC):
+        raise ValueError("given file is not an epm snapshot")
+    format_version = int.from_bytes(content[len(_MAGIC):len(_MAGIC) + 4], "little")
+    if format_version != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(
+            f"snapshot was written with format version {format_version}, current version is "
+            f"{SNAPSHOT_FORMAT_VERSION} (snapshot must be generated again)"
+        )
+    data = pickle.loads(memoryview(content)[len(_MAGIC) + 4:])
+
+    # prepare idd
+    version = data["idd_version"]
+    if idd_or_version is None:
+        idd_or_version = version
+    epm = epm_cls(
+        check_required=data["check_required"],
+        check_length=data["check_length"],
+        idd_or_version=idd_or_version
+    )
+    if epm._dev_idd.version[:2] != version[:2]:
+        raise ValueError(
+            f"snapshot idd version is {version}, can't load it with idd version {epm._dev_idd.version}"
+        )
+
+    # populate
+    epm._comment = data["comment"]
+    external_files_manager = epm._dev_external_files_manager
+    external_files_manager.populate_from_json_data(data["external_files"])
+    hooks, links, external_files = [], [], []  # [(value, record), ...]
+    for table_lower_ref, records_data in data["tables"]:
+        table = epm._dev_get_table(table_lower_ref)
+        tags = {}  # {index: field descriptor tags, ...}
+        for comment, record_data, special_data in records_data:
+            # create inert hooks, links and external files (must be done before adding record: id may be a hook)
+            record_specials = []  # [(values, value), ...]
+            for index, kind, value in special_data:
+                if kind == _EXTERNAL_FILE:
+                    record_data[index] = ExternalFile(value)
+                    record_specials.append((external_files, record_data[index]))
+                    continue
+                index_tags = tags.get(index)
+                if index_tags is None:
+                    index_tags = tags[index] = table._dev_descriptor.get_field_descriptor(index).tags
+                if kind == _HOOK:
+                    record_data[index] = RecordHook(index_tags.get("reference", ()), index, value)
+                    record_specials.append((hooks, record_data[index]))
+                else:
+                    record_data[index] = Link(index_tags["object-list"], value, index)
+                    record_specials.append((links, record_data[index]))
+
+            # add record
+            record = table._dev_add_trusted(record_data, comment)
+            for values, value in record_specials:
+                values.append((value, record))
+
+    # activate hooks, then links and external files
+    for hook, record in hooks:
+        hook.activate(record)
+    for link, record in links:
+        link.activate(record)
+    for external_file, _ in external_files:
+        external_file._dev_activate(external_files_manager)
+
+    return epm
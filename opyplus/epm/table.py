@@ -1,7 +1,9 @@
 """Epm table module."""
 
 from .record import Record
-from .queryset import Queryset
+from .queryset import Queryset, _NoPkError
+from .table_index import TableIndex
+from .query import compile_lookups, iter_records, batch_select_records
 from ..exceptions import FieldValidationError, RecordDoesNotExistError
 
 
@@ -71,11 +73,12 @@ class Table:
         self._dev_descriptor = table_descriptor
         self._epm = epm
         self._records = dict()
+        self._dev_indexes = {}  # {field_index: TableIndex, ...}, see create_index
 
         # no pk if first field is not a required reference
         self._dev_no_pk = not (
                 (table_descriptor.field_descriptors[0].detailed_type == "reference") and
-                ("required-field" in table_descriptor.field_descriptors[0].tags)
+                table_descriptor.field_descriptors[0].is_required
         )
 
         # monkey-patch add
@@ -100,14 +103,15 @@ class Table:
         # store with new id
         self._records[new_id] = record
 
-    def _dev_add_inert(self, records_data):
-        # Inert: hooks and links are not activated.
+    def _dev_add_inert(self, records_data, trusted=False):
+        # Inert: hooks and links are not activated. If trusted, records data are raw idf values written by opyplus.
         added_records = []
         for r_data in records_data:
             # create record
             record = Record(
                 self,
-                data=r_data
+                data=r_data,
+                trusted=trusted
             )
 
             # store
@@ -119,8 +123,24 @@ class Table:
 
         return added_records
 
+    def _dev_add_trusted(self, record_data, comment=""):
+        # Inert, and record data is not checked (already deserialized values, see opyplus.epm.snapshot).
+        record = Record._dev_create_trusted(self, record_data, comment=comment)
+        self._records[record.id] = record
+        if self._dev_indexes:
+            self._dev_mark_indexes_dirty(record)
+        return record
+
     def _dev_remove_record_without_unregistering(self, record):
         del self._records[record.id]
+        self._epm._dev_idf_blocks.pop(record, None)
+        if self._dev_indexes:
+            self._dev_mark_indexes_dirty(record)
+
+    def _dev_mark_indexes_dirty(self, record):
+        # record was added, updated or deleted
+        for index in self._dev_indexes.values():
+            index.mark_dirty(record)
 
     # --------------------------------------------- public api ---------------------------------------------------------
     def __repr__(self):
@@ -220,7 +240,7 @@ class Table:
         return self._epm
 
     # explore
-    def select(self, filter_by=None):
+    def select(self, filter_by=None, **lookups):
         """
         Select records from Table by applying a filter.
 
@@ -230,15 +250,65 @@ class Table:
             Callable must take one argument (a record of table), and return True to keep record, or False to skip it.
             Example : .select(lambda x: x.name == "my_name").
             If None (default), records are not filtered.
+        lookups:
+            field lookups records must match: <field>[__<field>...][__<operator>]=<value>, operators are exact
+            (default), in, gt, gte, lt, lte, range, startswith and regex, following fields are fields of pointed
+            records (see opyplus.epm.query). Indexes are used if they exist (see create_index).
+            Examples : .select(zone_name="my_zone"), .select(surface_type__in=("wall", "roof"), name__startswith="n"),
+            .select(zone_name__x_origin__range=(0, 10)).
 
         Returns
         -------
         Queryset
         """
-        records = self._records.values() if filter_by is None else filter(filter_by, self._records.values())
-        return Queryset(self, records=records)
+        return Queryset(self, records=self.iter_select(filter_by=filter_by, **lookups))
+
+    def iter_select(self, filter_by=None, **lookups):
+        """
+        Iterate lazily on records selected by a filter (see select).
+
+        Parameters
+        ----------
+        filter_by: typing.Callable or None
+        lookups:
+            see select
+
+        Returns
+        -------
+        typing.Iterator[Record]
+            records are not sorted
+
+        Notes
+        -----
+        Indexed lookups are resolved on call, other lookups and filter_by are evaluated during iteration.
+        """
+        records = iter_records(self, compile_lookups(self, lookups)) if len(lookups) > 0 else self._records.values()
+        return iter(records) if filter_by is None else filter(filter_by, records)
+
+    def batch_select(self, queries):
+        """
+        Select records of multiple queries at once.
+
+        Parameters
+        ----------
+        queries: typing.Iterable[dict]
+            lookups of each query (see select). Example: .batch_select([dict(zone_name="z1"), dict(zone_name="z2")])
+
+        Returns
+        -------
+        typing.List[Queryset]
+            one queryset per query
+
+        Notes
+        -----
+        Queries that can't use indexes share a single scan of table records.
+        """
+        return [
+            Queryset(self, records=records) for records in
+            batch_select_records(self, [compile_lookups(self, lookups) for lookups in queries])
+        ]
 
-    def one(self, filter_by=None):
+    def one(self, filter_by=None, **lookups):
         """
         Get a single record from the Table by applying a filter. If we get more than one record, raise.
 
@@ -249,6 +319,8 @@ class Table:
             if callable: a callable must take one argument (a record of table), and return True to keep record,
             or False to skip it. Example : .one(lambda x: x.name == "my_name").
             if None (default): records are not filtered.
+        lookups:
+            see select
 
         Returns
         -------
@@ -257,7 +329,7 @@ class Table:
         Raises
         ------
         TypeError
-            if id search on a table that does not have a pk
+            if id search on a table that does not have a pk (also a KeyError, as Queryset.one)
         RecordDoesNotExistError
             if no record is found
         MultipleRecordsReturnedError
@@ -265,13 +337,55 @@ class Table:
         """
         if isinstance(filter_by, str):
             if self._dev_no_pk:
-                raise TypeError(f"table {self.get_ref()} does not have a primary key, can't use string syntax")
+                raise _NoPkError(f"table {self.get_ref()} does not have a primary key, can't use string syntax")
             try:
                 return self._records[filter_by]
             except KeyError:
                 raise RecordDoesNotExistError(
                     f"table {self.get_ref()} does not contain a record who's id is '{filter_by}'")
-        return Queryset(self, records=self._records.values()).one(filter_by=filter_by)
+        return self.select(**lookups).one(filter_by=filter_by)
+
+    # indexes
+    def create_index(self, field):
+        """
+        Create a secondary index on a field, used by select and one to find records by field lookups.
+
+        Parameters
+        ----------
+        field: str or int
+            field lowercase name or position
+
+        Notes
+        -----
+        Index is maintained when records are added, updated or deleted (changes are applied on next lookup). Links are
+        indexed by pointed record, so renaming pointed records does not affect index.
+        Creating an index that already exists does nothing.
+
+        Examples
+        --------
+        epm.BuildingSurface_Detailed.create_index("zone_name")
+        surfaces = epm.BuildingSurface_Detailed.select(zone_name="my_zone")
+        """
+        field_index = field if isinstance(field, int) else self._dev_descriptor.get_field_index(field)
+        if field_index not in self._dev_indexes:
+            self._dev_indexes[field_index] = TableIndex(self, field_index)
+
+    def drop_index(self, field):
+        """
+        Drop a secondary index.
+
+        Parameters
+        ----------
+        field: str or int
+            field lowercase name or position
+
+        Raises
+        ------
+        KeyError
+            if field is not indexed
+        """
+        field_index = field if isinstance(field, int) else self._dev_descriptor.get_field_index(field)
+        del self._dev_indexes[field_index]
 
     # construct
     # def add(self, data=None, **or_data):
@@ -306,14 +420,8 @@ class Table:
         # add inert
         added_records = self._dev_add_inert(records_data)
 
-        # activate hooks
-        for r in added_records:
-            r._dev_activate_hooks()
-
-        # activate links and external files
-        for r in added_records:
-            r._dev_activate_links()
-            r._dev_activate_external_files()
+        # activate
+        self._epm._dev_activate_records(added_records)
 
         return Queryset(self, records=added_records)
 
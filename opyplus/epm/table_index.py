@@ -0,0 +1,180 @@
+"""
+Secondary indexes of tables (see Table.create_index).
+
+An index maps the keys of a field to the records of its table. Key of a field value is:
+ - plain value: the value
+ - record hook (record name): the name
+ - link: the pointed record or table (renaming pointed record does not change the key)
+ - external file: the external file ref
+ - empty field: None
+
+Indexes are maintained lazily: records that are added, updated or deleted are marked as dirty by their table, and are
+indexed again before next lookup. Records with links that are not activated yet (bulk mode) stay dirty until they are.
+"""
+from .record import Record
+from .link import Link, NONE_LINK
+from .record_hook import RecordHook
+from .external_file import ExternalFile
+
+_INERT = object()  # key of a value that can't be indexed yet (link that is not activated)
+_NOT_FOUND = object()  # query key of a link value that does not point on any record or table (matches no record)
+
+
+def get_record_key(record, field_index):
+    """
+    Get the key of a record field.
+
+    Parameters
+    ----------
+    record: opyplus.epm.record.Record
+    field_index: int
+
+    Returns
+    -------
+    typing.Hashable
+    """
+    value = record._get_value(field_index)
+    if isinstance(value, RecordHook):
+        return value.target_value
+    if isinstance(value, Link):
+        return _INERT if value.source_record is None else value.target
+    if isinstance(value, ExternalFile):
+        return value.ref
+    return value
+
+
+def get_query_key(table, field_index, value):
+    """
+    Get the key a record field must have to match a given value.
+
+    Parameters
+    ----------
+    table: opyplus.epm.table.Table
+    field_index: int
+    value
+        raw value (deserialized as it would be by a record update), or pointed record or table for link fields
+
+    Returns
+    -------
+    typing.Hashable
+    """
+    from .table import Table  # circular import
+
+    if isinstance(value, (Record, Table)):
+        return value
+    value = table._dev_descriptor.get_field_descriptor(field_index).deserialize(value, field_index, check_length=False)
+    if isinstance(value, RecordHook):
+        return value.target_value
+    if isinstance(value, Link):
+        if value is NONE_LINK:
+            return None
+        target_record, target_table = table.get_epm()._dev_relations_manager._dev_find_link_target(
+            value.hook_references,
+            value.initial_hook_value
+        )
+        if (target_record is None) and (target_table is None):
+            return _NOT_FOUND
+        return target_table if target_record is None else target_record
+    if isinstance(value, ExternalFile):
+        return value.ref
+    return value
+
+
+class TableIndex:
+    """
+    Secondary index of a table field.
+
+    Parameters
+    ----------
+    table: opyplus.epm.table.Table
+    field_index: int
+
+    Attributes
+    ----------
+    field_index: int
+    """
+
+    def __init__(self, table, field_index):
+        self._table = table
+        self.field_index = field_index
+        self._records_by_key = {}  # {key: {record, ...}, ...}
+        self._keys = {}  # {record: key, ...}
+        self._dirty_records = set(table._records.values())  # index is built on first lookup
+
+    def mark_dirty(self, record):
+        """
+        Mark a record as dirty: it will be indexed again before next lookup.
+
+        Parameters
+        ----------
+        record: opyplus.epm.record.Record
+        """
+        self._dirty_records.add(record)
+
+    def _refresh(self):
+        still_dirty = set()
+        records = self._table._records
+        for record in self._dirty_records:
+            # remove current key
+            old_key = self._keys.pop(record, _INERT)
+            if old_key is not _INERT:
+                key_records = self._records_by_key[old_key]
+                key_records.discard(record)
+                if len(key_records) == 0:
+                    del self._records_by_key[old_key]
+
+            # leave if record is not (or no longer) in table
+            if (record._table is not self._table) or (records.get(record.id) is not record):
+                continue
+
+            # add new key
+            key = get_record_key(record, self.field_index)
+            if key is _INERT:
+                still_dirty.add(record)
+                continue
+            self._keys[record] = key
+            self._records_by_key.setdefault(key, set()).add(record)
+        self._dirty_records = still_dirty
+
+    def get_records(self, key):
+        """
+        Get records having a given key.
+
+        Parameters
+        ----------
+        key: typing.Hashable
+            see get_query_key
+
+        Returns
+        -------
+        typing.Set[opyplus.epm.record.Record]
+            !! must not be modified !!
+        """
+        if len(self._dirty_records) > 0:
+            self._refresh()
+        return self._records_by_key.get(key, frozenset())
+
+    def get_keys_nb(self):
+        """
+        Get the number of distinct keys.
+
+        Returns
+        -------
+        int
+        """
+        if len(self._dirty_records) > 0:
+            self._refresh()
+        return len(self._records_by_key)
+
+    def iter_items(self):
+        """
+        Iterate on distinct keys and their records.
+
+        Returns
+        -------
+        typing.Iterator[typing.Tuple[typing.Hashable, typing.Set[opyplus.epm.record.Record]]]
+            !! sets must not be modified, and index must not be used before iteration is finished !!
+        """
+        if len(self._dirty_records) > 0:
+            self._refresh()
+        return iter(self._records_by_key.items())
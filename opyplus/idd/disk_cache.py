@@ -0,0 +1,138 @@
+"""
+Persistent on-disk cache of parsed idds.
+
+Parsing an idd is the largest fixed cost of a fresh process. Parsed idds are therefore pickled in a user cache
+directory (see CONF.idd_cache_dir_path) and loaded by the following processes.
+
+A cache file is only used if:
+ - it was written by the same opyplus version, with the same cache format version
+ - it was generated from an idd file that has the same checksum as the requested one
+ - its payload checksum is correct (else it is considered as corrupted, removed and rebuilt)
+"""
+import os
+import hashlib
+import pickle
+import tempfile
+import logging
+
+from ..conf import CONF
+from ..version import version as opyplus_version
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 6  # must be incremented each time pickled idd objects structure changes
+_MAGIC = b"OPYPLUS-IDD-CACHE\n"
+_CHECKSUM_LEN = 32  # sha256 digest length
+
+
+def _get_file_checksum(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def get_cache_path(idd_path, cache_dir_path=None):
+    """
+    Get cache file path of a given idd file.
+
+    Parameters
+    ----------
+    idd_path: str
+    cache_dir_path: str or None
+        if None, CONF.idd_cache_dir_path is used
+
+    Returns
+    -------
+    str
+    """
+    cache_dir_path = CONF.idd_cache_dir_path if cache_dir_path is None else cache_dir_path
+    idd_name, _ = os.path.splitext(os.path.basename(idd_path))
+    return os.path.join(
+        cache_dir_path,
+        f"{idd_name}-{_get_file_checksum(idd_path)[:16]}-opyplus{opyplus_version}-f{CACHE_FORMAT_VERSION}.pickle"
+    )
+
+
+def load(idd_path, idd_cls):
+    """
+    Load a parsed idd from the disk cache.
+
+    Parameters
+    ----------
+    idd_path: str
+        path of the source idd file
+    idd_cls: type
+        expected idd class
+
+    Returns
+    -------
+    opyplus.idd.idd.Idd or None
+        None if the cache is disabled, the cache file does not exist or is corrupted (it is then removed).
+    """
+    if CONF.idd_cache_dir_path is None:
+        return None
+
+    cache_path = get_cache_path(idd_path)
+    try:
+        with open(cache_path, "rb") as f:
+            content = f.read()
+    except OSError:
+        return None
+
+    try:
+        if not content.startswith(_MAGIC):
+            raise ValueError("wrong header")
+        checksum_end = len(_MAGIC) + _CHECKSUM_LEN
+        payload = content[checksum_end:]
+        if hashlib.sha256(payload).digest() != content[len(_MAGIC):checksum_end]:
+            raise ValueError("wrong checksum")
+        idd = pickle.loads(payload)
+        if type(idd) is not idd_cls:
+            raise ValueError(f"wrong class: {type(idd)}")
+    except Exception as e:
+        logger.warning(f"idd cache file is corrupted and will be rebuilt ({e}): {cache_path}")
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass
+        return None
+
+    return idd
+
+
+def dump(idd, idd_path):
+    """
+    Store a parsed idd in the disk cache.
+
+    Parameters
+    ----------
+    idd: opyplus.idd.idd.Idd
+    idd_path: str
+        path of the source idd file
+
+    Notes
+    -----
+    File is written atomically, so concurrent processes never read a partially written cache. Errors are logged but
+    not raised (cache directory may be read-only).
+    """
+    if CONF.idd_cache_dir_path is None:
+        return
+
+    cache_path = get_cache_path(idd_path)
+    payload = pickle.dumps(idd, protocol=pickle.HIGHEST_PROTOCOL)
+    try:
+        os.makedirs(CONF.idd_cache_dir_path, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=CONF.idd_cache_dir_path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_MAGIC)
+                f.write(hashlib.sha256(payload).digest())
+                f.write(payload)
+            os.replace(temp_path, cache_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    except OSError as e:
+        logger.warning(f"could not write idd cache file ({e}): {cache_path}")
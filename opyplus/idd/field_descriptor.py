@@ -1,6 +1,6 @@
 """Idd field_descriptor module."""
 import re
-import unidecode
+import sys
 
 from ..exceptions import FieldValidationError
 from ..epm.record import Record
@@ -11,10 +11,34 @@ from .util import isinstance_str
 
 MAX_FIELD_LENGTH = 100
 
-spaces_and_newlines_pattern = re.compile(r"[\n\r\s]+")
+spaces_and_newlines_pattern = re.compile(r"[\n\r\s]+")  # not used anymore (str.split is faster), kept for api
 not_python_var_pattern = re.compile(r"(^[^\w]+)|([^\w\d]+)")
 multiple_underscores_pattern = re.compile(r"[_]{2,}")
 
+# deserialization kinds (see FieldDescriptor.prepare_info)
+_INTEGER, _REAL, _STRING, _REFERENCE, _OBJECT_LIST = range(5)
+_DESERIALIZE_KINDS = {
+    "integer": _INTEGER,
+    "real": _REAL,
+    "alpha": _STRING,
+    "choice": _STRING,
+    "node": _STRING,
+    "external-list": _STRING,
+    "reference": _REFERENCE,
+    "object-list": _OBJECT_LIST
+}
+_NUMERIC_SPECIAL_VALUES = ("autocalculate", "autosize", "useweatherfile")
+
+try:
+    _is_ascii = str.isascii
+except AttributeError:  # python < 3.7
+    def _is_ascii(value):
+        try:
+            value.encode("ascii")
+        except UnicodeEncodeError:
+            return False
+        return True
+
 
 def _var_name_to_ref(name):
     ref = re.sub(not_python_var_pattern, "_", name.lower())
@@ -40,12 +64,28 @@ class FieldDescriptor:
     name: str or None
     ref: str or None
     tags: dict
+        {tag_ref: list of values, ...}. Use append_tag to add tags: if tags are modified directly, prepare_info must
+        be called afterwards (detailed type, is required, is file name and deserialization are derived from tags).
 
     Notes
     -----
     No checks implemented (idd is considered as ok).
     """
 
+    __slots__ = (
+        "table_descriptor",
+        "index",
+        "basic_type",
+        "name",
+        "ref",
+        "tags",
+        "_extensible_info",
+        "_detailed_type",
+        "_is_required",
+        "_is_file_name",
+        "_deserialize_info"
+    )
+
     BASIC_FIELDS = ("integer", "real", "alpha", "choice", "node", "external-list")
 
     def __init__(self, table_descriptor, index, field_basic_type, name=None):
@@ -60,7 +100,12 @@ class FieldDescriptor:
 
         # used for error messages on extensible fields
         self._extensible_info = None
+
+        # tags info, see prepare_info (None: not prepared)
         self._detailed_type = None
+        self._is_required = None
+        self._is_file_name = None
+        self._deserialize_info = None  # (kind, retain_case, is_file_name)
 
     # construct
     def append_tag(self, ref, value=None):
@@ -72,6 +117,9 @@ class FieldDescriptor:
         ref: str
         value
         """
+        # tags info must be prepared again
+        self._deserialize_info = None
+
         if ref not in self.tags:
             self.tags[ref] = []
 
@@ -81,6 +129,25 @@ class FieldDescriptor:
 
         self.tags[ref].append(value)
 
+    def pool_tag_strings(self, strings_pool):
+        """
+        Replace tag refs and values by identical strings of a pool (to reduce memory usage).
+
+        Parameters
+        ----------
+        strings_pool: dict
+            {string: string, ...}, pool of the idd being parsed
+
+        Notes
+        -----
+        Is called by TableDescriptor.prepare_extensible, once all tags have been appended. Tags dict and lists are not
+        shared, only the strings they contain.
+        """
+        self.tags = dict(
+            (strings_pool.setdefault(ref, ref), [strings_pool.setdefault(v, v) for v in values])
+            for ref, values in self.tags.items()
+        )
+
     def set_extensible_info(self, cycle_start, cycle_len, cycle_pattern):
         """
         Set the extensible info.
@@ -93,8 +160,48 @@ class FieldDescriptor:
         """
         self._extensible_info = (cycle_start, cycle_len, cycle_pattern)
 
+    def prepare_info(self):
+        """
+        Prepare info that is derived from tags (detailed type, is required, is file name, deserialization dispatch).
+
+        Notes
+        -----
+        Is called by TableDescriptor.prepare_extensible, once all tags have been appended. If tags are appended
+        afterwards (append_tag), info is prepared again on next access. If tags dict or lists are modified directly,
+        prepare_info must be called, else stale info is used.
+        """
+        tags = self.tags
+        if ("reference" in tags) or ("reference-class-name" in tags):
+            detailed_type = "reference"
+        elif "type" in tags:
+            detailed_type = tags["type"][0].lower()  # idd is not very rigorous on case
+        elif "key" in tags:
+            detailed_type = "choice"
+        elif "object-list" in tags:
+            detailed_type = "object-list"
+        elif "external-list" in tags:
+            detailed_type = "external-list"
+        elif self.basic_type == "A":
+            detailed_type = "alpha"
+        elif self.basic_type == "N":
+            detailed_type = "real"
+        else:
+            raise ValueError("Can't find detailed type.")
+        self._detailed_type = sys.intern(detailed_type)
+        self._is_required = "required-field" in tags
+        # we don't add this to detailed_type because can be a file name and something else (for example object-list)
+        self._is_file_name = (self.ref is not None) and ("file_name" in self.ref)
+
+        # kind is None if detailed type is unknown (deserialize will raise)
+        self._deserialize_info = (
+            _DESERIALIZE_KINDS.get(detailed_type),
+            "retaincase" in tags,
+            self._is_file_name
+        )
+
     # deserialize
-    def deserialize(self, value, index, check_length=True):
+
+    def deserialize(self, value, index, check_length=True, trusted=False):
         """
         Deserialize.
 
@@ -104,63 +211,92 @@ class FieldDescriptor:
         index: int
         check_length: bool
             default True
+        trusted: bool
+            default False. If True, value must be a raw idf string that was written by opyplus (or None): it is
+            considered as already normalized (stripped, mono spaced, ASCII, lower case if relevant, not too long), only
+            its type is deserialized.
 
         Notes
         -----
         index is used for extensible fields error messages (if given)
         """
-        # -- serialize if not raw type
-        # transform to string if external file
-        if isinstance(value, ExternalFile):
-            value = value.naive_short_ref
-
-        # transform to string if record
-        if isinstance(value, Record):
-            try:
-                value = value[0]
-            except IndexError:
-                raise ValueError("can't set given record because it does not have a name field")
-
-        # -- prepare if string
-        if isinstance(value, str):
-            # change multiple spaces to mono spaces
-            value = re.sub(spaces_and_newlines_pattern, lambda x: " ", value.strip())
+        if self._deserialize_info is None:
+            self.prepare_info()
+        kind, retain_case, is_file_name = self._deserialize_info
+        if kind is None:
+            raise RuntimeError("should not be here")
 
-            # see if still not empty
+        if trusted:
             if value == "":
-                return None
-
-            # make ASCII compatible
-            value = unidecode.unidecode(value)  # todo: is this still useful ?
-
-            # make lower case if not retaincase
-            if "retaincase" not in self.tags:
-                value = value.lower()
+                value = None
+        else:
+            # -- serialize if not raw type
+            # transform to string if external file
+            if isinstance(value, ExternalFile):
+                value = value.naive_short_ref
 
-            # check not too big
-            if check_length and (len(value) >= MAX_FIELD_LENGTH):
-                raise FieldValidationError(
-                    f"Field has more than {MAX_FIELD_LENGTH} characters which is the limit. "
-                    f"{self.get_error_location_message(value, index=index)}"
-                )
+            # transform to string if record
+            elif isinstance(value, Record):
+                try:
+                    value = value[0]
+                except IndexError:
+                    raise ValueError("can't set given record because it does not have a name field")
+
+            # -- prepare if string
+            if isinstance(value, str):
+                # change multiple spaces (and newlines) to mono spaces
+                value = " ".join(value.split())
+
+                # see if still not empty
+                if value == "":
+                    return None
+
+                # make ASCII compatible
+                if not _is_ascii(value):
+                    import unidecode  # long to import (large tables)
+                    value = unidecode.unidecode(value)  # todo: is this still useful ?
+
+                # make lower case if not retaincase
+                if not retain_case:
+                    value = value.lower()
+
+                # check not too big
+                if check_length and (len(value) >= MAX_FIELD_LENGTH):
+                    raise FieldValidationError(
+                        f"Field has more than {MAX_FIELD_LENGTH} characters which is the limit. "
+                        f"{self.get_error_location_message(value, index=index)}"
+                    )
 
         # transform to external file if relevant
-        if self.is_file_name:
+        if is_file_name:
             value = ExternalFile.deserialize(value)
 
         # -- deserialize
 
+        # simple string types
+        if kind == _STRING:
+            # manage none
+            if value is None:
+                return None
+
+            # ensure it was str
+            if not isinstance_str(value):
+                raise FieldValidationError(
+                    f"Value must be a string. {self.get_error_location_message(value, index=index)}"
+                )
+            return value
+
         # numeric types
-        if self.detailed_type in ("integer", "real"):
+        if kind == _REAL or kind == _INTEGER:
             # manage none
             if value is None:
                 return None
 
             # special values: auto-calculate, auto-size, use-weather-file
-            if value in ("autocalculate", "autosize", "useweatherfile"):
+            if value in _NUMERIC_SPECIAL_VALUES:
                 return value
 
-            if self.detailed_type == "integer":
+            if kind == _INTEGER:
                 try:
                     try:
                         return int(value)
@@ -181,39 +317,23 @@ class FieldDescriptor:
                     f"Couldn't parse to float. {self.get_error_location_message(value, index=index)}"
                 )
 
-        # simple string types
-        if self.detailed_type in ("alpha", "choice", "node", "external-list"):
-            # manage none
-            if value is None:
-                return None
-
-            # ensure it was str
-            if not isinstance_str(value):
-                raise FieldValidationError(
-                    f"Value must be a string. {self.get_error_location_message(value, index=index)}"
-                )
-            return value
-
         # manage hooks (eplus reference)
-        if self.detailed_type == "reference":
+        if kind == _REFERENCE:
             # manage None
             if value is None:
                 return NONE_RECORD_HOOK
 
             # reference class name appears in v9.0.1
-            references = self.tags.get("reference", [])
+            references = self.tags.get("reference", ())
             # table_name, index, value, references, class_references
             return RecordHook(references, index, value)
 
         # manage links (eplus object-list)
-        if self.detailed_type == "object-list":
-            # manage None
-            if value is None:
-                return NONE_LINK
-
-            return Link(self.tags["object-list"], value, index)
+        # manage None
+        if value is None:
+            return NONE_LINK
 
-        raise RuntimeError("should not be here")
+        return Link(self.tags["object-list"], value, index)
 
     # get info
     @property
@@ -225,7 +345,9 @@ class FieldDescriptor:
         -------
         bool
         """
-        return "required-field" in self.tags
+        if self._deserialize_info is None:
+            self.prepare_info()
+        return self._is_required
 
     @property
     def is_file_name(self):
@@ -236,8 +358,9 @@ class FieldDescriptor:
         -------
         bool
         """
-        # we don't add this to detailed_type because can be a file name and something else (for example object-list)
-        return "file_name" in self.ref
+        if self._deserialize_info is None:
+            self.prepare_info()
+        return self._is_file_name
 
     def check_not_required(self):
         """
@@ -265,23 +388,8 @@ class FieldDescriptor:
         Uses EPlus double approach of type ('type' tag, and/or 'key', 'object-list', 'external-list', 'reference' tags)
         to determine detailed type.
         """
-        if self._detailed_type is None:
-            if ("reference" in self.tags) or ("reference-class-name" in self.tags):
-                self._detailed_type = "reference"
-            elif "type" in self.tags:
-                self._detailed_type = self.tags["type"][0].lower()  # idd is not very rigorous on case
-            elif "key" in self.tags:
-                self._detailed_type = "choice"
-            elif "object-list" in self.tags:
-                self._detailed_type = "object-list"
-            elif "external-list" in self.tags:
-                self._detailed_type = "external-list"
-            elif self.basic_type == "A":
-                self._detailed_type = "alpha"
-            elif self.basic_type == "N":
-                self._detailed_type = "real"
-            else:
-                raise ValueError("Can't find detailed type.")
+        if self._deserialize_info is None:
+            self.prepare_info()
         return self._detailed_type
 
     def get_error_location_message(self, value=None, index=None):
@@ -11,19 +11,52 @@ field descriptor: descriptor of a field of a record
 pointing records (has tag 'object-list'): object that points towards another object
 pointed record (has tag 'reference'): object being pointed by another object
 """
+import os
 import re
+import io
+import gc
 import logging
+import threading
+import collections.abc
 
 from ..conf import CONF
-from ..util import to_buffer, version_str_to_version
-from .idd_debug import correct_idd
+from ..util import to_buffer, version_str_to_version, detect_encoding
+from .idd_debug import correct_idd, correct_table_descriptor
 from .table_descriptor import TableDescriptor
+from .util import table_name_to_ref
 from .resources import get_idd_path
+from . import disk_cache
+from .idd_diff import IddDiff
 
 logger = logging.getLogger(__name__)
 
 
+# line patterns (are only tried on lines whose first non blank character may match)
+_GROUP_PATTERN = re.compile(r"\\\s*group (.+)$")  # some idds (>= 8.7) contain '\ group' lines
+_TAG_PATTERN = re.compile(r"([\w\-\>\<:]+) (.*)$")
+_NAMED_FIELD_PATTERN = re.compile(r"\s*([AN])\d+\s*[;,]\s*\\[fF]ield (.*)$")
+_UNNAMED_FIELDS_PATTERN = re.compile(r"\s*([AN]\d+[;,]\s*)+.*$")
+_TABLE_PATTERN = re.compile(r"\s*([\w:\-]+),\s*$")
+
+# lazy scan patterns (same as above, but on bytes)
+_GROUP_BYTES_PATTERN = re.compile(_GROUP_PATTERN.pattern.encode())
+_UNNAMED_FIELDS_BYTES_PATTERN = re.compile(_UNNAMED_FIELDS_PATTERN.pattern.encode())
+_TABLE_BYTES_PATTERN = re.compile(_TABLE_PATTERN.pattern.encode())
+
 _IDD_CACHE = {}  # {(major, minor): idd,... stores standard idds to prevent from parsing them each time
+_IDD_CACHE_LOCKS = {}  # {(major, minor): lock, ...} so concurrent callers share one parse
+_IDD_CACHE_LOCKS_LOCK = threading.Lock()
+
+
+def _reset_idd_cache_locks():
+    # a forked child only has one thread: locks held by other threads of the parent would never be released
+    global _IDD_CACHE_LOCKS_LOCK
+    _IDD_CACHE_LOCKS.clear()
+    _IDD_CACHE_LOCKS_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_idd_cache_locks)
 
 
 class Idd:
@@ -34,18 +67,22 @@ class Idd:
     ----------
     version_or_buffer_or_path: tuple or typing.StringIO or str or None
     apply_corrections: bool
+    lazy: bool
+        if True, idd file is only scanned (byte offset of each table is stored), and each table descriptor is parsed
+        on first access (idd.table_descriptors[table_lower_ref]). Requires a version or a path.
 
     Attributes
     ----------
     path: str or None
     buffer: typing.StringIO or None
-    table_descriptors: dict
+    table_descriptors: dict or typing.Mapping
+        {table_lower_ref: table_descriptor, ...}
     """
 
     version = None
     build = None
 
-    def __init__(self, version_or_buffer_or_path=None, apply_corrections=True):
+    def __init__(self, version_or_buffer_or_path=None, apply_corrections=True, lazy=False):
         # prepare variables
         if version_or_buffer_or_path is None:
             buffer_or_path = get_idd_path(CONF.default_idd_version)
@@ -54,6 +91,14 @@ class Idd:
         else:
             buffer_or_path = version_or_buffer_or_path
 
+        # lazy: only scan
+        if lazy:
+            if not isinstance(buffer_or_path, str):
+                raise ValueError("a lazy idd can only be created from a version or a path")
+            self.path = buffer_or_path
+            self.table_descriptors = self._scan(apply_corrections)
+            return
+
         # transform to buffer
         self.path, buffer = to_buffer(buffer_or_path)
 
@@ -67,63 +112,209 @@ class Idd:
         if apply_corrections:
             correct_idd(self)
 
-        # prepare extensible table_descriptors
+        # prepare extensible table_descriptors (pool is only used while parsing)
+        strings_pool = {}
         for table_ref, table_descriptor in self.table_descriptors.items():
-            table_descriptor.prepare_extensible()
+            table_descriptor.prepare_extensible(strings_pool=strings_pool)
 
     @classmethod
     def _dev_get_from_cache(cls, version):
         major, minor, patch = version
-        if (major, minor) not in _IDD_CACHE:
-            idd = cls(version_or_buffer_or_path=version)
-            _IDD_CACHE[(major, minor)] = idd
-        return _IDD_CACHE[(major, minor)]
-
-    def _parse(self, open_buffer):
-        # variables
-        group_name, rd, field_descriptor = None, None, None
+        key = (major, minor)
+
+        # fast path, no lock
+        idd = _IDD_CACHE.get(key)
+        if idd is not None:
+            return idd
+
+        # one lock per version: other versions may be loaded concurrently
+        with _IDD_CACHE_LOCKS_LOCK:
+            lock = _IDD_CACHE_LOCKS.setdefault(key, threading.Lock())
+
+        with lock:
+            if key in _IDD_CACHE:  # was loaded by another thread while we were waiting
+                return _IDD_CACHE[key]
+
+            idd_path = get_idd_path(version)
+            if CONF.lazy_idd:
+                # lazy idds are not stored on disk (scan is cheap)
+                idd = cls(version_or_buffer_or_path=idd_path, lazy=True)
+            else:
+                # try disk cache before parsing
+                idd = disk_cache.load(idd_path, cls)
+            if idd is None:
+                idd = cls(version_or_buffer_or_path=idd_path)
+                disk_cache.dump(idd, idd_path)
+            _IDD_CACHE[key] = idd
+        return idd
 
+    @classmethod
+    def preload(cls, versions=None, freeze_gc=False):
+        """
+        Load idds in cache, so they are not parsed by the following Epm creations.
+
+        Parameters
+        ----------
+        versions: typing.Iterable[tuple] or None
+            versions to load (x.x.x), if None, CONF.default_idd_version is loaded
+        freeze_gc: bool
+            if True, all objects are moved to the garbage collector permanent generation (gc.freeze), so the garbage
+            collector of forked processes does not write into the pages containing the idds
+
+        Returns
+        -------
+        list of Idd
+
+        Notes
+        -----
+        Call this function before forking (for example before creating a multiprocessing pool): child processes will
+        inherit loaded idds copy-on-write instead of parsing them. Lazy idds table descriptors are all parsed.
+        """
+        if versions is None:
+            versions = [CONF.default_idd_version]
+
+        idds = []
+        for version in versions:
+            idd = cls._dev_get_from_cache(version)
+            if not isinstance(idd.table_descriptors, dict):  # lazy: parse all
+                collections.deque(idd.table_descriptors.values(), maxlen=0)
+            idds.append(idd)
+
+        if freeze_gc and hasattr(gc, "freeze"):
+            gc.collect()
+            gc.freeze()
+
+        return idds
+
+    def diff(self, other):
+        """
+        Get differences between this idd and another one.
+
+        Parameters
+        ----------
+        other: Idd
+            new idd
+
+        Returns
+        -------
+        opyplus.idd.idd_diff.IddDiff
+
+        Examples
+        --------
+        idd_diff = Idd((8, 5, 0)).diff(Idd((8, 6, 0)))
+        epm = Epm(idd_diff.apply(old_epm.to_json_data()), idd_or_version=(8, 6, 0))
+        """
+        return IddDiff(self, other)
+
+    def _parse_header(self, version_row, build_row):
         # store version
-        row = next(open_buffer)
-        _, version_str = row.split("IDD_Version ")
+        _, version_str = version_row.split("IDD_Version ")
         self.version = version_str_to_version(version_str)
 
         # store build
-        row = next(open_buffer)
-        row_l = row.split("IDD_BUILD ")
+        row_l = build_row.split("IDD_BUILD ")
         if len(row_l) == 2:  # this row appeared in idd >= 8.2.0
-            _, self.build = row.split("IDD_BUILD ")
+            _, self.build = row_l
+
+    def _parse(self, open_buffer):
+        # header
+        self._parse_header(next(open_buffer), next(open_buffer))
 
         # iter
-        for i, raw_line in enumerate(open_buffer):
-            line = raw_line.split("!")[0]  # we tear comment
+        _parse_lines(open_buffer, self.table_descriptors, first_line_num=3)
+
+    def _scan(self, apply_corrections):
+        encoding = detect_encoding(self.path)
+        locations = {}  # {table_lower_ref: (group_name, start_offset, end_offset, first_line_num), ...}
+
+        with open(self.path, "rb") as f:
+            # header
+            self._parse_header(f.readline().decode(encoding), f.readline().decode(encoding))
+
+            # iter
+            offset = f.tell()
+            # current_table: (table_lower_ref, group_name, start_offset, first_line_num)
+            group_name, current_table = None, None
+            for i, raw_line in enumerate(f):
+                line = raw_line.partition(b"!")[0]
+                stripped_line = line.lstrip()
+                line_offset, offset = offset, offset + len(raw_line)
+
+                # a table ends when a group or another table starts (see _parse_lines)
+                if stripped_line[:1] == b"\\":
+                    match = _GROUP_BYTES_PATTERN.match(line)
+                    if match is None:
+                        continue
+                    new_table, group_name = None, match.group(1).decode(encoding).strip()
+                else:
+                    match = _TABLE_BYTES_PATTERN.match(line)
+                    if (match is None) or (
+                            (stripped_line[:1] in (b"A", b"N")) and (_UNNAMED_FIELDS_BYTES_PATTERN.match(line))):
+                        continue
+                    table_name = match.group(1).decode(encoding).strip()
+                    new_table = (table_name_to_ref(table_name).lower(), group_name, line_offset, i + 3)
+
+                # store current table location
+                if current_table is not None:
+                    table_lower_ref, table_group_name, start_offset, first_line_num = current_table
+                    locations[table_lower_ref] = (table_group_name, start_offset, line_offset, first_line_num)
+                current_table = new_table
+
+            # last table
+            if current_table is not None:
+                table_lower_ref, table_group_name, start_offset, first_line_num = current_table
+                locations[table_lower_ref] = (table_group_name, start_offset, offset, first_line_num)
+
+        return _LazyTableDescriptors(self, locations, encoding, apply_corrections)
+
+
+def _parse_lines(lines, table_descriptors, first_line_num=1, group_name=None):
+    """
+    Parse idd lines (single pass, lines are classified using their first non blank character).
 
-            # blank line
-            if re.search(r"^\s*$", line) is not None:
-                continue
+    Parameters
+    ----------
+    lines: typing.Iterable[str]
+    table_descriptors: dict
+        parsed table descriptors are stored in this dict
+    first_line_num: int
+        used for error messages
+    group_name: str or None
+        current group name (if lines don't start with a group)
+    """
+    # variables
+    rd, field_descriptor = None, None
+
+    for i, raw_line in enumerate(lines):
+        line = raw_line.partition("!")[0]  # we tear comment
+        stripped_line = line.lstrip()
+
+        # blank line
+        if stripped_line == "":
+            continue
 
-            # group comment (must be before comments)
-            match = re.search(r"^\\group (.+)$", line)
+        first_char = stripped_line[0]
+
+        # group comment or tag
+        if first_char == "\\":
+            # group comment (must be before tags)
+            match = _GROUP_PATTERN.match(line)
             if match is not None:
                 group_name = match.group(1).strip()
-                # self._groups_d[group_name.lower()] = dict(name=group_name, record_descriptors=[])
 
                 # re-initialize
                 rd, field_descriptor = None, None
                 continue
 
             # tag
-            match = re.search(r"^\s*\\(.+)$", line)
-            if match is not None:
+            content = stripped_line[1:].rstrip("\n")
+            if content != "":
                 # identify
-                content = match.group(1)
                 if " " not in content:  # only a ref
-                    tag_ref = content.strip()
-                    tag_value = None
+                    tag_ref, tag_value = content.strip(), None
                 else:  # ref and value
-                    match = re.search(r"^([\w\-\>\<:]+) (.*)$", content)
-                    tag_ref = match.group(1)
-                    tag_value = match.group(2).strip()
+                    match = _TAG_PATTERN.match(content)
+                    tag_ref, tag_value = match.group(1), match.group(2).strip()
 
                 # store
                 if field_descriptor is None:  # we are not in a field -> record descriptor comment
@@ -132,54 +323,151 @@ class Idd:
                     field_descriptor.append_tag(tag_ref, tag_value)
                 continue
 
+        # field descriptors
+        elif first_char in "AN":
             # named field descriptor
-            match = re.search(r"^\s*([AN])\d+\s*([;,])\s*\\[fF]ield (.*)$", line)
+            match = _NAMED_FIELD_PATTERN.match(line)
             if match is not None:
-                # identify
-                fieldd_type = match.group(1)
-                name = match.group(3).strip()
-                if name == "":
-                    name = None
-
-                # store
-                field_descriptor = rd.add_field_descriptor(fieldd_type, name=name)
+                name = match.group(2).strip()
+                field_descriptor = rd.add_field_descriptor(match.group(1), name=None if name == "" else name)
                 continue
 
             # unnamed field descriptors
-            match = re.search(r"^\s*([AN]\d+[;,]\s*)+.*$", line)
+            match = _UNNAMED_FIELDS_PATTERN.match(line)
             if match is not None:
-                # identify
-                fields_l = [s.strip() for s in match.group(1).strip()[:-1].split(",")]
-                for fieldd_s in fields_l:
-                    fieldd_type = fieldd_s[0]
-
-                    # store
-                    field_descriptor = rd.add_field_descriptor(fieldd_type)
+                # !! only the last field of the line is registered: this is how opyplus always parsed these lines
+                # (see schedule_year, groundheattransfer_slab_xface, ...), changing it would change table descriptors
+                field_descriptor = rd.add_field_descriptor(match.group(1).lstrip()[0])
                 continue
 
-            # rd: record descriptor
-            match = re.search(r"^\s*([\w:\-]+),\s*$", line)
-            if match is not None:
-                # identify
-                table_name = match.group(1).strip()
-                if group_name is None:
-                    raise RuntimeError("no group name")
+        # rd: record descriptor
+        match = _TABLE_PATTERN.match(line)
+        if match is not None:
+            # identify
+            table_name = match.group(1).strip()
+            if group_name is None:
+                raise RuntimeError("no group name")
 
-                # store
-                rd = TableDescriptor(table_name, group_name=group_name)
-                if rd.table_ref in self.table_descriptors:
-                    raise RuntimeError("record descriptor already registered")
-                self.table_descriptors[rd.table_ref.lower()] = rd
-                # self._groups_d[group_name.lower()]["record_descriptors"].append(rd)
+            # store
+            rd = TableDescriptor(table_name, group_name=group_name)
+            if rd.table_ref in table_descriptors:
+                raise RuntimeError("record descriptor already registered")
+            table_descriptors[rd.table_ref.lower()] = rd
 
-                # re-initialize
-                field_descriptor = None
-                continue
+            # re-initialize
+            field_descriptor = None
+            continue
 
-            # skip special tables
-            if ("lead input;" in line.lower()) or ("simulation data;" in line.lower()):
-                # re-initialize
-                rd, field_descriptor = None, None
-                continue
+        # skip special tables
+        lower_line = line.lower()
+        if ("lead input;" in lower_line) or ("simulation data;" in lower_line):
+            # re-initialize
+            rd, field_descriptor = None, None
+            continue
+
+        raise RuntimeError("Line %i not parsed: '%s'." % (i+first_line_num, raw_line))
+
+
+class _LazyTableDescriptors(collections.abc.Mapping):
+    """
+    Table descriptors of a lazy idd: a table descriptor is parsed, corrected and prepared on first access.
+
+    Parameters
+    ----------
+    idd: Idd
+    locations: dict
+        {table_lower_ref: (group_name, start_offset, end_offset, first_line_num), ...}
+    encoding: str
+    apply_corrections: bool
+    """
 
-            raise RuntimeError("Line %i not parsed: '%s'." % (i+3, raw_line))
+    def __init__(self, idd, locations, encoding, apply_corrections):
+        self._idd = idd
+        self._locations = locations
+        self._encoding = encoding
+        self._apply_corrections = apply_corrections
+        self._table_descriptors = {}
+
+    def __getitem__(self, table_lower_ref):
+        """
+        Get table descriptor, parse it if needed.
+
+        Parameters
+        ----------
+        table_lower_ref: str
+
+        Returns
+        -------
+        opyplus.idd.table_descriptor.TableDescriptor
+        """
+        td = self._table_descriptors.get(table_lower_ref)
+        if td is not None:
+            return td
+
+        # read table lines
+        group_name, start_offset, end_offset, first_line_num = self._locations[table_lower_ref]
+        with open(self._idd.path, "rb") as f:
+            f.seek(start_offset)
+            content = f.read(end_offset - start_offset).decode(self._encoding)  # strict, as eager parsing
+
+        # parse (newline=None: same line splitting as text files)
+        table_descriptors = {}
+        _parse_lines(
+            io.StringIO(content, newline=None),
+            table_descriptors,
+            first_line_num=first_line_num,
+            group_name=group_name
+        )
+        td = table_descriptors[table_lower_ref]
+
+        # correct and prepare
+        if self._apply_corrections:
+            correct_table_descriptor(td, self._idd.version)
+        td.prepare_extensible()
+
+        # setdefault (atomic): if table descriptor was concurrently parsed by another thread, the first one is kept
+        return self._table_descriptors.setdefault(table_lower_ref, td)
+
+    def __contains__(self, table_lower_ref):
+        """
+        Check if idd contains given table (without parsing it).
+
+        Parameters
+        ----------
+        table_lower_ref: str
+
+        Returns
+        -------
+        bool
+        """
+        return table_lower_ref in self._locations
+
+    def __iter__(self):
+        """
+        Iterate through table lower refs (idd order).
+
+        Returns
+        -------
+        typing.Iterator[str]
+        """
+        return iter(self._locations)
+
+    def __len__(self):
+        """
+        Get number of tables.
+
+        Returns
+        -------
+        int
+        """
+        return len(self._locations)
+
+    def get_materialized_nb(self):
+        """
+        Get number of table descriptors that have already been parsed.
+
+        Returns
+        -------
+        int
+        """
+        return len(self._table_descriptors)
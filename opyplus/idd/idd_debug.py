@@ -1,50 +1,98 @@
-"""Useful functions to debug idd."""
+"""
+Useful functions to debug idd.
 
+Some versions of idd have mistakes. Corrections are defined table by table, so they can also be applied when table
+descriptors are parsed one by one (lazy idd).
+"""
 
-def correct_idd(idd):
-    """
-    Repair a given idd.
-
-    Some versions of idd have mistakes. The following function repairs the idd in memory.
 
-    Parameters
-    ----------
-    idd: opyplus.idd.idd.Idd
-    """
+def _correct_materialproperty_glazingspectraldata(td, version):
     # MaterialProperty:GlazingSpectralData extensible info
     # begin-extensible should appear at field 1 but it appears a lot later
-    td = idd.table_descriptors["materialproperty_glazingspectraldata"]
     fd = td.get_field_descriptor(1)
     fd.append_tag("begin-extensible")
 
-    if idd.version < (9, 2, 0):
+
+def _correct_table_multivariablelookup(td, version):
+    if version < (9, 2, 0):
         # Table:MultiVariableLookup extensible info
         # extensible cycle_len should be 1 (not 20), cycle_start should be 32 (not 34)
-        td = idd.table_descriptors["table_multivariablelookup"]
         del td.tags["extensible:20"]
         td.add_tag("extensible:1")
         fd = td.get_field_descriptor(32)
         fd.append_tag("begin-extensible")
 
+
+def _correct_energymanagementsystem_sensor(td, version):
     # EnergyManagementSystem:Sensor add retain case
-    fd = idd.table_descriptors["energymanagementsystem_sensor"].get_field_descriptor(2)
+    fd = td.get_field_descriptor(2)
     fd.append_tag("retaincase")
 
+
+def _correct_output_variable(td, version):
     # Output:Variable add retain case
-    fd = idd.table_descriptors["output_variable"].get_field_descriptor(1)
+    fd = td.get_field_descriptor(1)
     fd.append_tag("retaincase")
 
+
+def _correct_meter_custom(td, version):
     # Meter:Custom add retain case
-    fd = idd.table_descriptors["meter_custom"].get_field_descriptor(2)
+    fd = td.get_field_descriptor(2)
     fd.append_tag("retaincase")
 
-    if idd.version == (9, 0, 1):  # was corrected in 9.1.0
+
+def _correct_fan_systemmodel(td, version):
+    if version == (9, 0, 1):  # was corrected in 9.1.0
         # Fan:SystemModel add reference
-        fd = idd.table_descriptors["fan_systemmodel"].get_field_descriptor(0)
+        fd = td.get_field_descriptor(0)
         fd.append_tag("reference", "FansCVandVAV")
 
-    if idd.version >= (8, 6, 0) and idd.version < (9, 3, 0):
+
+def _correct_zonehvac_coolingpanel_radiantconvective_water(td, version):
+    if (8, 6, 0) <= version < (9, 3, 0):
         # ZoneHvac:CoolingPanel:RadiantConvective:Water
-        fd = idd.table_descriptors["zonehvac_coolingpanel_radiantconvective_water"].get_field_descriptor(0)
+        fd = td.get_field_descriptor(0)
         fd.append_tag("reference-class-name", "validBranchEquipmentTypes")
         fd.append_tag("reference", "validBranchEquipmentNames")
+
+
+_TABLE_CORRECTIONS = {  # {table_lower_ref: correction_function(table_descriptor, version), ...}
+    "materialproperty_glazingspectraldata": _correct_materialproperty_glazingspectraldata,
+    "table_multivariablelookup": _correct_table_multivariablelookup,
+    "energymanagementsystem_sensor": _correct_energymanagementsystem_sensor,
+    "output_variable": _correct_output_variable,
+    "meter_custom": _correct_meter_custom,
+    "fan_systemmodel": _correct_fan_systemmodel,
+    "zonehvac_coolingpanel_radiantconvective_water": _correct_zonehvac_coolingpanel_radiantconvective_water
+}
+
+
+def correct_table_descriptor(table_descriptor, version):
+    """
+    Repair a given table descriptor (if needed).
+
+    Parameters
+    ----------
+    table_descriptor: opyplus.idd.table_descriptor.TableDescriptor
+    version: tuple of int
+        idd version
+    """
+    correction = _TABLE_CORRECTIONS.get(table_descriptor.table_ref.lower())
+    if correction is not None:
+        correction(table_descriptor, version)
+
+
+def correct_idd(idd):
+    """
+    Repair a given idd.
+
+    Some versions of idd have mistakes. The following function repairs the idd in memory.
+
+    Parameters
+    ----------
+    idd: opyplus.idd.idd.Idd
+    """
+    for table_lower_ref, correction in _TABLE_CORRECTIONS.items():
+        td = idd.table_descriptors.get(table_lower_ref)
+        if td is not None:  # table may not exist in this version
+            correction(td, idd.version)
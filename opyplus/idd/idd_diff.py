@@ -0,0 +1,440 @@
+"""
+Differences between two idds, and transformation of epm json data from one idd to the other.
+
+Tables are matched by reference. Inside a table, fields are matched by reference, and unmatched fields that have the
+same position relatively to matched fields are considered as renamed if their refs are similar and they have the same
+detailed type and units (else they are removed and added). Extensible cycles are compared cycle pattern by cycle
+pattern.
+
+Json data transformation only remaps field indexes (and updates the Version record): values are not converted, records
+of removed tables and values of removed fields are dropped.
+"""
+import collections
+import difflib
+import logging
+
+from .field_descriptor import _var_name_to_ref
+
+logger = logging.getLogger(__name__)
+
+_RENAMED_MIN_SIMILARITY = 0.6  # difflib ratio of refs
+
+_Field = collections.namedtuple("_Field", ("index", "ref", "basic_type", "descriptor"))
+
+
+def _get_fields(table_descriptor, start, end):
+    # extensible fields are expanded (refs of cycle n contain n)
+    fields = []
+    for i in range(start, end):
+        name = table_descriptor.get_extended_name(i)
+        fd = table_descriptor.get_field_descriptor(i)
+        fields.append(_Field(i, None if name is None else _var_name_to_ref(name), fd.basic_type, fd))
+    return fields
+
+
+def _get_expanded_fields_nb(table_descriptor, fields_nb):
+    # number of fields of a table descriptor, cycles are added to reach fields_nb (if extensible)
+    descriptor_fields_nb = len(table_descriptor.field_descriptors)
+    if table_descriptor.extensible_info is None or fields_nb <= descriptor_fields_nb:
+        return descriptor_fields_nb
+    cycle_start, cycle_len, _ = table_descriptor.extensible_info
+    cycles_nb = -(-(fields_nb - cycle_start) // cycle_len)  # ceil
+    return cycle_start + cycles_nb * cycle_len
+
+
+def _get_default(field_descriptor):
+    default = field_descriptor.tags.get("default")
+    return None if default is None else default[0]
+
+
+def _is_renamed(old_field, new_field):
+    # a replaced field is only renamed if there is evidence: similar refs, same detailed type and units
+    old_fd, new_fd = old_field.descriptor, new_field.descriptor
+    return (
+        (old_field.ref is not None) and
+        (new_field.ref is not None) and
+        (old_fd.detailed_type == new_fd.detailed_type) and
+        (old_fd.tags.get("units") == new_fd.tags.get("units")) and
+        (difflib.SequenceMatcher(a=old_field.ref, b=new_field.ref).ratio() >= _RENAMED_MIN_SIMILARITY)
+    )
+
+
+def _match_fields(old_fields, new_fields):
+    """
+    Match old and new field descriptors by ref (replaced fields are renamed if similar, moved fields are found).
+
+    Parameters
+    ----------
+    old_fields: list of opyplus.idd.field_descriptor.FieldDescriptor
+    new_fields: list of opyplus.idd.field_descriptor.FieldDescriptor
+
+    Returns
+    -------
+    matched: list of (old_position, new_position)
+    moved: set of (old_position, new_position)
+        matched fields whose order changed
+    removed: list of old_position
+    added: list of new_position
+    """
+    matched, moved, removed, added = [], set(), [], []
+    matcher = difflib.SequenceMatcher(
+        a=[f.ref for f in old_fields],
+        b=[f.ref for f in new_fields],
+        autojunk=False
+    )
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == "equal":
+            matched.extend(zip(range(old_start, old_end), range(new_start, new_end)))
+            continue
+        # replaced fields are renamed if they are similar (see _is_renamed), one by one, else removed and added
+        for old_position, new_position in zip(range(old_start, old_end), range(new_start, new_end)):
+            if _is_renamed(old_fields[old_position], new_fields[new_position]):
+                matched.append((old_position, new_position))
+            else:
+                removed.append(old_position)
+                added.append(new_position)
+        pairs_nb = min(old_end - old_start, new_end - new_start)
+        removed.extend(range(old_start + pairs_nb, old_end))
+        added.extend(range(new_start + pairs_nb, new_end))
+
+    # fields that were moved appear as removed and added, match them by ref
+    new_positions_by_ref = {}
+    for new_position in added:
+        new_positions_by_ref.setdefault(new_fields[new_position].ref, []).append(new_position)
+    for old_position in list(removed):
+        candidates = new_positions_by_ref.get(old_fields[old_position].ref)
+        if old_fields[old_position].ref is None or not candidates:
+            continue
+        new_position = candidates.pop(0)
+        matched.append((old_position, new_position))
+        moved.add((old_position, new_position))
+        removed.remove(old_position)
+        added.remove(new_position)
+
+    return sorted(matched), moved, removed, added
+
+
+class TableDiff:
+    """
+    Differences between two versions of a table descriptor.
+
+    Parameters
+    ----------
+    old_table_descriptor: opyplus.idd.table_descriptor.TableDescriptor
+    new_table_descriptor: opyplus.idd.table_descriptor.TableDescriptor
+
+    Attributes
+    ----------
+    table_ref: str
+        new table ref
+    added_fields: list of str
+        added field refs
+    removed_fields: list of str
+        removed field refs
+    renamed_fields: list of (str, str)
+        (old_ref, new_ref)
+    moved_fields: list of (str, int, int)
+        (new_ref, old_index, new_index) for fields whose order changed (fields that are only shifted by added or
+        removed fields are not listed)
+    changed_defaults: dict
+        {new_ref: (old_default, new_default), ...}
+
+    Notes
+    -----
+    If both tables are extensible, extensible fields are described by their first cycle. If only one table is
+    extensible, its cycles are expanded to be compared with the fields of the other table.
+    """
+
+    def __init__(self, old_table_descriptor, new_table_descriptor):
+        self.table_ref = new_table_descriptor.table_ref
+        self.added_fields = []
+        self.removed_fields = []
+        self.renamed_fields = []
+        self.moved_fields = []
+        self.changed_defaults = {}
+
+        self._old_extensible_info = old_table_descriptor.extensible_info
+        self._new_extensible_info = new_table_descriptor.extensible_info
+        self._base_mapping = {}  # {old_index: new_index, ...}
+        self._cycle_mapping = {}  # {old_cycle_position: new_cycle_position, ...} (if both tables are extensible)
+
+        old_fields_nb = len(old_table_descriptor.field_descriptors)
+        new_fields_nb = len(new_table_descriptor.field_descriptors)
+        if (self._old_extensible_info is None) or (self._new_extensible_info is None):
+            # expand extensible table (if any) to the size of the other one
+            old_fields_nb = _get_expanded_fields_nb(old_table_descriptor, new_fields_nb)
+            new_fields_nb = _get_expanded_fields_nb(new_table_descriptor, old_fields_nb)
+            old_base_nb, new_base_nb = old_fields_nb, new_fields_nb
+        else:
+            old_base_nb, new_base_nb = old_table_descriptor.base_fields_nb, new_table_descriptor.base_fields_nb
+        self._old_fields_nb = old_fields_nb
+
+        # base fields
+        old_fields = _get_fields(old_table_descriptor, 0, old_base_nb)
+        new_fields = _get_fields(new_table_descriptor, 0, new_base_nb)
+        matched = self._register(old_fields, new_fields)
+        self._base_mapping = dict((old_fields[o].index, new_fields[n].index) for o, n in matched)
+
+        # cycles
+        old_cycle_fields = _get_fields(old_table_descriptor, old_base_nb, old_fields_nb)
+        new_cycle_fields = _get_fields(new_table_descriptor, new_base_nb, new_fields_nb)
+        self._cycle_mapping = dict(self._register(old_cycle_fields, new_cycle_fields))
+
+        # identity mapping can be skipped when transforming data
+        self._is_identity = (
+            (self._old_extensible_info == self._new_extensible_info or (
+                self._old_extensible_info is not None and
+                self._new_extensible_info is not None and
+                self._old_extensible_info[:2] == self._new_extensible_info[:2]
+            )) and
+            (len(old_fields) == len(new_fields) == len(self._base_mapping)) and
+            all(old_i == new_i for old_i, new_i in self._base_mapping.items()) and
+            (len(old_cycle_fields) == len(new_cycle_fields) == len(self._cycle_mapping)) and
+            all(old_p == new_p for old_p, new_p in self._cycle_mapping.items())
+        )
+
+    def _register(self, old_fields, new_fields):
+        matched, moved, removed, added = _match_fields(old_fields, new_fields)
+        for old_position, new_position in matched:
+            old_field, new_field = old_fields[old_position], new_fields[new_position]
+            if old_field.ref != new_field.ref:
+                self.renamed_fields.append((old_field.ref, new_field.ref))
+            elif (old_position, new_position) in moved:
+                self.moved_fields.append((new_field.ref, old_field.index, new_field.index))
+            old_default, new_default = _get_default(old_field.descriptor), _get_default(new_field.descriptor)
+            if old_default != new_default:
+                self.changed_defaults[new_field.ref] = (old_default, new_default)
+        self.removed_fields.extend(old_fields[p].ref for p in removed)
+        self.added_fields.extend(new_fields[p].ref for p in added)
+        return matched
+
+    @property
+    def has_changes(self):
+        """
+        Check if table changed.
+
+        Returns
+        -------
+        bool
+        """
+        return (
+            not self._is_identity or
+            len(self.renamed_fields) > 0 or
+            len(self.changed_defaults) > 0
+        )
+
+    def get_new_index(self, old_index):
+        """
+        Get new index of a field.
+
+        Parameters
+        ----------
+        old_index: int
+
+        Returns
+        -------
+        int or None
+            None if field was removed
+        """
+        if (
+                (self._old_extensible_info is None) or
+                (self._new_extensible_info is None) or
+                (old_index < self._old_extensible_info[0])
+        ):
+            return self._base_mapping.get(old_index)
+
+        old_cycle_start, old_cycle_len, _ = self._old_extensible_info
+        cycle_num, old_cycle_position = divmod(old_index - old_cycle_start, old_cycle_len)
+        new_cycle_position = self._cycle_mapping.get(old_cycle_position)
+        if new_cycle_position is None:
+            return None
+        new_cycle_start, new_cycle_len, _ = self._new_extensible_info
+        return new_cycle_start + cycle_num * new_cycle_len + new_cycle_position
+
+    def get_field_index_mapping(self, fields_nb=None):
+        """
+        Get field index mapping.
+
+        Parameters
+        ----------
+        fields_nb: int or None
+            number of old fields to map (may be used to include extensible fields), if None, only the fields of the
+            table descriptor are mapped (base fields and first extensible cycle)
+
+        Returns
+        -------
+        dict
+            {old_index: new_index, ...}, removed fields are not included
+        """
+        if fields_nb is None:
+            fields_nb = self._old_fields_nb
+        mapping = {}
+        for old_index in range(fields_nb):
+            new_index = self.get_new_index(old_index)
+            if new_index is not None:
+                mapping[old_index] = new_index
+        return mapping
+
+    def get_info(self):
+        """
+        Get table diff info as str.
+
+        Returns
+        -------
+        str
+        """
+        msg = f"{self.table_ref}\n"
+        for ref in self.added_fields:
+            msg += f"  + {ref}\n"
+        for ref in self.removed_fields:
+            msg += f"  - {ref}\n"
+        for old_ref, new_ref in self.renamed_fields:
+            msg += f"  ~ {old_ref} -> {new_ref}\n"
+        for ref, old_index, new_index in self.moved_fields:
+            msg += f"  ~ {ref}: {old_index} -> {new_index}\n"
+        for ref, (old_default, new_default) in self.changed_defaults.items():
+            msg += f"  ~ {ref} default: {old_default} -> {new_default}\n"
+        return msg
+
+
+class IddDiff:
+    """
+    Differences between two idds.
+
+    Parameters
+    ----------
+    old_idd: opyplus.idd.idd.Idd
+    new_idd: opyplus.idd.idd.Idd
+
+    Attributes
+    ----------
+    old_version: tuple of int
+    new_version: tuple of int
+    added_tables: list of str
+        added table refs
+    removed_tables: list of str
+        removed table refs
+    table_diffs: dict
+        {table_lower_ref: TableDiff, ...} for common tables that changed
+    """
+
+    def __init__(self, old_idd, new_idd):
+        self.old_version = old_idd.version
+        self.new_version = new_idd.version
+
+        old_tds, new_tds = old_idd.table_descriptors, new_idd.table_descriptors
+        self.added_tables = [new_tds[ref].table_ref for ref in sorted(new_tds) if ref not in old_tds]
+        self.removed_tables = [old_tds[ref].table_ref for ref in sorted(old_tds) if ref not in new_tds]
+
+        self.table_diffs = {}
+        self._new_table_refs = {}  # {table_lower_ref: new_table_ref, ...} for common tables
+        for ref in sorted(old_tds):
+            if ref not in new_tds:
+                continue
+            self._new_table_refs[ref] = new_tds[ref].table_ref
+            table_diff = TableDiff(old_tds[ref], new_tds[ref])
+            if table_diff.has_changes:
+                self.table_diffs[ref] = table_diff
+
+        # old field refs are needed to transform json data that uses refs as keys
+        self._old_table_descriptors = old_tds
+
+    def __str__(self):
+        """
+        Str representation of diff.
+
+        Returns
+        -------
+        str
+        """
+        return self.get_info()
+
+    def get_info(self):
+        """
+        Get diff info as str.
+
+        Returns
+        -------
+        str
+        """
+        msg = f"Idd diff {'.'.join(str(v) for v in self.old_version)} -> {'.'.join(str(v) for v in self.new_version)}\n"
+        for ref in self.added_tables:
+            msg += f"+ {ref}\n"
+        for ref in self.removed_tables:
+            msg += f"- {ref}\n"
+        for table_diff in self.table_diffs.values():
+            msg += "~ " + table_diff.get_info()
+        return msg
+
+    def apply(self, json_data):
+        """
+        Transform epm json data from old idd to new idd.
+
+        Parameters
+        ----------
+        json_data: dict
+            json data of an epm of the old idd version (see Epm.to_json_data), record keys may be indexes (int or str)
+            or field refs
+
+        Returns
+        -------
+        dict
+            json data for the new idd version (record keys are indexes)
+
+        Notes
+        -----
+        Records of removed tables and values of removed fields are dropped (a warning is logged).
+        """
+        new_json_data = {}
+        for table_ref, records_data in json_data.items():
+            # special keys (_comment, _external_files)
+            if table_ref.startswith("_"):
+                new_json_data[table_ref] = records_data
+                continue
+
+            table_lower_ref = table_ref.lower()
+            new_table_ref = self._new_table_refs.get(table_lower_ref)
+            if new_table_ref is None:
+                if len(records_data) > 0:
+                    logger.warning(f"table {table_ref} does not exist anymore, {len(records_data)} records dropped")
+                continue
+
+            table_diff = self.table_diffs.get(table_lower_ref)
+            old_td = self._old_table_descriptors[table_lower_ref]
+            new_records_data = []
+            for record_data in records_data:
+                new_record_data = {}
+                for key, value in record_data.items():
+                    # special keys (_comment)
+                    if isinstance(key, str) and key.startswith("_"):
+                        new_record_data[key] = value
+                        continue
+
+                    # find index
+                    if isinstance(key, int):
+                        old_index = key
+                    elif key.isdigit():
+                        old_index = int(key)
+                    else:
+                        old_index = old_td.get_field_index(key)
+
+                    # remap
+                    new_index = old_index if table_diff is None else table_diff.get_new_index(old_index)
+                    if new_index is None:
+                        if value is not None:
+                            logger.warning(
+                                f"field {old_td.get_extended_name(old_index)} of table {table_ref} does not exist "
+                                f"anymore, value dropped: {value}"
+                            )
+                        continue
+                    new_record_data[new_index] = value
+                new_records_data.append(new_record_data)
+
+            # update version
+            if table_lower_ref == "version":
+                for new_record_data in new_records_data:
+                    new_record_data[0] = f"{self.new_version[0]}.{self.new_version[1]}"
+
+            new_json_data[new_table_ref] = new_records_data
+
+        return new_json_data
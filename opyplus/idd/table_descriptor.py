@@ -24,6 +24,18 @@ class TableDescriptor:
     group_name: str or None
     """
 
+    __slots__ = (
+        "table_name",
+        "table_ref",
+        "group_name",
+        "_field_descriptors",
+        "_tags",
+        "extensible_info",
+        "_extensible_patterns",
+        "_base_field_indexes",
+        "_extensible_field_indexes"
+    )
+
     def __init__(self, table_name, group_name=None):
         self.table_name = table_name
         self.table_ref = table_name_to_ref(table_name)
@@ -35,6 +47,11 @@ class TableDescriptor:
         # extensible management
         # (cycle_start, cycle_len, patterns) where patterns is (var_a_(\d+)_ref, var_b_(\d+)_ref, ...)
         self.extensible_info = None
+        self._extensible_patterns = ()  # compiled extensible_info patterns
+
+        # field index lookup caches (built on first use, reset each time field descriptors change)
+        self._base_field_indexes = None  # {ref: index, ...}
+        self._extensible_field_indexes = {}  # {ref: index, ...} for extensible refs that have already been found
 
     @property
     def field_descriptors(self):
@@ -91,13 +108,20 @@ class TableDescriptor:
 
         # append
         self._field_descriptors.append(field_descriptor)
+        self._reset_field_indexes()
 
         return field_descriptor
 
-    def prepare_extensible(self):
+    def prepare_extensible(self, strings_pool=None):
         """
         Prepare extensible.
 
+        Parameters
+        ----------
+        strings_pool: dict or None
+            {string: string, ...}, pool used to share identical tag strings of the idd being parsed (see
+            FieldDescriptor.pool_tag_strings), a new pool is used if None
+
         Notes
         -----
         This function finishes initialization, must be called once all field descriptors and tag have been filled.
@@ -109,6 +133,7 @@ class TableDescriptor:
                 break
         else:
             # not extensible
+            self._finish_field_descriptors(strings_pool)
             return
 
         # find cycle start and prepare patterns
@@ -137,11 +162,33 @@ class TableDescriptor:
 
         # store cycle info
         self.extensible_info = (cycle_start, cycle_len, tuple(cycle_patterns))
+        self._extensible_patterns = tuple(re.compile(pattern) for pattern in cycle_patterns)
+        self._reset_field_indexes()
 
         # set field descriptor cycle_start index (for error messages while serialization)
         for i, fd in enumerate(self._field_descriptors[cycle_start:]):
             fd.set_extensible_info(cycle_start, cycle_len, cycle_patterns[i])
 
+        self._finish_field_descriptors(strings_pool)
+
+    def _finish_field_descriptors(self, strings_pool):
+        if strings_pool is None:
+            strings_pool = {}
+        for fd in self._field_descriptors:
+            fd.pool_tag_strings(strings_pool)
+            fd.prepare_info()
+
+    def _reset_field_indexes(self):
+        self._base_field_indexes = None
+        self._extensible_field_indexes = {}
+
+    def _prepare_base_field_indexes(self):
+        self._base_field_indexes = {}
+        for i in range(self.base_fields_nb):
+            ref = self._field_descriptors[i].ref
+            if ref is not None:  # can happen
+                self._base_field_indexes.setdefault(ref, i)  # first field wins if a ref is duplicated
+
     @property
     def base_fields_nb(self):
         """
@@ -168,21 +215,52 @@ class TableDescriptor:
         Returns
         -------
         int
+
+        Raises
+        ------
+        AttributeError
+            if no field has this ref
+        """
+        index = self._find_field_index(ref)
+        if index is not None:
+            return index
+
+        err_msg = f"No field of '{self.table_name}' has ref '{ref}'.\nAvailable fields: \n - "
+        err_msg += "\n - ".join(fd.ref for fd in self._field_descriptors if fd.ref is not None)
+        raise AttributeError(err_msg)
+
+    def has_field(self, ref):
+        """
+        Check if a field has a given ref.
+
+        Parameters
+        ----------
+        ref: str
+
+        Returns
+        -------
+        bool
         """
+        return self._find_field_index(ref) is not None
+
+    def _find_field_index(self, ref):
         # general case
-        for pattern_num in range(self.base_fields_nb):
-            field_descriptor = self._field_descriptors[pattern_num]
-            if field_descriptor.ref is None:  # can happen
-                continue
-            if field_descriptor.ref == ref:
-                return pattern_num
+        if self._base_field_indexes is None:
+            self._prepare_base_field_indexes()
+        index = self._base_field_indexes.get(ref)
+        if index is not None:
+            return index
 
         # extensible
         ext_info = self.extensible_info
         if ext_info is not None:
-            cycle_start, cycle_len, patterns = ext_info
-            for pattern_num, pat in enumerate(patterns):
-                match = re.fullmatch(pat, ref)
+            index = self._extensible_field_indexes.get(ref)
+            if index is not None:
+                return index
+
+            cycle_start, cycle_len, _ = ext_info
+            for pattern_num, pattern in enumerate(self._extensible_patterns):
+                match = pattern.fullmatch(ref)
                 if match is None:  # not found
                     continue
 
@@ -193,12 +271,12 @@ class TableDescriptor:
                 if cycle_num <= 0:
                     continue
 
-                # calculate and return index
-                return cycle_start + (cycle_num-1)*cycle_len + pattern_num
+                # calculate, store and return index
+                index = cycle_start + (cycle_num-1)*cycle_len + pattern_num
+                self._extensible_field_indexes[ref] = index
+                return index
 
-        err_msg = f"No field of '{self.table_name}' has ref '{ref}'.\nAvailable fields: \n - "
-        err_msg += "\n - ".join(fd.ref for fd in self._field_descriptors if fd.ref is not None)
-        raise AttributeError(err_msg)
+        return None
 
     def get_field_reduced_index(self, index):
         """
@@ -6,14 +6,11 @@ import subprocess
 import os
 import io
 import sys
+import codecs
 import threading
 import contextlib
 import textwrap
 
-import cchardet as chardet
-import pandas as pd
-
-
 from opyplus import __version__, CONF
 
 logger = logging.getLogger(__name__)
@@ -31,6 +28,7 @@ def sort_df(df):
     -------
     pandas.DataFrame
     """
+    import pandas as pd  # long to import, only needed here
     version = tuple([int(x) for x in pd.__version__.split(".")])
     if version < (0, 20, 0):
         return df.sort()
@@ -271,6 +269,72 @@ def multi_mode_write(buffer_writer, string_writer, buffer_or_path=None):
         buffer_writer(buffer)
 
 
+_BOMS = (  # utf-32 first (utf-32-le bom starts with utf-16-le bom)
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16")
+)
+_FAST_DETECTION_CHUNK_SIZE = 1 << 20
+
+
+def _detect_encoding_fast(path):
+    with open(path, "rb") as f:
+        chunk = f.read(_FAST_DETECTION_CHUNK_SIZE)
+
+        # bom
+        for bom, encoding in _BOMS:
+            if chunk.startswith(bom):
+                return encoding
+
+        # utf-8 (ascii included) if whole file is valid
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            while chunk:
+                decoder.decode(chunk)
+                chunk = f.read(_FAST_DETECTION_CHUNK_SIZE)
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return "latin-1"
+    return "utf-8"
+
+
+def detect_encoding(path):
+    """
+    Detect the encoding of a file.
+
+    Parameters
+    ----------
+    path: str
+
+    Returns
+    -------
+    str
+
+    Notes
+    -----
+    Returns CONF.file_encoding if it is not None, else uses CONF.encoding_detection strategy. When chardet finds ascii
+    (or nothing), utf-8 is returned: with sniff strategy, only the beginning of the file was read.
+    """
+    if CONF.file_encoding is not None:
+        return CONF.file_encoding
+
+    if CONF.encoding_detection == "fast":
+        return _detect_encoding_fast(path)
+
+    if CONF.encoding_detection not in ("sniff", "full"):
+        raise ValueError(f"unknown encoding detection strategy: {CONF.encoding_detection}")
+
+    import cchardet as chardet  # only imported if needed
+    with open(path, "rb") as f:
+        content = f.read(CONF.encoding_sniff_bytes) if CONF.encoding_detection == "sniff" else f.read()
+    encoding = chardet.detect(content)["encoding"]
+    if (encoding is None) or (encoding.lower() == "ascii"):
+        return "utf-8"  # ascii superset
+    return encoding
+
+
 def to_buffer(buffer_or_path):
     """
     Get a buffer from a buffer or a path.
@@ -282,14 +346,17 @@ def to_buffer(buffer_or_path):
     Returns
     -------
     typing.StringIO
+
+    Notes
+    -----
+    Files are decoded strictly: if detected encoding is wrong (sniff strategy only reads the beginning of the file),
+    reading will raise a UnicodeDecodeError instead of silently dropping bytes.
     """
     if isinstance(buffer_or_path, str):
         if not os.path.isfile(buffer_or_path):
             raise FileNotFoundError(f"no file found at given path: {buffer_or_path}")
         path = buffer_or_path
-        with open(buffer_or_path, "rb") as f:
-            encoding = chardet.detect(f.read())
-        buffer = open(buffer_or_path, encoding=encoding["encoding"], errors="ignore")
+        buffer = open(buffer_or_path, encoding=detect_encoding(path))
     else:
         path = None
         buffer = buffer_or_path
@@ -0,0 +1,14 @@
+import atexit
+import tempfile
+
+from opyplus import CONF
+
+# tests must not write idd pickles in the user cache directory
+_idd_cache_temp_dir = tempfile.TemporaryDirectory()
+_initial_idd_cache_dir_path, CONF.idd_cache_dir_path = CONF.idd_cache_dir_path, _idd_cache_temp_dir.name
+
+
+@atexit.register
+def _restore_idd_cache_dir_path():
+    CONF.idd_cache_dir_path = _initial_idd_cache_dir_path
+    _idd_cache_temp_dir.cleanup()
@@ -1,8 +1,25 @@
 import unittest
+import io
+import os
+import json
+import tempfile
+import concurrent.futures
 
 import opyplus as op
+from opyplus.epm import epjson
+from opyplus.idd.idd import Idd
+from opyplus.epm.multi_table_queryset import MultiTableQueryset
 
 from tests.util import iter_eplus_versions
+from tests.test_idf_parse import ONE_ZONE_IDF_PATH
+
+
+class _CrashingEpm(op.Epm):
+    @classmethod
+    def load(cls, buffer_or_path, *args, **kwargs):
+        if os.path.basename(buffer_or_path) == "crash.idf":
+            os._exit(1)  # worker dies
+        return super().load(buffer_or_path, *args, **kwargs)
 
 
 class EpmNoTemplateTest(unittest.TestCase):
@@ -39,3 +56,343 @@ class EpmNoTemplateTest(unittest.TestCase):
             # with check
             epm = op.Epm()
             self.assertRaises(op.FieldValidationError, epm.zone.add, dict(name="a"*500))
+
+    def test_lazy_tables(self):
+        for _ in iter_eplus_versions(self):
+            epm = op.Epm(check_required=False)
+            self.assertEqual(0, len(epm._tables))
+
+            # table hook of a table that was not created yet
+            branch = epm.Branch.add(dict(name="b", component_1_object_type="Pipe:Adiabatic"))
+            pointing = epm._dev_relations_manager.get_pointing_on(epm.Pipe_Adiabatic)
+            self.assertEqual([branch], list(pointing.Branch))
+
+            # all tables are exported
+            json_data = epm.to_json_data()
+            self.assertEqual([], json_data["Zone"])
+            self.assertEqual(len(epm._dev_idd.table_descriptors), len([t for t in epm]))
+
+    def test_record_storage(self):
+        epm = op.Epm.load(ONE_ZONE_IDF_PATH)
+        zone = epm.Zone.one()
+        self.assertFalse(hasattr(zone, "__dict__"))
+        self.assertRaises(AttributeError, setattr, zone, "not_a_field", 1)
+
+        # values are stored by position, trailing empty values are removed
+        zone_len = len(zone)
+        zone.volume = None
+        zone.multiplier = None
+        self.assertIsNone(zone.multiplier)
+        self.assertIsNotNone(zone._data[-1])
+        self.assertEqual(zone_len, len(zone))  # base fields
+        zone.volume = 10
+        self.assertEqual(10, zone.volume)
+        self.assertIsNone(zone._data[6])
+        self.assertEqual([0, 1, 2, 3, 4, 5, 7, 8], list(zone.to_dict()))
+
+        # extensible fields
+        surface = epm.BuildingSurface_Detailed[0]
+        surface_len = len(surface)
+        surface.add_fields(1, 2, 3)
+        self.assertEqual(surface_len + 3, len(surface))
+        self.assertEqual(3, surface[-1])
+
+    def test_snapshot(self):
+        epm = op.Epm.load(ONE_ZONE_IDF_PATH)
+        epm.Schedule_File.add(
+            name="schedule",
+            file_name=op.FileContent("schedule.csv", "1\n2\n"),
+            column_number=1,
+            rows_to_skip_at_top=0
+        )
+        buffer = io.BytesIO()
+        epm.to_snapshot(buffer)
+        buffer.seek(0)
+        new_epm = op.Epm.from_snapshot(buffer)
+
+        self.assertEqual(epm._dev_idd, new_epm._dev_idd)
+        self.assertEqual(epm.get_comment(), new_epm.get_comment())
+        self.assertEqual(epm.to_json_data(), new_epm.to_json_data())
+        self.assertEqual(epm.to_idf(dump_external_files=False), new_epm.to_idf(dump_external_files=False))
+
+        # relations were rebuilt
+        zone = new_epm.Zone.one()
+        pointing_nb = len(zone.get_pointing_records())
+        self.assertGreater(pointing_nb, 0)
+        zone.name = "new_name"
+        self.assertEqual(pointing_nb, len(zone.get_pointing_records()))
+        self.assertEqual(zone, new_epm.BuildingSurface_Detailed[0].zone_name)
+
+        # external file
+        self.assertEqual("1\n2\n", new_epm.to_json_data()["_external_files"]["schedule.csv"])
+
+        # wrong file, wrong idd
+        self.assertRaises(ValueError, op.Epm.from_snapshot, io.BytesIO(b"not a snapshot"))
+        buffer.seek(0)
+        self.assertRaises(ValueError, op.Epm.from_snapshot, buffer, idd_or_version=(8, 5, 0))
+
+    def test_epjson(self):
+        epm = op.Epm.load(ONE_ZONE_IDF_PATH)
+        epjson_data = json.loads(epm.to_epjson(dump_external_files=False))
+        self.assertEqual({"Version 1": {"version_identifier": "8.6"}}, epjson_data["Version"])
+        surface_data = epjson_data["BuildingSurface:Detailed"]["zn001:flr001"]
+        self.assertEqual("zone one", surface_data["zone_name"])
+        self.assertEqual(
+            {"vertex_x_coordinate": 15.24, "vertex_y_coordinate": 0, "vertex_z_coordinate": 0},
+            surface_data["vertices"][0]
+        )
+
+        # round trip (comments are lost, unnamed run period gets a name)
+        new_epm = op.Epm.from_epjson(io.StringIO(json.dumps(epjson_data)))
+        self.assertEqual("runperiod 1", new_epm.RunPeriod.one().name)
+        new_epm.RunPeriod.one().name = None
+        for table in epm:
+            self.assertEqual(
+                [dict((k, v) for k, v in r.items() if k != "_comment") for r in table.to_json_data()],
+                [dict((k, v) for k, v in r.items() if k != "_comment")
+                 for r in getattr(new_epm, table.get_ref()).to_json_data()]
+            )
+
+        # EnergyPlus style extensible array key
+        epm = op.Epm.from_epjson(io.StringIO(json.dumps({
+            "Version": {"Version 1": {"version_identifier": "8.6"}},
+            "Schedule:Compact": {"sch": {"extensions": [{"field": "Through: 12/31"}, {"field": "For: AllDays"}]}}
+        })), check_required=False)
+        self.assertEqual((8, 6, 0), epm._dev_idd.version)
+        self.assertEqual("for: alldays", epm.Schedule_Compact.one().field_2)
+
+        # unknown extensible item key
+        with self.assertRaises(AttributeError) as cm:
+            op.Epm.from_epjson(io.StringIO(json.dumps({
+                "Version": {"Version 1": {"version_identifier": "8.6"}},
+                "Schedule:Day:Interval": {"day": {"data": [{"timex": "24:00"}]}}
+            })), check_required=False)
+        for part in ("Schedule:Day:Interval", "'day'", "'timex'"):
+            self.assertIn(part, str(cm.exception))
+
+    def test_epjson_extensible_array_keys(self):
+        # schema array key, other than default 'extensions'
+        epm = op.Epm(idd_or_version=(8, 6, 0))
+        epm.Schedule_Day_Interval.add(name="day", interpolate_to_timestep="no", time_1="24:00", value_until_time_1=1)
+        epjson_data = json.loads(epm.to_epjson(dump_external_files=False))
+        self.assertEqual(
+            {"interpolate_to_timestep": "no", "data": [{"time": "24:00", "value_until_time": 1}]},
+            epjson_data["Schedule:Day:Interval"]["day"]
+        )
+        new_epm = op.Epm.from_epjson(io.StringIO(json.dumps(epjson_data)))
+        self.assertEqual(epm.Schedule_Day_Interval.to_json_data(), new_epm.Schedule_Day_Interval.to_json_data())
+
+        # all extensible tables of supported idds have a key
+        for version in ((8, 0, 0), (8, 4, 0), (8, 8, 0)):
+            idd = Idd(version)
+            for td in idd.table_descriptors.values():
+                if td.extensible_info is not None:
+                    self.assertIn(td.table_ref.lower(), epjson._EXTENSIBLE_ARRAY_KEYS)
+
+    def test_load_many(self):
+        expected_json_data = op.Epm.load(ONE_ZONE_IDF_PATH).to_json_data()
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            wrong_path = os.path.join(temp_dir_path, "wrong.idf")
+            with open(wrong_path, "w") as f:
+                f.write("Version, 8.6;\nZone, z1, not_a_number;\n")
+            paths = [ONE_ZONE_IDF_PATH, wrong_path, ONE_ZONE_IDF_PATH]
+
+            for workers in (1, 2):
+                with self.subTest(workers=workers):
+                    # ordered
+                    epm, error, other_epm = op.Epm.load_many(paths, workers=workers)
+                    self.assertEqual(expected_json_data, epm.to_json_data())
+                    self.assertEqual(expected_json_data, other_epm.to_json_data())
+                    self.assertIsInstance(error, op.FieldValidationError)
+
+                    # as completed, snapshots
+                    results = list(op.Epm.load_many(iter(paths), workers=workers, snapshots=True, as_completed=True))
+                    self.assertEqual(sorted(paths), sorted(path for path, _ in results))
+                    for path, result in results:
+                        if path == wrong_path:
+                            self.assertIsInstance(result, op.FieldValidationError)
+                        else:
+                            self.assertEqual(
+                                expected_json_data,
+                                op.Epm.from_snapshot(io.BytesIO(result)).to_json_data()
+                            )
+
+    def test_load_many_worker_crash(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            crash_path = os.path.join(temp_dir_path, "crash.idf")
+            paths = [crash_path] + [ONE_ZONE_IDF_PATH] * 8
+
+            # all paths are reported, following paths are loaded in a new pool
+            results = list(_CrashingEpm.load_many(paths, workers=2, snapshots=True, as_completed=True))
+            self.assertEqual(sorted(paths), sorted(path for path, _ in results))
+            for path, result in results:
+                if path == crash_path:
+                    self.assertIsInstance(result, concurrent.futures.process.BrokenProcessPool)
+            self.assertTrue(any(isinstance(result, bytes) for _, result in results))
+
+            # ordered
+            results = _CrashingEpm.load_many(paths, workers=2)
+            self.assertIsInstance(results[0], concurrent.futures.process.BrokenProcessPool)
+            self.assertIsInstance(results[-1], op.Epm)
+
+    def test_bulk(self):
+        epm = op.Epm(idd_or_version=(8, 6, 0), check_required=False)
+        with epm.bulk():
+            # link on a record that is added later
+            surface = epm.BuildingSurface_Detailed.add(name="s1", zone_name="z1")
+            self.assertEqual(0, len(epm._dev_relations_manager._links_by_source))
+            with epm.bulk():  # merged
+                zone = epm.Zone.add(name="z1")
+            self.assertEqual(0, len(epm._dev_relations_manager._record_hooks))
+
+            # pending records may be updated and deleted
+            other_surface = epm.BuildingSurface_Detailed.add(name="s2", zone_name="unknown")
+            other_surface.zone_name = "z1"
+            epm.BuildingSurface_Detailed.add(name="s3", zone_name="unknown").delete()
+        self.assertEqual(zone, surface.zone_name)
+        self.assertEqual(zone, other_surface.zone_name)
+        self.assertEqual(["s1", "s2"], sorted(s.name for s in epm.BuildingSurface_Detailed))
+        self.assertEqual(2, len(zone.get_pointing_records().BuildingSurface_Detailed))
+
+        # errors are reported together
+        epm = op.Epm(idd_or_version=(8, 6, 0))
+        with self.assertRaises(op.FieldValidationError) as cm:
+            with epm.bulk():
+                epm.Zone.add(name="z1")
+                epm.Zone.add(name="z1")
+                epm.Material_NoMass.add(name="m")
+        message = str(cm.exception)
+        self.assertIn("2 error(s)", message)
+        self.assertIn("Field is required", message)
+        self.assertIn("Reference key already exists", message)
+        self.assertIsNone(epm._dev_bulk_records)
+
+        # error inside bulk mode is not replaced by validation errors
+        epm = op.Epm(idd_or_version=(8, 6, 0))
+        with self.assertRaises(KeyboardInterrupt):
+            with epm.bulk():
+                epm.Zone.add(name="z1")
+                epm.Zone.add(name="z1")
+                raise KeyboardInterrupt()
+        self.assertIsNone(epm._dev_bulk_records)
+
+    def test_table_index(self):
+        epm = op.Epm(idd_or_version=(8, 6, 0), check_required=False)
+        z1, z2 = epm.Zone.add(name="z1"), epm.Zone.add(name="z2")
+        for i in range(4):
+            epm.BuildingSurface_Detailed.add(name=f"s{i}", zone_name=z1 if i < 3 else z2, surface_type="wall")
+        surfaces = epm.BuildingSurface_Detailed
+        s0, s1, s2, s3 = surfaces.select()
+
+        for indexed in (False, True):
+            with self.subTest(indexed=indexed):
+                if indexed:
+                    surfaces.create_index("zone_name")
+                    surfaces.create_index("zone_name")  # does nothing
+                self.assertEqual([s0, s1, s2], list(surfaces.select(zone_name="Z1")))
+                self.assertEqual([s3], list(surfaces.select(zone_name=z2)))
+                self.assertEqual([s1], list(surfaces.select(lambda x: x.name == "s1", zone_name="z1")))
+                self.assertEqual([s3], list(surfaces.select(zone_name="z2", surface_type="wall")))
+                self.assertEqual(0, len(surfaces.select(zone_name="unknown")))
+                self.assertEqual(s3, surfaces.one(zone_name="z2"))
+                self.assertEqual([s1, s2], list(surfaces.select(lambda x: x.name != "s0").select(zone_name="z1")))
+                self.assertEqual(s1, surfaces.select(zone_name="z1").one("s1"))
+                self.assertRaises(op.RecordDoesNotExistError, surfaces.select(zone_name="z1").one, "s3")
+
+        # id search on a table without pk
+        epm.Output_Variable.add(key_value="*", variable_name="zone mean air temperature")
+        self.assertRaises(TypeError, epm.Output_Variable.one, "*")
+        self.assertRaises(TypeError, epm.Output_Variable.select().one, "*")
+        self.assertRaises(KeyError, epm.Output_Variable.one, "*")
+        self.assertRaises(KeyError, epm.Output_Variable.select().one, "*")
+
+        # index is maintained
+        z1.name = "new z1"
+        self.assertEqual([s0, s1, s2], list(surfaces.select(zone_name="new z1")))
+        s0.zone_name = z2
+        s1.delete()
+        s4 = surfaces.add(name="s4", zone_name=z2)
+        self.assertEqual([s0, s3, s4], list(surfaces.select(zone_name=z2)))
+        self.assertEqual([s2], list(surfaces.select(zone_name=z1)))
+        z2.delete()
+        self.assertEqual([s0, s3, s4], list(surfaces.select(zone_name=None)))
+
+        # record hooks
+        epm.Zone.create_index("name")
+        self.assertEqual(z1, epm.Zone.one(name="New Z1"))
+
+        surfaces.drop_index("zone_name")
+        self.assertEqual({}, surfaces._dev_indexes)
+
+    def test_query(self):
+        epm = op.Epm(idd_or_version=(8, 6, 0), check_required=False)
+        z1, z2 = epm.Zone.add(name="z1", x_origin=1), epm.Zone.add(name="Zn2", x_origin=20)
+        for i in range(4):
+            epm.BuildingSurface_Detailed.add(
+                name=f"s{i}",
+                zone_name=z1 if i < 3 else z2,
+                surface_type="roof" if i == 0 else "wall",
+                vertex_1_z_coordinate=i
+            )
+        surfaces = epm.BuildingSurface_Detailed
+        s0, s1, s2, s3 = surfaces.select()
+
+        for indexed in (False, True):
+            with self.subTest(indexed=indexed):
+                if indexed:
+                    for field in ("zone_name", "surface_type", "vertex_1_z_coordinate"):
+                        surfaces.create_index(field)
+                self.assertEqual([s0, s3], list(surfaces.select(name__in=("s0", "s3"))))
+                self.assertEqual([s3], list(surfaces.select(zone_name__in=(z2, "unknown"), surface_type="wall")))
+                self.assertEqual([s2, s3], list(surfaces.select(vertex_1_z_coordinate__gte=2)))
+                self.assertEqual([s3], list(surfaces.select(vertex_1_z_coordinate__gt=2)))
+                self.assertEqual([s0, s1], list(surfaces.select(vertex_1_z_coordinate__lt=2)))
+                self.assertEqual([s1, s2], list(surfaces.select(vertex_1_z_coordinate__range=(1, 2))))
+                self.assertEqual(
+                    [s1, s2],
+                    list(surfaces.select(surface_type="wall", vertex_1_z_coordinate__range=(0, 2)))
+                )
+                self.assertEqual([], list(surfaces.select(surface_type__gt=2)))  # not comparable
+                self.assertEqual([s3], list(surfaces.select(zone_name__startswith="ZN")))
+                self.assertEqual([s0, s1, s2], list(surfaces.select(zone_name__regex=r"^z\d$")))
+                self.assertEqual([s0], list(surfaces.select(surface_type__regex="oo")))
+
+                # incorrect values
+                self.assertRaises(TypeError, lambda: list(surfaces.select(name__in="s0")))
+                self.assertRaises(ValueError, lambda: list(surfaces.select(vertex_1_z_coordinate__range=(0, "z"))))
+
+                # joins
+                self.assertEqual([s3], list(surfaces.select(zone_name__x_origin__gt=10)))
+                self.assertEqual([s0, s1, s2], list(surfaces.select(zone_name__name="z1")))
+                self.assertEqual([s1], list(surfaces.select(zone_name__x_origin=1, vertex_1_z_coordinate=1)))
+
+                # queryset, lazy iteration
+                walls = surfaces.select(surface_type="wall")
+                self.assertEqual([s1], list(walls.select(vertex_1_z_coordinate__lte=1)))
+                self.assertEqual(s2, walls.one(zone_name="z1", vertex_1_z_coordinate__gt=1))
+                it = surfaces.iter_select(lambda x: x.name != "s2", zone_name=z1)
+                self.assertFalse(isinstance(it, (list, tuple)))
+                self.assertEqual({s0, s1}, set(it))
+
+                # batch
+                qs_z1, qs_roof, qs_high = surfaces.batch_select([
+                    dict(zone_name="z1"), dict(surface_type="roof"), dict(vertex_1_z_coordinate__gt=1, name="s3")
+                ])
+                self.assertEqual([s0, s1, s2], list(qs_z1))
+                self.assertEqual([s0], list(qs_roof))
+                self.assertEqual([s3], list(qs_high))
+
+        # multi-table queryset
+        mqs = z1.get_pointing_records()
+        self.assertEqual([s1, s2], list(mqs.select(surface_type="wall").BuildingSurface_Detailed))
+        self.assertEqual([s0], list(mqs.iter_select(vertex_1_z_coordinate__lt=1)))
+        mqs = MultiTableQueryset(epm, [z1, z2, s0, s3])
+        self.assertEqual({s0}, set(mqs.select(vertex_1_z_coordinate__lt=1).iter_all_records()))  # zones are skipped
+        self.assertEqual({z2, s3}, set(mqs.select(name__in=("zn2", "s3")).iter_all_records()))
+
+        def _filter_by(record):
+            raise AttributeError("filter error")
+        self.assertRaises(AttributeError, mqs.select, _filter_by, vertex_1_z_coordinate__lt=1)
+
+        # unknown field
+        self.assertRaises(AttributeError, surfaces.select, unknown="a")
@@ -1,13 +1,477 @@
 import unittest
+import os
+import re
+import json
+import tempfile
+import threading
 
-from opyplus.idd.idd import Idd
+import opyplus as op
+from opyplus import CONF
+from opyplus.util import to_buffer
+from opyplus.idd.idd import Idd, _IDD_CACHE
+from opyplus.idd import disk_cache
+from opyplus.idd.resources import get_idd_path, IDD_DIR_PATH
+from opyplus.idd.table_descriptor import TableDescriptor
+from opyplus.idd.idd_debug import correct_idd
+from opyplus.exceptions import FieldValidationError
 
 from tests.util import iter_eplus_versions
 
 
+def get_table_descriptor_data(td):
+    return (
+        td.table_name,
+        td.table_ref,
+        td.group_name,
+        td.tags,
+        td.extensible_info,
+        [(fd.index, fd.basic_type, fd.name, fd.ref, fd.tags) for fd in td.field_descriptors]
+    )
+
+
+def legacy_parse(open_buffer):
+    """
+    Reference idd parser (regex-based implementation, used before the single-pass tokenizer).
+
+    Only difference: '\\ group' lines (idd >= 8.7) are accepted as group lines.
+    """
+    table_descriptors = {}
+    group_name, rd, field_descriptor = None, None, None
+    next(open_buffer)
+    next(open_buffer)
+    for i, raw_line in enumerate(open_buffer):
+        line = raw_line.split("!")[0]
+        if re.search(r"^\s*$", line) is not None:
+            continue
+        match = re.search(r"^\\\s*group (.+)$", line)
+        if match is not None:
+            group_name = match.group(1).strip()
+            rd, field_descriptor = None, None
+            continue
+        match = re.search(r"^\s*\\(.+)$", line)
+        if match is not None:
+            content = match.group(1)
+            if " " not in content:
+                tag_ref = content.strip()
+                tag_value = None
+            else:
+                match = re.search(r"^([\w\-\>\<:]+) (.*)$", content)
+                tag_ref = match.group(1)
+                tag_value = match.group(2).strip()
+            if field_descriptor is None:
+                rd.add_tag(tag_ref, tag_value)
+            else:
+                field_descriptor.append_tag(tag_ref, tag_value)
+            continue
+        match = re.search(r"^\s*([AN])\d+\s*([;,])\s*\\[fF]ield (.*)$", line)
+        if match is not None:
+            name = match.group(3).strip()
+            field_descriptor = rd.add_field_descriptor(match.group(1), name=None if name == "" else name)
+            continue
+        match = re.search(r"^\s*([AN]\d+[;,]\s*)+.*$", line)
+        if match is not None:
+            for fieldd_s in [s.strip() for s in match.group(1).strip()[:-1].split(",")]:
+                field_descriptor = rd.add_field_descriptor(fieldd_s[0])
+            continue
+        match = re.search(r"^\s*([\w:\-]+),\s*$", line)
+        if match is not None:
+            rd = TableDescriptor(match.group(1).strip(), group_name=group_name)
+            table_descriptors[rd.table_ref.lower()] = rd
+            field_descriptor = None
+            continue
+        if ("lead input;" in line.lower()) or ("simulation data;" in line.lower()):
+            rd, field_descriptor = None, None
+            continue
+        raise RuntimeError("Line %i not parsed: '%s'." % (i+3, raw_line))
+    return table_descriptors
+
+
 class IddTest(unittest.TestCase):
     def test_load(self):
         for _ in iter_eplus_versions(self):
             idd = Idd()
 
+    def test_tokenizer_equivalence(self):
+        idd_names = sorted(name for name in os.listdir(IDD_DIR_PATH) if os.path.splitext(name)[1] == ".idd")
+        self.assertGreater(len(idd_names), 0)
+        for idd_name in idd_names:
+            with self.subTest(idd_name=idd_name):
+                idd_path = os.path.join(IDD_DIR_PATH, idd_name)
+                idd = Idd(idd_path)
+
+                # legacy
+                legacy_idd = Idd.__new__(Idd)
+                legacy_idd.version = idd.version
+                _, buffer = to_buffer(idd_path)
+                with buffer as f:
+                    legacy_idd.table_descriptors = legacy_parse(f)
+                correct_idd(legacy_idd)
+                for td in legacy_idd.table_descriptors.values():
+                    td.prepare_extensible()
+
+                self.assertEqual(list(legacy_idd.table_descriptors), list(idd.table_descriptors))
+                for ref, td in idd.table_descriptors.items():
+                    self.assertEqual(
+                        get_table_descriptor_data(legacy_idd.table_descriptors[ref]),
+                        get_table_descriptor_data(td)
+                    )
+
+    def test_get_field_index(self):
+        idd = Idd._dev_get_from_cache((8, 8, 0))
+        td = idd.table_descriptors["buildingsurface_detailed"]
+        cycle_start, cycle_len, _ = td.extensible_info
+
+        # base fields
+        self.assertEqual(0, td.get_field_index("name"))
+        self.assertEqual(3, td.get_field_index("zone_name"))
+
+        # extensible fields (twice: second time is cached)
+        for _ in range(2):
+            self.assertEqual(cycle_start, td.get_field_index("vertex_1_x_coordinate"))
+            self.assertEqual(cycle_start + 11*cycle_len + 2, td.get_field_index("vertex_12_z_coordinate"))
+
+        # unknown fields
+        self.assertRaises(AttributeError, td.get_field_index, "vertex_0_x_coordinate")
+        self.assertRaises(AttributeError, td.get_field_index, "unknown_field")
+
+    def test_pooled_tag_strings(self):
+        idd = Idd._dev_get_from_cache((8, 8, 0))
+        td = idd.table_descriptors["buildingsurface_detailed"]
+        y_fd = td.get_field_descriptor(td.get_field_index("vertex_1_y_coordinate"))
+        z_fd = td.get_field_descriptor(td.get_field_index("vertex_1_z_coordinate"))
+        self.assertEqual(y_fd.tags, z_fd.tags)
+        self.assertIs(y_fd.tags["units"][0], z_fd.tags["units"][0])
+
+        # tags are not shared
+        self.assertIsNot(y_fd.tags, z_fd.tags)
+        self.assertIsNot(y_fd.tags["units"], z_fd.tags["units"])
+        y_fd.append_tag("note", "test")
+        try:
+            self.assertEqual(["test"], y_fd.tags["note"])
+            self.assertNotIn("note", z_fd.tags)
+        finally:
+            del y_fd.tags["note"]
+
+    def test_deserialize(self):
+        idd = Idd._dev_get_from_cache((8, 8, 0))
+        td = idd.table_descriptors["buildingsurface_detailed"]
+        name_fd = td.get_field_descriptor(0)
+        type_fd = td.get_field_descriptor(1)
+        zone_fd = td.get_field_descriptor(3)
+        view_factor_fd = td.get_field_descriptor(td.get_field_index("view_factor_to_ground"))
+
+        # normalization
+        self.assertEqual("wall", type_fd.deserialize("  Wall ", 1))
+        self.assertEqual("my zone", zone_fd.deserialize("My \t\n Zone", 3).initial_hook_value)
+        self.assertEqual("cafe", type_fd.deserialize("Café", 1))
+        self.assertIsNone(type_fd.deserialize(" \n", 1))
+        self.assertRaises(FieldValidationError, type_fd.deserialize, "a" * 100, 1)
+        self.assertEqual("a" * 100, type_fd.deserialize("a" * 100, 1, check_length=False))
+
+        # types
+        self.assertEqual(0.5, view_factor_fd.deserialize("0.5", 9))
+        self.assertEqual("autocalculate", view_factor_fd.deserialize("AutoCalculate", 9))
+        self.assertRaises(FieldValidationError, view_factor_fd.deserialize, "half", 9)
+        self.assertEqual("surface", name_fd.deserialize("Surface", 0).target_value)
+
+        # trusted: raw idf values written by opyplus are not normalized
+        self.assertEqual("wall", type_fd.deserialize("wall", 1, trusted=True))
+        self.assertIsNone(type_fd.deserialize("", 1, trusted=True))
+        self.assertEqual(0.5, view_factor_fd.deserialize("0.5", 9, trusted=True))
+        self.assertEqual("my zone", zone_fd.deserialize("my zone", 3, trusted=True).initial_hook_value)
+
+        # dispatch is reset when a tag is appended
+        type_fd.deserialize("Wall", 1)
+        type_fd.append_tag("retaincase")
+        try:
+            self.assertEqual("Wall", type_fd.deserialize("Wall", 1))
+        finally:
+            del type_fd.tags["retaincase"]
+            type_fd.prepare_info()
+        self.assertEqual("wall", type_fd.deserialize("Wall", 1))
+
+    def test_field_descriptor_info(self):
+        idd = Idd._dev_get_from_cache((8, 8, 0))
+        td = idd.table_descriptors["buildingsurface_detailed"]
+        name_fd = td.get_field_descriptor(0)
+        view_factor_fd = td.get_field_descriptor(td.get_field_index("view_factor_to_ground"))
+        file_fd = idd.table_descriptors["schedule_file"].get_field_descriptor(
+            idd.table_descriptors["schedule_file"].get_field_index("file_name"))
+
+        # prepared when idd is loaded
+        self.assertIsNotNone(name_fd._deserialize_info)
+        self.assertEqual(("reference", True, False), (name_fd.detailed_type, name_fd.is_required, name_fd.is_file_name))
+        self.assertEqual("real", view_factor_fd.detailed_type)
+        self.assertFalse(view_factor_fd.is_required)
+        self.assertTrue(file_fd.is_file_name)
+
+        # prepared again when a tag is appended
+        view_factor_fd.append_tag("required-field")
+        try:
+            self.assertTrue(view_factor_fd.is_required)
+            self.assertRaises(FieldValidationError, view_factor_fd.check_not_required)
+        finally:
+            del view_factor_fd.tags["required-field"]
+            view_factor_fd.prepare_info()
+        self.assertFalse(view_factor_fd.is_required)
+
+    def test_field_descriptor_info_direct_tags_mutation(self):
+        idd = Idd._dev_get_from_cache((8, 8, 0))
+        td = idd.table_descriptors["buildingsurface_detailed"]
+        type_fd = td.get_field_descriptor(1)
+        view_factor_fd = td.get_field_descriptor(td.get_field_index("view_factor_to_ground"))
+
+        # info must be prepared again after a direct mutation of tags
+        type_fd.tags["retaincase"] = []
+        view_factor_fd.tags["required-field"] = []
+        try:
+            type_fd.prepare_info()
+            view_factor_fd.prepare_info()
+            self.assertEqual("Wall", type_fd.deserialize("Wall", 1))
+            self.assertTrue(view_factor_fd.is_required)
+        finally:
+            del type_fd.tags["retaincase"]
+            del view_factor_fd.tags["required-field"]
+            type_fd.prepare_info()
+            view_factor_fd.prepare_info()
+        self.assertEqual("wall", type_fd.deserialize("Wall", 1))
+        self.assertFalse(view_factor_fd.is_required)
+
+
+class IddDiskCacheTest(unittest.TestCase):
+    version = (8, 6, 0)
+
+    def setUp(self):
+        self.initial_cache_dir_path = CONF.idd_cache_dir_path
+        self.temp_dir = tempfile.TemporaryDirectory()
+        CONF.idd_cache_dir_path = self.temp_dir.name
+        _IDD_CACHE.pop(self.version[:2], None)
+
+    def tearDown(self):
+        CONF.idd_cache_dir_path = self.initial_cache_dir_path
+        _IDD_CACHE.pop(self.version[:2], None)
+        self.temp_dir.cleanup()
+
+    def test_dump_and_load(self):
+        idd = Idd._dev_get_from_cache(self.version)
+        cache_path = disk_cache.get_cache_path(get_idd_path(self.version))
+        self.assertTrue(os.path.isfile(cache_path))
+
+        # load from disk
+        cached_idd = disk_cache.load(get_idd_path(self.version), Idd)
+        self.assertIsNotNone(cached_idd)
+        self.assertEqual(idd.version, cached_idd.version)
+        self.assertEqual(list(idd.table_descriptors), list(cached_idd.table_descriptors))
+        for ref, td in idd.table_descriptors.items():
+            self.assertEqual(
+                get_table_descriptor_data(td),
+                get_table_descriptor_data(cached_idd.table_descriptors[ref])
+            )
+
+    def test_corrupted_cache_is_rebuilt(self):
+        Idd._dev_get_from_cache(self.version)
+        _IDD_CACHE.pop(self.version[:2])
+        cache_path = disk_cache.get_cache_path(get_idd_path(self.version))
+
+        # corrupt
+        with open(cache_path, "r+b") as f:
+            f.seek(-10, os.SEEK_END)
+            f.write(b"corrupted!")
+        self.assertIsNone(disk_cache.load(get_idd_path(self.version), Idd))
+        self.assertFalse(os.path.exists(cache_path))
+
+        # rebuild
+        idd = Idd._dev_get_from_cache(self.version)
+        self.assertIn("zone", idd.table_descriptors)
+        self.assertIsNotNone(disk_cache.load(get_idd_path(self.version), Idd))
+
+    def test_disabled(self):
+        CONF.idd_cache_dir_path = None
+        Idd._dev_get_from_cache(self.version)
+        self.assertEqual([], os.listdir(self.temp_dir.name))
+
+
+class IddCacheConcurrencyTest(unittest.TestCase):
+    version = (8, 6, 0)
+
+    def setUp(self):
+        self.initial_cache_dir_path = CONF.idd_cache_dir_path
+        CONF.idd_cache_dir_path = None  # force parsing
+        _IDD_CACHE.pop(self.version[:2], None)
+
+    def tearDown(self):
+        CONF.idd_cache_dir_path = self.initial_cache_dir_path
+        _IDD_CACHE.pop(self.version[:2], None)
+
+    def test_concurrent_get_from_cache(self):
+        parse_calls = []
+
+        class CountingIdd(Idd):
+            def _parse(self, open_buffer):
+                parse_calls.append(None)
+                super()._parse(open_buffer)
+
+        threads_nb = 8
+        barrier = threading.Barrier(threads_nb)
+        idds = [None] * threads_nb
+
+        def get(i):
+            barrier.wait()
+            idds[i] = CountingIdd._dev_get_from_cache(self.version)
+
+        threads = [threading.Thread(target=get, args=(i,)) for i in range(threads_nb)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(1, len(parse_calls))
+        for idd in idds:
+            self.assertIs(idds[0], idd)
+
+    def test_preload(self):
+        idd, = Idd.preload([self.version])
+        self.assertIs(idd, _IDD_CACHE[self.version[:2]])
+        self.assertIs(idd, Idd._dev_get_from_cache(self.version))
+
+    def test_preload_lazy(self):
+        initial_lazy_idd = CONF.lazy_idd
+        CONF.lazy_idd = True
+        try:
+            idd, = Idd.preload([self.version])
+        finally:
+            CONF.lazy_idd = initial_lazy_idd
+        self.assertEqual(len(idd.table_descriptors), idd.table_descriptors.get_materialized_nb())
+
+
+class IddDiffTest(unittest.TestCase):
+    def setUp(self):
+        self.old_idd = Idd._dev_get_from_cache((8, 5, 0))
+        self.new_idd = Idd._dev_get_from_cache((8, 6, 0))
+        self.idd_diff = self.old_idd.diff(self.new_idd)
+
+    def test_same_idd(self):
+        idd_diff = self.new_idd.diff(self.new_idd)
+        self.assertEqual([], idd_diff.added_tables)
+        self.assertEqual([], idd_diff.removed_tables)
+        self.assertEqual({}, idd_diff.table_diffs)
+
+    def test_diff(self):
+        self.assertIn("Coil_Heating_Fuel", self.idd_diff.added_tables)
+        self.assertIn("Coil_Heating_Gas", self.idd_diff.removed_tables)
+
+        # removed fields
+        branch_diff = self.idd_diff.table_diffs["branch"]
+        self.assertEqual(["maximum_flow_rate", "component_1_branch_control_type"], branch_diff.removed_fields)
+        self.assertEqual({0: 0, 2: 1}, branch_diff.get_field_index_mapping(3))
+        old_branch_td = self.old_idd.table_descriptors["branch"]
+        new_branch_td = self.new_idd.table_descriptors["branch"]
+        self.assertEqual(
+            new_branch_td.get_field_index("component_3_name"),
+            branch_diff.get_new_index(old_branch_td.get_field_index("component_3_name"))
+        )
+        self.assertIsNone(branch_diff.get_new_index(old_branch_td.get_field_index("component_3_branch_control_type")))
+
+        # renamed field
+        self.assertEqual(
+            [("controlled_zone_name", "control_zone_name")],
+            self.idd_diff.table_diffs["availabilitymanager_hybridventilation"].renamed_fields
+        )
+
+        # changed default
+        self.assertEqual(
+            ("Normal", "ReverseWithLimits"),
+            self.idd_diff.table_diffs["airterminal_singleduct_vav_reheat"].changed_defaults["damper_heating_action"]
+        )
+
+        # table became extensible (unrelated replaced field is not renamed)
+        vrf_diff = self.idd_diff.table_diffs["airconditioner_variablerefrigerantflow_fluidtemperaturecontrol"]
+        self.assertEqual(["loading_index_7_list"], vrf_diff.removed_fields)
+        self.assertEqual(
+            ["loading_index_7_compressor_power_multiplier_function_of_temperature_curve_name"],
+            vrf_diff.added_fields
+        )
+        self.assertEqual([], vrf_diff.renamed_fields)
+        self.assertNotIn(61, vrf_diff.get_field_index_mapping())
+
+    def test_unrelated_fields_are_not_renamed(self):
+        # replaced fields with different names, types or units are removed and added, values are not moved
+        daylighting_diff = self.idd_diff.table_diffs["daylighting_controls"]
+        self.assertEqual([], daylighting_diff.renamed_fields)
+        self.assertIn("minimum_input_power_fraction_for_continuous_dimming_control", daylighting_diff.removed_fields)
+        self.assertIn("delight_gridding_resolution", daylighting_diff.added_fields)
+        self.assertNotIn(15, daylighting_diff.get_field_index_mapping())
+        self.assertNotIn("delight_gridding_resolution", daylighting_diff.changed_defaults)
+
+        moisture_diff = self.idd_diff.table_diffs["materialproperty_moisturepenetrationdepth_settings"]
+        self.assertEqual([], moisture_diff.renamed_fields)
+        self.assertEqual(["moisture_penetration_depth"], moisture_diff.removed_fields)
+        self.assertIn("water_vapor_diffusion_resistance_factor", moisture_diff.added_fields)
+        self.assertNotIn(1, moisture_diff.get_field_index_mapping())
+
+    def test_apply(self):
+        epm = op.Epm(idd_or_version=(8, 5, 0), check_required=False)
+        epm.Version.add({0: "8.5"})
+        epm.Branch.add(
+            name="branch",
+            maximum_flow_rate=1,
+            component_1_object_type="Pipe:Adiabatic",
+            component_1_name="pipe",
+            component_1_inlet_node_name="in",
+            component_1_outlet_node_name="out",
+            component_1_branch_control_type="Active"
+        )
+
+        for json_data in (epm.to_json_data(), json.loads(epm.to_json())):
+            new_epm = op.Epm(self.idd_diff.apply(json_data), check_required=False)
+            self.assertEqual(self.new_idd, new_epm._dev_idd)
+            self.assertEqual("8.6", new_epm.Version.one()[0])
+            branch = new_epm.Branch.one()
+            self.assertEqual("pipe", branch.component_1_name)
+            self.assertEqual("out", branch.component_1_outlet_node_name)
+            self.assertEqual(6, len(branch))
+
+
+class LazyIddTest(unittest.TestCase):
+    version = (8, 8, 0)
+
+    def test_lazy(self):
+        idd = Idd(self.version)
+        lazy_idd = Idd(self.version, lazy=True)
+        self.assertEqual(idd.version, lazy_idd.version)
+
+        # nothing is parsed until accessed
+        self.assertEqual(0, lazy_idd.table_descriptors.get_materialized_nb())
+        self.assertIn("zone", lazy_idd.table_descriptors)
+        self.assertNotIn("unknown_table", lazy_idd.table_descriptors)
+        self.assertEqual(0, lazy_idd.table_descriptors.get_materialized_nb())
+        zone_td = lazy_idd.table_descriptors["zone"]
+        self.assertEqual(1, lazy_idd.table_descriptors.get_materialized_nb())
+        self.assertIs(zone_td, lazy_idd.table_descriptors["zone"])
+
+        # same descriptors (corrections included)
+        self.assertEqual(list(idd.table_descriptors), list(lazy_idd.table_descriptors))
+        for ref, td in idd.table_descriptors.items():
+            self.assertEqual(get_table_descriptor_data(td), get_table_descriptor_data(lazy_idd.table_descriptors[ref]))
+
+    def test_lazy_strict_decoding(self):
+        # an undecodable byte raises in both modes (it must not be dropped by lazy mode)
+        with open(get_idd_path(self.version), "rb") as f:
+            content = f.read()
+        content = content.replace(b"\nZone,\n", b"\nZone,\n  \\memo \xff\n", 1)
+        initial_file_encoding = CONF.file_encoding
+        CONF.file_encoding = "utf-8"
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir_path:
+                path = os.path.join(temp_dir_path, "Energy+.idd")
+                with open(path, "wb") as f:
+                    f.write(content)
+                self.assertRaises(UnicodeDecodeError, Idd, path)
+                lazy_idd = Idd(path, lazy=True)
+                self.assertRaises(UnicodeDecodeError, lambda: lazy_idd.table_descriptors["zone"])
+        finally:
+            CONF.file_encoding = initial_file_encoding
 
+    def test_lazy_requires_path(self):
+        with open(get_idd_path(self.version)) as f:
+            self.assertRaises(ValueError, Idd, f, lazy=True)
@@ -1,11 +1,27 @@
 import unittest
 import os
+import io
+import glob
+import tempfile
 
 from tests.util import iter_eplus_versions
 
-from opyplus.epm.parse_idf import parse_idf
+from opyplus.epm.parse_idf import parse_idf, iter_idf, iter_idf_fast, iter_idf_mmap
+from opyplus.util import to_buffer, get_multi_line_copyright_message
+from opyplus.idd.resources import get_idd_path
 from opyplus.compatibility import get_eplus_base_dir_path
 from opyplus import CONF
+import opyplus as op
+
+
+ONE_ZONE_IDF_PATH = os.path.join(
+    os.path.dirname(__file__),
+    "resources",
+    "simulations_outputs",
+    "one_zone_uncontrolled",
+    "8-6-0",
+    "opyplus.idf"
+)
 
 
 class IdfParseTest(unittest.TestCase):
@@ -21,3 +37,307 @@ class IdfParseTest(unittest.TestCase):
                 json_data = parse_idf(f)
 
         # todo: [GL] test properly
+
+    def test_iter_idf(self):
+        idf = """! head
+! comment
+
+Version, 8.6;
+
+Zone,
+    z1,  ! - Name
+    0;
+
+! chapter comment
+Zone,z2;
+Lead Input;
+Zone,
+    z3,"""
+        self.assertEqual(
+            [
+                ("_comment", "head\ncomment\n"),
+                ("Version", {0: "8.6"}),
+                ("Zone", {0: "z1", 1: "0"}),
+                ("Zone", {0: "z2", "_comment": "chapter comment"}),
+                ("Zone", {0: "z3"})
+            ],
+            list(iter_idf(io.StringIO(idf)))
+        )
+        self.assertEqual(
+            {
+                "Version": [{0: "8.6"}],
+                "Zone": [{0: "z1", 1: "0"}, {0: "z2", "_comment": "chapter comment"}, {0: "z3"}],
+                "_comment": "head\ncomment\n"
+            },
+            parse_idf(io.StringIO(idf))
+        )
+
+    def test_record_comments(self):
+        idf = """! head
+
+! version
+! comment
+Version, 8.6;
+! zone
+Zone,
+    ! inside
+    z1;  ! field comment
+! last comment
+"""
+        for written_by_opyplus in (False, True):
+            with self.subTest(written_by_opyplus=written_by_opyplus):
+                if written_by_opyplus:
+                    # head comment ends with first empty line
+                    content = get_multi_line_copyright_message() + idf
+                    expected = [("_comment", "head\n"), ("Version", {0: "8.6", "_comment": "version\ncomment"})]
+                else:
+                    # all comment lines before first record are head comment
+                    content = idf
+                    expected = [("_comment", "head\nversion\ncomment\n"), ("Version", {0: "8.6"})]
+                expected.append(("Zone", {0: "z1", "_comment": "zone\ninside"}))
+                self.assertEqual(expected, list(iter_idf(io.StringIO(content))))
+                self.assertEqual(expected, list(iter_idf_fast(io.StringIO(content))))
+                with tempfile.TemporaryDirectory() as temp_dir_path:
+                    path = os.path.join(temp_dir_path, "comments.idf")
+                    with open(path, "w") as f:
+                        f.write(content)
+                    self.assertEqual(expected, list(iter_idf_mmap(path)))
+
+        # head comment lines directly followed by first record
+        self.assertEqual(
+            [("_comment", "head\n"), ("Version", {0: "8.6"})],
+            list(iter_idf(io.StringIO("! head\nVersion, 8.6;\n")))
+        )
+
+        # existing idf: head comment is unchanged, and round trips
+        epm = op.Epm.load(ONE_ZONE_IDF_PATH)
+        self.assertTrue(epm.get_comment().endswith("Utility Tariffs:                None\n"))
+        self.assertEqual("", epm.Version.one().get_comment())
+        new_epm = op.Epm.load(io.StringIO(epm.to_idf()))
+        self.assertEqual(epm.get_comment(), new_epm.get_comment())
+        self.assertEqual(epm.to_idf(), new_epm.to_idf())
+
+        # round trip
+        epm = op.Epm.load(ONE_ZONE_IDF_PATH)
+        epm.set_comment("model\n\ncomment\n")
+        epm.Zone.one().set_comment("zone comment\n\nwith empty line")
+        epm.Version.one().set_comment("version comment")
+        for parse_mode in ("stream", "fast"):
+            with self.subTest(parse_mode=parse_mode):
+                new_epm = op.Epm.load(io.StringIO(epm.to_idf()), parse_mode=parse_mode)
+                self.assertEqual(epm.get_comment(), new_epm.get_comment())
+                self.assertEqual("zone comment\n\nwith empty line", new_epm.Zone.one().get_comment())
+                self.assertEqual("version comment", new_epm.Version.one().get_comment())
+                self.assertEqual(epm.to_idf(), new_epm.to_idf())
+
+    def test_streaming_load(self):
+        path = ONE_ZONE_IDF_PATH
+        with open(path, encoding=CONF.encoding) as f:
+            expected_epm = op.Epm(json_data=parse_idf(f))
+        epm = op.Epm.load(path)
+        self.assertEqual((8, 6, 0), epm._dev_idd.version)
+        self.assertEqual(expected_epm.get_comment(), epm.get_comment())
+        self.assertEqual(expected_epm.to_json_data(), epm.to_json_data())
+
+    def test_trusted_load(self):
+        # idf written by opyplus
+        epm = op.Epm.load(ONE_ZONE_IDF_PATH)
+        content = epm.to_idf()
+        trusted_epm = op.Epm.load(io.StringIO(content), trusted=True)
+        self.assertEqual(epm.to_json_data(), trusted_epm.to_json_data())
+        self.assertEqual(content, trusted_epm.to_idf())
+
+    def test_iter_idf_tables(self):
+        idf = """! head
+Zone, z1;
+Construction,
+    c1,  ! - Name; with semi-colon in comment
+    layer;
+Zone,
+    z2;
+"""
+        self.assertEqual(
+            [("_comment", "head\n"), ("Zone", {0: "z1"}), ("Zone", {0: "z2"})],
+            list(iter_idf(io.StringIO(idf), tables={"zone"}))
+        )
+
+    def test_iter_idf_fast(self):
+        # resource idfs
+        idf_paths = glob.glob(os.path.join(os.path.dirname(__file__), "resources", "**", "*.idf"), recursive=True)
+        self.assertGreater(len(idf_paths), 0)
+        for path in idf_paths:
+            with self.subTest(path=path):
+                with open(path, encoding=CONF.encoding) as f:
+                    content = f.read()
+                records = list(iter_idf(io.StringIO(content)))
+                self.assertEqual(records, list(iter_idf_fast(io.StringIO(content))))
+
+                # epm comparison requires idd of idf version to be bundled
+                version = next((data[0] for ref, data in records if ref.lower() == "version"), None)
+                if version is not None:
+                    try:
+                        get_idd_path(tuple(int(v) for v in version.split(".")[:2]) + (0,))
+                    except ValueError:
+                        continue
+                self.assertEqual(
+                    op.Epm.load(path).to_json_data(),
+                    op.Epm.load(path, parse_mode="fast").to_json_data()
+                )
+
+        # edge cases (managed by iter_idf)
+        for idf in (
+                "! only comment\n",
+                "Version, 8.6;\nZone, z1; Zone, z2;\n",  # several records on one line
+                "Version, 8.6;\nZone,\n    z1,\n    0\n;\n",  # line that doesn't end with ',' or ';'
+                "Version, 8.6;\nLead Input;\nZone, z1;\n",
+                "! head\nVersion, 8.6;\nZone,\n    z1,"  # unfinished record
+        ):
+            with self.subTest(idf=idf):
+                self.assertEqual(list(iter_idf(io.StringIO(idf))), list(iter_idf_fast(io.StringIO(idf))))
+
+        # tables
+        idf = "! head\nZone, z1;\nConstruction,\n    c1;  ! - Name\nZone,\n    z2,\n    0;\n"
+        self.assertEqual(
+            [("_comment", "head\n"), ("Zone", {0: "z1"}), ("Zone", {0: "z2", 1: "0"})],
+            list(iter_idf_fast(io.StringIO(idf), tables={"zone"}))
+        )
+
+        self.assertRaises(ValueError, op.Epm.load, ONE_ZONE_IDF_PATH, parse_mode="unknown")
+
+    def test_iter_idf_mmap(self):
+        def get_records(iter_fct, path, tables=None):
+            _, buffer = to_buffer(path)
+            with buffer as f:
+                return list(iter_fct(f, tables=tables))
+
+        # resource idfs
+        for path in glob.glob(os.path.join(os.path.dirname(__file__), "resources", "**", "*.idf"), recursive=True):
+            with self.subTest(path=path):
+                self.assertEqual(get_records(iter_idf, path), list(iter_idf_mmap(path)))
+
+        # encodings, line endings, edge cases
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            path = os.path.join(temp_dir_path, "test.idf")
+            for encoding in ("utf-8", "utf-8-sig", "latin-1", "utf-16"):
+                for idf in (
+                        "",
+                        "! only comment\n",
+                        "! head\r\n! comment\r\nVersion, 8.6;\r\nZone,\xa0z\xe9,  ! name; comment\r\n  0;\r\n",
+                        "! head\rVersion, 8.6;\rZone, z1;\r",
+                        "Version, 8.6;\nLead Input;\nZone, z1; Zone, z2;\nZone,\n    z3,"
+                ):
+                    with self.subTest(encoding=encoding, idf=idf):
+                        with open(path, "w", encoding=encoding, newline="") as f:
+                            f.write(idf)
+                        self.assertEqual(get_records(iter_idf, path), list(iter_idf_mmap(path)))
+                        self.assertEqual(
+                            get_records(iter_idf, path, tables={"zone"}),
+                            list(iter_idf_mmap(path, tables={"zone"}))
+                        )
+
+        # load
+        self.assertEqual(
+            op.Epm.load(ONE_ZONE_IDF_PATH).to_json_data(),
+            op.Epm.load(ONE_ZONE_IDF_PATH, parse_mode="mmap").to_json_data()
+        )
+        with open(ONE_ZONE_IDF_PATH) as f:
+            self.assertRaises(TypeError, op.Epm.load, f, parse_mode="mmap")
+
+    def test_iter_idf_mmap_strict_decoding(self):
+        # invalid byte located after sniffed bytes: it must not be dropped
+        initial_conf = (CONF.encoding_detection, CONF.encoding_sniff_bytes)
+        CONF.encoding_detection, CONF.encoding_sniff_bytes = "sniff", 64
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir_path:
+                path = os.path.join(temp_dir_path, "test.idf")
+                with open(path, "wb") as f:
+                    f.write(b"! " + b"-" * 100 + b"\nVersion, 8.6;\nZone, z\xe9one;\n")
+                for parse_mode in ("stream", "fast", "mmap"):
+                    with self.subTest(parse_mode=parse_mode):
+                        self.assertRaises(UnicodeDecodeError, op.Epm.load, path, parse_mode=parse_mode)
+        finally:
+            CONF.encoding_detection, CONF.encoding_sniff_bytes = initial_conf
+
+    def test_scan(self):
+        epm = op.Epm.load(ONE_ZONE_IDF_PATH)
+        scan_data = op.Epm.scan(ONE_ZONE_IDF_PATH, ["construction", "BuildingSurface:Detailed", "Output:Variable"])
+        self.assertEqual(
+            ["BuildingSurface_Detailed", "Construction", "Output_Variable", "_comment"],
+            list(scan_data)
+        )
+        self.assertEqual(epm.get_comment(), scan_data["_comment"])
+        for table_ref in ("BuildingSurface_Detailed", "Construction", "Output_Variable"):
+            expected = []
+            for record_data in getattr(epm, table_ref).to_json_data():
+                del record_data["_comment"]
+                expected.append(dict((k, v) for k, v in record_data.items() if v is not None))
+            self.assertEqual(
+                sorted(expected, key=lambda x: sorted(x.items())),
+                sorted(scan_data[table_ref], key=lambda x: sorted(x.items()))
+            )
+
+        self.assertRaises(KeyError, op.Epm.scan, ONE_ZONE_IDF_PATH, ["unknown"])
+
+    def test_update_from_idf(self):
+        epm = op.Epm.load(ONE_ZONE_IDF_PATH)
+        initial_records = set(r for table in epm for r in table)
+        content = epm.to_idf()
+        self.assertEqual(len(initial_records), len(epm._dev_idf_blocks))
+
+        # no change: records are kept
+        epm.update_from_idf(io.StringIO(content))
+        self.assertEqual(initial_records, set(r for table in epm for r in table))
+        self.assertEqual(content, epm.to_idf())
+
+        # edit a record, rename a pointed record
+        zone_name = epm.Zone.one()[0]
+        new_content = content.replace("1829.0;", "1830.5;").replace(zone_name, "renamed zone")
+        epm.update_from_idf(io.StringIO(new_content))
+        self.assertEqual(op.Epm.from_idf(io.StringIO(new_content)).to_idf(), epm.to_idf())
+        self.assertEqual(1830.5, epm.Site_Location.one().elevation)
+        self.assertEqual("renamed zone", epm.Zone.one().name)
+        self.assertEqual(
+            {epm.Zone.one()},
+            set(r.zone_name for r in epm.BuildingSurface_Detailed)
+        )
+        # only site location, zone and surfaces changed, updated records are the same objects
+        new_records = set(r for table in epm for r in table)
+        self.assertEqual(
+            {epm.Zone.one()},
+            new_records - initial_records
+        )
+        self.assertIn(epm.Site_Location.one(), initial_records)
+
+        # python modifications are always overridden
+        epm.Zone.one().name = "python zone"
+        epm.Timestep.one()[0] = 6
+        epm.update_from_idf(io.StringIO(new_content))
+        self.assertEqual(op.Epm.from_idf(io.StringIO(new_content)).to_idf(), epm.to_idf())
+
+        # delete pointed and pointing records (pointing fields are required), back to initial content
+        lines = new_content.split("\n\n")
+        deleted_content = "\n\n".join(
+            line for line in lines
+            if not line.strip().startswith(("Zone,", "BuildingSurface:Detailed,", "OtherEquipment,"))
+        )
+        epm.update_from_idf(io.StringIO(deleted_content))
+        self.assertEqual(0, len(epm.Zone))
+        self.assertEqual(0, len(epm.BuildingSurface_Detailed))
+        epm.update_from_idf(io.StringIO(content))
+        self.assertEqual(content, epm.to_idf())
+
+        # records not created from idf are updated
+        epm = op.Epm(json_data=op.Epm.load(ONE_ZONE_IDF_PATH).to_json_data())
+        self.assertEqual(0, len(epm._dev_idf_blocks))
+        epm.update_from_idf(io.StringIO(new_content))
+        self.assertEqual(op.Epm.from_idf(io.StringIO(new_content)).to_idf(), epm.to_idf())
+
+        # record comments
+        commented_content = new_content.replace("\nZone,", "\n! zone comment\nZone,")
+        epm.update_from_idf(io.StringIO(commented_content))
+        self.assertEqual("zone comment", epm.Zone.one().get_comment())
+        self.assertEqual("renamed zone", epm.Zone.one().name)
+        epm.update_from_idf(io.StringIO(new_content))
+        self.assertEqual("", epm.Zone.one().get_comment())
+
+        self.assertRaises(ValueError, epm.update_from_idf, io.StringIO(content), parse_mode="unknown")
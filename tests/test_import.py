@@ -0,0 +1,26 @@
+import unittest
+import os
+import subprocess
+import sys
+
+import opyplus as op
+
+
+class ImportTest(unittest.TestCase):
+    def test_heavy_modules_are_not_imported(self):
+        output = subprocess.check_output(
+            [
+                sys.executable,
+                "-c",
+                "import sys, opyplus; print(','.join(m for m in ('pandas', 'cchardet', 'unidecode', 'slugify') "
+                "if m in sys.modules))"
+            ],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        self.assertEqual("", output.decode().strip())
+
+    def test_lazy_objects(self):
+        for name in op.__all__:
+            self.assertIsNotNone(getattr(op, name))
+        self.assertRaises(AttributeError, getattr, op, "unknown_object")
+        self.assertTrue(set(op.__all__).issubset(dir(op)))
@@ -0,0 +1,76 @@
+import unittest
+import os
+import codecs
+import tempfile
+
+from opyplus import CONF
+from opyplus.util import detect_encoding, to_buffer
+
+
+class DetectEncodingTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.initial_conf = (CONF.file_encoding, CONF.encoding_detection, CONF.encoding_sniff_bytes)
+
+    def tearDown(self):
+        CONF.file_encoding, CONF.encoding_detection, CONF.encoding_sniff_bytes = self.initial_conf
+        self.temp_dir.cleanup()
+
+    def write(self, content_bytes):
+        path = os.path.join(self.temp_dir.name, "file.idf")
+        with open(path, "wb") as f:
+            f.write(content_bytes)
+        return path
+
+    def test_fast(self):
+        CONF.encoding_detection = "fast"
+        content = "Zone,\n    Zoné éèà;\n"
+        for encoded, expected_encoding in (
+                (content.encode("utf-8"), "utf-8"),
+                (content.encode("latin-1"), "latin-1"),
+                (codecs.BOM_UTF8 + content.encode("utf-8"), "utf-8-sig"),
+                (content.encode("utf-16"), "utf-16")
+        ):
+            with self.subTest(expected_encoding=expected_encoding):
+                path = self.write(encoded)
+                self.assertEqual(expected_encoding, detect_encoding(path))
+                _, buffer = to_buffer(path)
+                with buffer as f:
+                    self.assertEqual(content, f.read())
+
+    def test_fast_large_file(self):
+        # multi-byte character spread over two chunks must not be considered as invalid
+        CONF.encoding_detection = "fast"
+        content = ("a" * ((1 << 20) - 1) + "é").encode("utf-8")
+        self.assertEqual("utf-8", detect_encoding(self.write(content)))
+        self.assertEqual("latin-1", detect_encoding(self.write(content + b"\xe9")))
+
+    def test_explicit(self):
+        CONF.file_encoding = "cp1252"
+        self.assertEqual("cp1252", detect_encoding(self.write("Zone;".encode("utf-8"))))
+
+    def test_sniff(self):
+        CONF.encoding_detection = "sniff"
+        CONF.encoding_sniff_bytes = 100
+        content = ("Zone,\n    Zoné éèà;\n" * 100).encode("utf-8")
+        self.assertEqual("utf-8", detect_encoding(self.write(content)).lower())
+
+    def test_sniff_ascii_prefix(self):
+        # non ascii characters after sniffed bytes must not be lost
+        CONF.encoding_detection = "sniff"
+        content = "!" + "-" * (70 * 1024) + "\nZone, Café;\n"
+        path = self.write(content.encode("utf-8"))
+        self.assertEqual("utf-8", detect_encoding(path))
+        _, buffer = to_buffer(path)
+        with buffer as f:
+            self.assertEqual(content, f.read())
+
+        # wrong sniffed encoding raises
+        path = self.write(content.encode("latin-1"))
+        _, buffer = to_buffer(path)
+        with buffer as f:
+            self.assertRaises(UnicodeDecodeError, f.read)
+
+    def test_unknown_detection(self):
+        CONF.encoding_detection = "unknown"
+        self.assertRaises(ValueError, detect_encoding, self.write(b"Zone;"))